@@ -1,39 +1,84 @@
 from fastapi import (
     APIRouter,
+    Depends,
     HTTPException,
     Query,
-    Response,
+    Request,
     UploadFile,
     File,
 )
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app import schemas
-from app.oracle_client import OracleClient
+from app.bulk_executor import run_bulk, run_grouped
+from app.bulk_stream import run_operations
+from app.async_oracle_client import AsyncOracleClient, OracleAPIError
+from app.config import settings
+from app.deadlines import DeadlineStop, clear_budget, current_budget
+from app.client_registry import (
+    ClientLease,
+    async_oracle_clients,
+    circuit_breakers,
+    concurrency_limiters,
+    lease_async_oracle_client,
+)
+from app.jobs import RunningJob, job_manager
+from app.excel_import import (
+    REQUIRED_COLUMNS,
+    ExcelValidationError,
+    UploadTooLargeError,
+    discard_upload,
+    iter_excel_chunks,
+    spool_upload,
+)
+from app.exports import EXPORT_WRITERS, USER_EXPORT_COLUMNS, user_export_rows
+from app.scim_filters import build_scim_filter
+import asyncio
 import logging
-import pandas as pd
-from io import BytesIO
 import json
+from contextlib import asynccontextmanager
+from collections import Counter
+from typing import List, Optional
 
 router = APIRouter()
 logger = logging.getLogger("api")
 
 
-# Helper function to create Oracle client
-def create_oracle_client(oracle_config: schemas.OracleConnectionConfig) -> OracleClient:
-    return OracleClient(
+# Helper function to lease a pooled Oracle client; use it as a context manager
+def create_oracle_client(
+    oracle_config: schemas.OracleConnectionConfig,
+) -> ClientLease:
+    return lease_async_oracle_client(
         oracle_config.instance_url, oracle_config.username, oracle_config.password
     )
 
 
+class _LeasedStreamingResponse(StreamingResponse):
+    """StreamingResponse that holds a client lease until the body is done"""
+
+    def __init__(self, content, lease: ClientLease, **kwargs):
+        super().__init__(content, **kwargs)
+        self.lease = lease
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.lease.release()
+
+
 # User Management Endpoints
 @router.get("/users/")
-def get_all_users(
+async def get_all_users(
     instance_url: str = Query(..., description="Oracle Instance URL"),
     oracle_username: str = Query(..., description="Oracle API username"),
     oracle_password: str = Query(..., description="Oracle API password"),
 ):
     """Get all users from Oracle Fusion"""
-    oracle = OracleClient(instance_url, oracle_username, oracle_password)
-    result = oracle.get_all_users()
+    with lease_async_oracle_client(
+        instance_url, oracle_username, oracle_password
+    ) as oracle:
+        result = await oracle.get_all_users()
     if not result.get("success"):
         logger.error(f"Oracle get_all_users failed: {result.get('error')}")
         raise HTTPException(
@@ -44,13 +89,16 @@ def get_all_users(
 
 
 @router.post("/users/details", response_model=schemas.UserDetailResponse)
-def get_user_details(request: schemas.UserDetailRequest):
+async def get_user_details(request: schemas.UserDetailRequest):
     """Get comprehensive user details including roles and data security"""
-    oracle = create_oracle_client(request.oracle_config)
-    result = oracle.get_user_details(request.username)
+    with create_oracle_client(request.oracle_config) as oracle:
+        result = await oracle.get_user_details(
+            request.username, timeout=settings.USER_DETAILS_TIMEOUT
+        )
 
     if not result.get("success"):
-        raise HTTPException(status_code=404, detail=result.get("error"))
+        status_code = 504 if result.get("status_code") == 504 else 404
+        raise HTTPException(status_code=status_code, detail=result.get("error"))
 
     data = result.get("data", {})
     user_account = data.get("userAccount", {})
@@ -80,11 +128,34 @@ def get_user_details(request: schemas.UserDetailRequest):
     )
 
 
+@router.post("/users/batch-lookup", response_model=schemas.UserBatchLookupResponse)
+async def batch_lookup_users(request: schemas.UserBatchLookupRequest):
+    """Look up many users at once; unknown usernames are reported as missing"""
+    with create_oracle_client(request.oracle_config) as oracle:
+        results = await oracle.get_users_by_usernames(request.usernames)
+
+    users = {}
+    missing = []
+    errors = {}
+    for username, result in results.items():
+        if result.get("success"):
+            users[username] = result.get("data")
+        elif result.get("error") == "User not found":
+            users[username] = None
+            missing.append(username)
+        else:
+            errors[username] = result.get("error")
+
+    return schemas.UserBatchLookupResponse(
+        found=len(users) - len(missing), missing=missing, users=users, errors=errors
+    )
+
+
 @router.post("/users/roles/assign")
-def assign_role_to_user(request: schemas.RoleAssignmentRequest):
+async def assign_role_to_user(request: schemas.RoleAssignmentRequest):
     """Assign a role to a user"""
-    oracle = create_oracle_client(request.oracle_config)
-    result = oracle.assign_role_to_user(request.username, request.role_name)
+    with create_oracle_client(request.oracle_config) as oracle:
+        result = await oracle.assign_role_to_user(request.username, request.role_name)
 
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error"))
@@ -96,10 +167,10 @@ def assign_role_to_user(request: schemas.RoleAssignmentRequest):
 
 
 @router.post("/users/roles/remove")
-def remove_role_from_user(request: schemas.RoleRemovalRequest):
+async def remove_role_from_user(request: schemas.RoleRemovalRequest):
     """Remove a role from a user"""
-    oracle = create_oracle_client(request.oracle_config)
-    result = oracle.remove_role_from_user(request.username, request.role_name)
+    with create_oracle_client(request.oracle_config) as oracle:
+        result = await oracle.remove_role_from_user(request.username, request.role_name)
 
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error"))
@@ -110,57 +181,189 @@ def remove_role_from_user(request: schemas.RoleRemovalRequest):
     }
 
 
-@router.post("/users/roles/bulk-assign", response_model=schemas.BulkOperationResponse)
-def bulk_assign_roles(request: schemas.BulkRoleAssignmentRequest):
-    """Bulk assign roles to multiple users"""
-    oracle = create_oracle_client(request.oracle_config)
-    results = []
-    successful = 0
-    failed = 0
+def _bulk_concurrency(requested: Optional[int]) -> int:
+    return min(
+        requested or settings.BULK_DEFAULT_CONCURRENCY, settings.BULK_MAX_CONCURRENCY
+    )
 
-    for assignment in request.assignments:
-        try:
-            result = oracle.assign_role_to_user(
-                assignment.username, assignment.role_name
-            )
-            if result.get("success"):
-                successful += 1
-                results.append(
-                    schemas.OperationStatus(
-                        success=True,
-                        message=f"Role '{assignment.role_name}' assigned to user '{assignment.username}'",
-                    )
-                )
-            else:
-                failed += 1
-                results.append(
-                    schemas.OperationStatus(
-                        success=False,
-                        message=f"Failed to assign role '{assignment.role_name}' to user '{assignment.username}'",
-                        error=result.get("error"),
-                    )
-                )
-        except Exception as e:
-            failed += 1
-            results.append(
-                schemas.OperationStatus(
-                    success=False,
-                    message=f"Exception occurred while assigning role '{assignment.role_name}' to user '{assignment.username}'",
-                    error=str(e),
-                )
-            )
 
+def _use_bulk(requested: Optional[bool]) -> bool:
+    return settings.ORACLE_BULK_ENABLED if requested is None else requested
+
+
+def _scim_bulk_options(fail_on_errors: Optional[int] = None) -> dict:
+    return {
+        "fail_on_errors": fail_on_errors
+        if fail_on_errors is not None
+        else settings.SCIM_BULK_FAIL_ON_ERRORS,
+        "max_operations": settings.SCIM_BULK_MAX_OPERATIONS,
+        "max_payload_bytes": settings.SCIM_BULK_MAX_PAYLOAD_BYTES,
+    }
+
+
+def _check_bulk_deadline(applied: int):
+    """Fail a bulk request with 504 once its deadline budget cut it short
+
+    Rows the budget stopped were never attempted, so a 200 listing them as
+    failures would be misleading.
+    """
+    budget = current_budget()
+    if budget is not None and budget.exceeded:
+        raise HTTPException(
+            status_code=504,
+            detail=(
+                f"Request deadline of {budget.seconds}s exceeded; only {applied} "
+                "row(s) were applied. Submit long runs to the /jobs endpoints"
+            ),
+        )
+
+
+def _bulk_response(total: int, results: list) -> schemas.BulkOperationResponse:
+    successful = sum(1 for result in results if result.success)
     return schemas.BulkOperationResponse(
-        total_operations=len(request.assignments),
+        total_operations=total,
         successful_operations=successful,
-        failed_operations=failed,
+        failed_operations=len(results) - successful,
         results=results,
     )
 
 
+def _role_assignment_status(
+    assignment: schemas.RoleAssignmentRequest, result: dict
+) -> schemas.OperationStatus:
+    if result.get("success"):
+        return schemas.OperationStatus(
+            success=True,
+            message=f"Role '{assignment.role_name}' assigned to user '{assignment.username}'",
+        )
+    return schemas.OperationStatus(
+        success=False,
+        message=f"Failed to assign role '{assignment.role_name}' to user '{assignment.username}'",
+        error=result.get("error"),
+    )
+
+
+def _role_exception_statuses(
+    assignments: List[schemas.RoleAssignmentRequest], error: Exception
+) -> List[schemas.OperationStatus]:
+    return [
+        schemas.OperationStatus(
+            success=False,
+            message=f"Exception occurred while assigning role '{assignment.role_name}' to user '{assignment.username}'",
+            error=str(error),
+        )
+        for assignment in assignments
+    ]
+
+
+async def _assign_user_role_rows(
+    oracle: AsyncOracleClient, assignments: List[schemas.RoleAssignmentRequest]
+) -> List[schemas.OperationStatus]:
+    # All rows share one username: one SCIM PATCH for the group
+    try:
+        role_results = await oracle.assign_roles_to_user(
+            assignments[0].username,
+            [assignment.role_name for assignment in assignments],
+        )
+    except Exception as e:
+        return _role_exception_statuses(assignments, e)
+    return [
+        _role_assignment_status(assignment, result)
+        for assignment, result in zip(assignments, role_results)
+    ]
+
+
+async def _assign_role_member_rows(
+    oracle: AsyncOracleClient, assignments: List[schemas.RoleAssignmentRequest]
+) -> List[schemas.OperationStatus]:
+    # All rows share one role: batched PATCHes on the role's members
+    try:
+        role_results = await oracle.assign_role_to_users(
+            assignments[0].role_name,
+            [assignment.username for assignment in assignments],
+            batch_size=settings.ROLE_MEMBERS_BATCH_SIZE,
+        )
+    except Exception as e:
+        return _role_exception_statuses(assignments, e)
+    return [
+        _role_assignment_status(assignment, result)
+        for assignment, result in zip(assignments, role_results)
+    ]
+
+
+async def _assign_bulk_role_rows(
+    oracle: AsyncOracleClient,
+    assignments: List[schemas.RoleAssignmentRequest],
+    fail_on_errors: Optional[int],
+) -> List[schemas.OperationStatus]:
+    # One PATCH per user, packed into SCIM /Bulk envelopes
+    try:
+        role_results = await oracle.assign_roles_in_bulk(
+            [(assignment.username, assignment.role_name) for assignment in assignments],
+            **_scim_bulk_options(fail_on_errors),
+        )
+    except Exception as e:
+        return _role_exception_statuses(assignments, e)
+    return [
+        _role_assignment_status(assignment, result)
+        for assignment, result in zip(assignments, role_results)
+    ]
+
+
+async def _run_role_assignments(
+    oracle: AsyncOracleClient,
+    request: schemas.BulkRoleAssignmentRequest,
+    on_result=None,
+    stop=None,
+) -> List[schemas.OperationStatus]:
+    # Roles shared by many rows are granted through the role's members;
+    # the remaining rows are grouped per user, or all go through SCIM /Bulk
+    use_bulk = _use_bulk(request.use_bulk)
+    role_counts = Counter(assignment.role_name for assignment in request.assignments)
+    member_roles = {
+        role_name
+        for role_name, count in role_counts.items()
+        if count >= settings.ROLE_MEMBERS_THRESHOLD
+    }
+
+    def row_key(assignment: schemas.RoleAssignmentRequest):
+        if assignment.role_name in member_roles:
+            return ("role", assignment.role_name)
+        if use_bulk:
+            return ("bulk",)
+        return ("user", assignment.username.lower())
+
+    async def assign_group(assignments: List[schemas.RoleAssignmentRequest]):
+        if assignments[0].role_name in member_roles:
+            return await _assign_role_member_rows(oracle, assignments)
+        if use_bulk:
+            return await _assign_bulk_role_rows(
+                oracle, assignments, request.fail_on_errors
+            )
+        return await _assign_user_role_rows(oracle, assignments)
+
+    return await run_grouped(
+        request.assignments,
+        key=row_key,
+        worker=assign_group,
+        concurrency=_bulk_concurrency(request.concurrency),
+        on_result=on_result,
+        stop=stop,
+    )
+
+
+@router.post("/users/roles/bulk-assign", response_model=schemas.BulkOperationResponse)
+async def bulk_assign_roles(request: schemas.BulkRoleAssignmentRequest):
+    """Bulk assign roles to multiple users"""
+    with create_oracle_client(request.oracle_config) as oracle:
+        results = await _run_role_assignments(oracle, request, stop=DeadlineStop())
+    _check_bulk_deadline(sum(1 for result in results if result and result.success))
+    return _bulk_response(len(request.assignments), results)
+
+
 # Data Security Context Endpoints
 @router.post("/users/data-security/assign")
-def assign_data_security_context(request: schemas.DataSecurityContextRequest):
+async def assign_data_security_context(request: schemas.DataSecurityContextRequest):
     """Assign data security context to a user"""
     # This would need to be implemented based on your specific Oracle Fusion data security structure
     # For now, returning a placeholder response
@@ -170,54 +373,46 @@ def assign_data_security_context(request: schemas.DataSecurityContextRequest):
     }
 
 
+async def _assign_data_security_row(
+    assignment: schemas.DataSecurityContextRequest,
+) -> schemas.OperationStatus:
+    try:
+        # Placeholder implementation
+        return schemas.OperationStatus(
+            success=True,
+            message=f"Data security context '{assignment.data_security_context}' assigned to user '{assignment.username}'",
+        )
+    except Exception as e:
+        return schemas.OperationStatus(
+            success=False,
+            message=f"Failed to assign data security context to user '{assignment.username}'",
+            error=str(e),
+        )
+
+
 @router.post(
     "/users/data-security/bulk-assign", response_model=schemas.BulkOperationResponse
 )
-def bulk_assign_data_security_contexts(request: schemas.BulkDataSecurityRequest):
+async def bulk_assign_data_security_contexts(request: schemas.BulkDataSecurityRequest):
     """Bulk assign data security contexts to multiple users"""
-    results = []
-    successful = 0
-    failed = 0
-
-    for assignment in request.assignments:
-        try:
-            # Placeholder implementation
-            successful += 1
-            results.append(
-                schemas.OperationStatus(
-                    success=True,
-                    message=f"Data security context '{assignment.data_security_context}' assigned to user '{assignment.username}'",
-                )
-            )
-        except Exception as e:
-            failed += 1
-            results.append(
-                schemas.OperationStatus(
-                    success=False,
-                    message=f"Failed to assign data security context to user '{assignment.username}'",
-                    error=str(e),
-                )
-            )
-
-    return schemas.BulkOperationResponse(
-        total_operations=len(request.assignments),
-        successful_operations=successful,
-        failed_operations=failed,
-        results=results,
+    results = await run_bulk(
+        request.assignments,
+        key=lambda assignment: assignment.username.lower(),
+        worker=_assign_data_security_row,
+        concurrency=_bulk_concurrency(request.concurrency),
     )
+    return _bulk_response(len(request.assignments), results)
 
 
 # Areas of Responsibility Endpoints
 @router.get("/areas-of-responsibility/")
-def get_areas_of_responsibility(
+async def get_areas_of_responsibility(
     instance_url: str = Query(..., description="Oracle Instance URL"),
     oracle_username: str = Query(..., description="Oracle API username"),
     oracle_password: str = Query(..., description="Oracle API password"),
     params: str = Query(None, description="Optional query parameters as JSON string"),
 ):
     """Get all areas of responsibility"""
-    oracle = OracleClient(instance_url, oracle_username, oracle_password)
-
     query_params = None
     if params:
         try:
@@ -225,7 +420,10 @@ def get_areas_of_responsibility(
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid JSON in params")
 
-    result = oracle.get_areas_of_responsibility(query_params)
+    with lease_async_oracle_client(
+        instance_url, oracle_username, oracle_password
+    ) as oracle:
+        result = await oracle.get_areas_of_responsibility(query_params)
     if not result.get("success"):
         raise HTTPException(
             status_code=502,
@@ -236,10 +434,8 @@ def get_areas_of_responsibility(
 
 
 @router.post("/areas-of-responsibility/assign")
-def assign_aor_to_user(request: schemas.AORAssignmentRequest):
+async def assign_aor_to_user(request: schemas.AORAssignmentRequest):
     """Assign an area of responsibility to a user"""
-    oracle = create_oracle_client(request.oracle_config)
-
     # Create AOR data
     aor_data = {
         "userAccountId": request.username,  # This would need to be the actual user account ID
@@ -247,7 +443,8 @@ def assign_aor_to_user(request: schemas.AORAssignmentRequest):
         "type": request.aor_type or "GENERAL",
     }
 
-    result = oracle.create_area_of_responsibility(aor_data)
+    with create_oracle_client(request.oracle_config) as oracle:
+        result = await oracle.create_area_of_responsibility(aor_data)
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error"))
 
@@ -258,10 +455,10 @@ def assign_aor_to_user(request: schemas.AORAssignmentRequest):
 
 
 @router.post("/areas-of-responsibility/remove")
-def remove_aor_from_user(request: schemas.AORRemovalRequest):
+async def remove_aor_from_user(request: schemas.AORRemovalRequest):
     """Remove an area of responsibility from a user"""
-    oracle = create_oracle_client(request.oracle_config)
-    result = oracle.delete_area_of_responsibility(request.aor_id)
+    with create_oracle_client(request.oracle_config) as oracle:
+        result = await oracle.delete_area_of_responsibility(request.aor_id)
 
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error"))
@@ -269,170 +466,688 @@ def remove_aor_from_user(request: schemas.AORRemovalRequest):
     return {"success": True, "message": f"AOR removed from user"}
 
 
+def _aor_data(assignment: schemas.AORAssignmentRequest) -> dict:
+    return {
+        "userAccountId": assignment.username,
+        "name": assignment.aor_name,
+        "type": assignment.aor_type or "GENERAL",
+    }
+
+
+def _aor_assignment_status(
+    assignment: schemas.AORAssignmentRequest, result: dict
+) -> schemas.OperationStatus:
+    if result.get("success"):
+        return schemas.OperationStatus(
+            success=True,
+            message=f"AOR '{assignment.aor_name}' assigned to user '{assignment.username}'",
+        )
+    return schemas.OperationStatus(
+        success=False,
+        message=f"Failed to assign AOR '{assignment.aor_name}' to user '{assignment.username}'",
+        error=result.get("error"),
+    )
+
+
+def _aor_exception_status(
+    assignment: schemas.AORAssignmentRequest, error: Exception
+) -> schemas.OperationStatus:
+    return schemas.OperationStatus(
+        success=False,
+        message=f"Exception occurred while assigning AOR '{assignment.aor_name}' to user '{assignment.username}'",
+        error=str(error),
+    )
+
+
+async def _assign_aor_row(
+    oracle: AsyncOracleClient, assignment: schemas.AORAssignmentRequest
+) -> schemas.OperationStatus:
+    try:
+        result = await oracle.create_area_of_responsibility(_aor_data(assignment))
+        return _aor_assignment_status(assignment, result)
+    except Exception as e:
+        return _aor_exception_status(assignment, e)
+
+
+async def _assign_aor_rows_in_batches(
+    oracle: AsyncOracleClient, assignments: List[schemas.AORAssignmentRequest]
+) -> List[schemas.OperationStatus]:
+    try:
+        aor_results = await oracle.create_areas_of_responsibility(
+            [_aor_data(assignment) for assignment in assignments],
+            max_parts=settings.REST_BATCH_MAX_PARTS,
+        )
+    except Exception as e:
+        return [_aor_exception_status(assignment, e) for assignment in assignments]
+    return [
+        _aor_assignment_status(assignment, result)
+        for assignment, result in zip(assignments, aor_results)
+    ]
+
+
+async def _run_aor_assignments(
+    oracle: AsyncOracleClient,
+    request: schemas.BulkAORRequest,
+    on_result=None,
+    stop=None,
+) -> List[schemas.OperationStatus]:
+    if not _use_bulk(request.use_bulk):
+        return await run_bulk(
+            request.assignments,
+            key=lambda assignment: assignment.username.lower(),
+            worker=lambda assignment: _assign_aor_row(oracle, assignment),
+            concurrency=_bulk_concurrency(request.concurrency),
+            on_result=on_result,
+            stop=stop,
+        )
+
+    # Batch requests carry every row at once, so stop only applies up front
+    if stop is not None and stop.is_set():
+        return [None] * len(request.assignments)
+    results = await _assign_aor_rows_in_batches(oracle, request.assignments)
+    if on_result is not None:
+        for index, result in enumerate(results):
+            on_result(index, result)
+    return results
+
+
 @router.post(
     "/areas-of-responsibility/bulk-assign", response_model=schemas.BulkOperationResponse
 )
-def bulk_assign_aors(request: schemas.BulkAORRequest):
+async def bulk_assign_aors(request: schemas.BulkAORRequest):
     """Bulk assign areas of responsibility to multiple users"""
-    oracle = create_oracle_client(request.oracle_config)
-    results = []
-    successful = 0
-    failed = 0
+    with create_oracle_client(request.oracle_config) as oracle:
+        results = await _run_aor_assignments(oracle, request, stop=DeadlineStop())
+    _check_bulk_deadline(sum(1 for result in results if result and result.success))
+    return _bulk_response(len(request.assignments), results)
 
-    for assignment in request.assignments:
-        try:
-            aor_data = {
-                "userAccountId": assignment.username,
-                "name": assignment.aor_name,
-                "type": assignment.aor_type or "GENERAL",
-            }
-
-            result = oracle.create_area_of_responsibility(aor_data)
-            if result.get("success"):
-                successful += 1
-                results.append(
-                    schemas.OperationStatus(
-                        success=True,
-                        message=f"AOR '{assignment.aor_name}' assigned to user '{assignment.username}'",
-                    )
-                )
-            else:
-                failed += 1
-                results.append(
-                    schemas.OperationStatus(
-                        success=False,
-                        message=f"Failed to assign AOR '{assignment.aor_name}' to user '{assignment.username}'",
-                        error=result.get("error"),
-                    )
-                )
-        except Exception as e:
-            failed += 1
-            results.append(
-                schemas.OperationStatus(
-                    success=False,
-                    message=f"Exception occurred while assigning AOR '{assignment.aor_name}' to user '{assignment.username}'",
-                    error=str(e),
-                )
+
+# Excel Upload Endpoints
+async def _excel_role_rows(oracle: AsyncOracleClient, rows: list) -> List[dict]:
+    username = str(rows[0][1].get("username", ""))
+    role_names = [str(row.get("role_name", "")) for _, row in rows]
+    try:
+        return await oracle.assign_roles_to_user(username, role_names)
+    except Exception as e:
+        return [{"success": False, "error": str(e)} for _ in rows]
+
+
+def _excel_aor_data(row) -> dict:
+    return {
+        "userAccountId": str(row.get("username", "")),
+        "name": str(row.get("aor_name", "")),
+        "type": str(row.get("aor_type", "GENERAL")),
+    }
+
+
+async def _excel_rows_in_bulk(
+    oracle: AsyncOracleClient, operation_type: str, rows: list
+) -> List[dict]:
+    # All rows of the sheet go out as SCIM /Bulk or REST batch requests
+    try:
+        if operation_type == "role_assignment":
+            return await oracle.assign_roles_in_bulk(
+                [
+                    (str(row.get("username", "")), str(row.get("role_name", "")))
+                    for _, row in rows
+                ],
+                **_scim_bulk_options(),
+            )
+        if operation_type == "aor_assignment":
+            return await oracle.create_areas_of_responsibility(
+                [_excel_aor_data(row) for _, row in rows],
+                max_parts=settings.REST_BATCH_MAX_PARTS,
             )
+    except Exception as e:
+        return [{"success": False, "error": str(e)} for _ in rows]
+    return [
+        {"success": False, "error": f"Unsupported operation type: {operation_type}"}
+        for _ in rows
+    ]
 
-    return schemas.BulkOperationResponse(
-        total_operations=len(request.assignments),
-        successful_operations=successful,
-        failed_operations=failed,
-        results=results,
+
+async def _excel_row(oracle: AsyncOracleClient, operation_type: str, row) -> dict:
+    try:
+        if operation_type == "aor_assignment":
+            return await oracle.create_area_of_responsibility(_excel_aor_data(row))
+        return {
+            "success": False,
+            "error": f"Unsupported operation type: {operation_type}",
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@asynccontextmanager
+async def _excel_chunks(path: str, operation_type: str):
+    """Validated chunks of a spooled upload, each as soon as it is parsed
+
+    Leaving the block stops the parser, also when the caller breaks off.
+    """
+    chunks = iter_excel_chunks(
+        path,
+        operation_type,
+        workers=settings.EXCEL_PARSE_WORKERS,
+        chunk_rows=settings.EXCEL_CHUNK_ROWS,
+        max_rows=settings.EXCEL_MAX_ROWS,
+        pending_chunks=settings.EXCEL_PENDING_CHUNKS,
+    )
+    try:
+        yield chunks
+    finally:
+        await chunks.aclose()
+
+
+async def _run_excel_rows(
+    oracle: AsyncOracleClient,
+    operation_type: str,
+    rows: list,
+    use_bulk: Optional[bool],
+    on_result=None,
+    stop=None,
+) -> List[dict]:
+    if _use_bulk(use_bulk):
+        # Batch requests carry every row at once, so stop only applies up front
+        if stop is not None and stop.is_set():
+            return [None] * len(rows)
+        outcomes = await _excel_rows_in_bulk(oracle, operation_type, rows)
+        if on_result is not None:
+            for index, outcome in enumerate(outcomes):
+                on_result(index, outcome)
+        return outcomes
+    if operation_type == "role_assignment":
+        # Rows for the same user become one PATCH. Only rows within this
+        # chunk are merged: a user whose rows span chunks gets one PATCH per
+        # chunk, since holding rows back would stall the streaming upload
+        return await run_grouped(
+            rows,
+            key=lambda item: str(item[1].get("username", "")).lower(),
+            worker=lambda group: _excel_role_rows(oracle, group),
+            concurrency=_bulk_concurrency(None),
+            on_result=on_result,
+            stop=stop,
+        )
+    return await run_bulk(
+        rows,
+        key=lambda item: str(item[1].get("username", "")).lower(),
+        worker=lambda item: _excel_row(oracle, operation_type, item[1]),
+        concurrency=_bulk_concurrency(None),
+        on_result=on_result,
+        stop=stop,
     )
 
 
-# Excel Upload Endpoints
+def _check_excel_filename(file: UploadFile):
+    if not file.filename.endswith((".xlsx", ".xls")):
+        raise HTTPException(
+            status_code=400, detail="File must be an Excel file (.xlsx or .xls)"
+        )
+
+
+def _check_excel_operation(operation_type: str):
+    if operation_type == "data_security":
+        # Never had an upload handler: every row used to fail after the whole
+        # file was read, so it is refused before anything is spooled
+        raise HTTPException(
+            status_code=400,
+            detail="Excel uploads do not support data_security; "
+            "use POST /users/data-security/bulk-assign",
+        )
+    if operation_type not in REQUIRED_COLUMNS:
+        raise HTTPException(
+            status_code=400, detail=f"Unsupported operation type: {operation_type}"
+        )
+
+
+async def _spool_excel_upload(file: UploadFile) -> str:
+    try:
+        return await spool_upload(file, settings.EXCEL_MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+def _collect_excel_outcomes(
+    rows: list, outcomes: List[dict], processed_records: list, errors: list
+):
+    for (row_number, row), result in zip(rows, outcomes):
+        if result is None:
+            # Skipped once the request deadline ran out
+            continue
+        if result.get("success"):
+            processed_records.append(
+                {
+                    "row": row_number,
+                    "username": str(row.get("username", "")),
+                    "status": "success",
+                    "message": "Operation completed successfully",
+                }
+            )
+        else:
+            errors.append(
+                {
+                    "row": row_number,
+                    "username": str(row.get("username", "")),
+                    "error": result.get("error", "Unknown error"),
+                }
+            )
+
+
 @router.post("/upload/excel", response_model=schemas.ExcelUploadResponse)
 async def upload_excel_file(
     file: UploadFile = File(...),
     operation_type: str = Query(
         ...,
-        description="Type of operation: role_assignment, data_security, aor_assignment",
+        description="Type of operation: role_assignment, aor_assignment",
     ),
     instance_url: str = Query(..., description="Oracle Instance URL"),
     oracle_username: str = Query(..., description="Oracle API username"),
     oracle_password: str = Query(..., description="Oracle API password"),
+    use_bulk: Optional[bool] = Query(
+        None, description="Send rows as SCIM /Bulk or REST batch requests"
+    ),
 ):
     """Upload Excel file for bulk operations"""
-    if not file.filename.endswith((".xlsx", ".xls")):
-        raise HTTPException(
-            status_code=400, detail="File must be an Excel file (.xlsx or .xls)"
-        )
+    _check_excel_filename(file)
+    _check_excel_operation(operation_type)
+    path = await _spool_excel_upload(file)
 
+    lease = lease_async_oracle_client(instance_url, oracle_username, oracle_password)
     try:
-        # Read Excel file
-        content = await file.read()
-        df = pd.read_excel(BytesIO(content))
-
-        oracle = OracleClient(instance_url, oracle_username, oracle_password)
-        success_count = 0
-        failure_count = 0
         errors = []
         processed_records = []
 
-        for index, row in df.iterrows():
-            try:
-                if operation_type == "role_assignment":
-                    result = oracle.assign_role_to_user(
-                        str(row.get("username", "")), str(row.get("role_name", ""))
-                    )
-                elif operation_type == "aor_assignment":
-                    aor_data = {
-                        "userAccountId": str(row.get("username", "")),
-                        "name": str(row.get("aor_name", "")),
-                        "type": str(row.get("aor_type", "GENERAL")),
-                    }
-                    result = oracle.create_area_of_responsibility(aor_data)
-                else:
-                    result = {
-                        "success": False,
-                        "error": f"Unsupported operation type: {operation_type}",
-                    }
-
-                if result.get("success"):
-                    success_count += 1
-                    processed_records.append(
-                        {
-                            "row": index + 1,
-                            "username": str(row.get("username", "")),
-                            "status": "success",
-                            "message": "Operation completed successfully",
-                        }
-                    )
-                else:
-                    failure_count += 1
-                    errors.append(
-                        {
-                            "row": index + 1,
-                            "username": str(row.get("username", "")),
-                            "error": result.get("error", "Unknown error"),
-                        }
-                    )
-
-            except Exception as e:
-                failure_count += 1
-                errors.append(
-                    {
-                        "row": index + 1,
-                        "username": str(row.get("username", "")),
-                        "error": str(e),
-                    }
+        # Each chunk goes to Oracle while the parser works on the next one
+        async with _excel_chunks(path, operation_type) as chunks:
+            async for chunk in chunks:
+                errors.extend(chunk.rejected)
+                outcomes = await _run_excel_rows(
+                    lease.client,
+                    operation_type,
+                    chunk.rows,
+                    use_bulk,
+                    stop=DeadlineStop(),
                 )
+                _collect_excel_outcomes(chunk.rows, outcomes, processed_records, errors)
+                _check_bulk_deadline(len(processed_records))
 
+        errors.sort(key=lambda error: error["row"])
         return schemas.ExcelUploadResponse(
-            success_count=success_count,
-            failure_count=failure_count,
+            success_count=len(processed_records),
+            failure_count=len(errors),
             errors=errors,
             processed_records=processed_records,
         )
 
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExcelValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error processing Excel file: {str(e)}"
         )
+    finally:
+        lease.release()
+        await run_in_threadpool(discard_upload, path)
+
+
+# Streaming Bulk Endpoint
+class _DuplexStreamingResponse(_LeasedStreamingResponse):
+    """Leased StreamingResponse that leaves receive() to the endpoint
+
+    Results stream out while the request body is still being read, and
+    Starlette's disconnect listener would swallow the body's chunks.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        finally:
+            self.lease.release()
+
+
+@router.post("/bulk/stream")
+async def stream_bulk_operations(
+    request: Request,
+    instance_url: str = Query(..., description="Oracle Instance URL"),
+    oracle_username: str = Query(..., description="Oracle API username"),
+    oracle_password: str = Query(..., description="Oracle API password"),
+    concurrency: Optional[int] = Query(
+        None, ge=1, description="Operations in flight at once"
+    ),
+):
+    """Run NDJSON bulk operations while the body uploads
+
+    Each input line is an object with an "op" (assign_role, remove_role,
+    create_aor, delete_aor, reset_password) and its fields. Results are
+    streamed back as NDJSON in completion order, tagged with the input line.
+    """
+    # Runs for as long as the client keeps sending, so only the per-call
+    # timeouts apply, not the request's deadline budget
+    clear_budget()
+    lease = lease_async_oracle_client(instance_url, oracle_username, oracle_password)
+
+    async def results():
+        async for result in run_operations(
+            lease.client,
+            request.stream(),
+            concurrency=_bulk_concurrency(concurrency),
+            max_line_bytes=settings.BULK_STREAM_MAX_LINE_BYTES,
+        ):
+            yield json.dumps(result) + "\n"
+
+    return _DuplexStreamingResponse(results(), lease, media_type="application/x-ndjson")
+
+
+# Background Job Endpoints
+def _require_job_storage():
+    if not job_manager.available:
+        raise HTTPException(status_code=503, detail=job_manager.unavailable_reason)
+
+
+async def _submit_job(
+    job_type: str,
+    total_rows: int,
+    run,
+    lease: ClientLease,
+    cleanup=None,
+) -> schemas.JobSubmitResponse:
+    """Start run(job, oracle) in the background; the lease is held until it ends"""
+
+    async def release():
+        lease.release()
+        if cleanup is not None:
+            await run_in_threadpool(cleanup)
+
+    client = lease.client
+    try:
+        job = await job_manager.submit(
+            job_type,
+            total_rows,
+            lambda job: run(job, client),
+            instance_url=client.base_url,
+            oracle_username=client.username,
+            cleanup=release,
+        )
+    except BaseException:
+        await release()
+        raise
+    return schemas.JobSubmitResponse(
+        job_id=job.id, status=job.status, total_rows=total_rows
+    )
+
+
+def _record_status(job: RunningJob, row_number: int, username: str, status):
+    job.record(row_number, username, status.success, status.message, status.error)
+
+
+@router.post(
+    "/jobs/roles/bulk-assign",
+    response_model=schemas.JobSubmitResponse,
+    status_code=202,
+    dependencies=[Depends(_require_job_storage)],
+)
+async def submit_bulk_role_job(request: schemas.BulkRoleAssignmentRequest):
+    """Start a bulk role assignment in the background"""
+
+    async def run(job: RunningJob, oracle: AsyncOracleClient):
+        def record(index: int, status: schemas.OperationStatus):
+            _record_status(job, index + 1, request.assignments[index].username, status)
+
+        await _run_role_assignments(
+            oracle, request, on_result=record, stop=job.cancel_event
+        )
+
+    return await _submit_job(
+        "role_assignment",
+        len(request.assignments),
+        run,
+        create_oracle_client(request.oracle_config),
+    )
+
+
+@router.post(
+    "/jobs/areas-of-responsibility/bulk-assign",
+    response_model=schemas.JobSubmitResponse,
+    status_code=202,
+    dependencies=[Depends(_require_job_storage)],
+)
+async def submit_bulk_aor_job(request: schemas.BulkAORRequest):
+    """Start a bulk AOR assignment in the background"""
+
+    async def run(job: RunningJob, oracle: AsyncOracleClient):
+        def record(index: int, status: schemas.OperationStatus):
+            _record_status(job, index + 1, request.assignments[index].username, status)
+
+        await _run_aor_assignments(
+            oracle, request, on_result=record, stop=job.cancel_event
+        )
+
+    return await _submit_job(
+        "aor_assignment",
+        len(request.assignments),
+        run,
+        create_oracle_client(request.oracle_config),
+    )
+
+
+@router.post(
+    "/jobs/upload/excel",
+    response_model=schemas.JobSubmitResponse,
+    status_code=202,
+    dependencies=[Depends(_require_job_storage)],
+)
+async def submit_excel_job(
+    file: UploadFile = File(...),
+    operation_type: str = Query(
+        ...,
+        description="Type of operation: role_assignment, aor_assignment",
+    ),
+    instance_url: str = Query(..., description="Oracle Instance URL"),
+    oracle_username: str = Query(..., description="Oracle API username"),
+    oracle_password: str = Query(..., description="Oracle API password"),
+    use_bulk: Optional[bool] = Query(
+        None, description="Send rows as SCIM /Bulk or REST batch requests"
+    ),
+):
+    """Start processing an uploaded Excel file in the background"""
+    _check_excel_filename(file)
+    _check_excel_operation(operation_type)
+    # Parsed by the job itself; the sheet's size is known once it starts
+    path = await _spool_excel_upload(file)
+
+    async def run(job: RunningJob, oracle: AsyncOracleClient):
+        async with _excel_chunks(path, operation_type) as chunks:
+            async for chunk in chunks:
+                if chunk.total_rows is not None:
+                    job.total_rows = chunk.total_rows
+                else:
+                    job.total_rows += len(chunk.rows) + len(chunk.rejected)
+                for error in chunk.rejected:
+                    job.record(
+                        error["row"], error["username"], False, error=error["error"]
+                    )
+
+                def record(index: int, result: dict, rows=chunk.rows):
+                    row_number, row = rows[index]
+                    username = str(row.get("username", ""))
+                    if result.get("success"):
+                        job.record(
+                            row_number,
+                            username,
+                            True,
+                            "Operation completed successfully",
+                        )
+                    else:
+                        job.record(
+                            row_number,
+                            username,
+                            False,
+                            error=result.get("error", "Unknown error"),
+                        )
+
+                await _run_excel_rows(
+                    oracle,
+                    operation_type,
+                    chunk.rows,
+                    use_bulk,
+                    on_result=record,
+                    stop=job.cancel_event,
+                )
+                if job.cancelled:
+                    break
+
+    return await _submit_job(
+        f"excel_{operation_type}",
+        0,
+        run,
+        lease_async_oracle_client(instance_url, oracle_username, oracle_password),
+        cleanup=lambda: discard_upload(path),
+    )
+
+
+@router.get(
+    "/jobs",
+    response_model=List[schemas.JobSummary],
+    dependencies=[Depends(_require_job_storage)],
+)
+async def list_jobs(limit: int = Query(50, ge=1, le=500)):
+    """Most recent background jobs, newest first"""
+    return await job_manager.list_jobs(limit)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=schemas.JobStatusResponse,
+    dependencies=[Depends(_require_job_storage)],
+)
+async def get_job(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="First row result to return"),
+    limit: int = Query(100, ge=1, le=1000, description="Row results per page"),
+):
+    """Progress counters of a job and one page of its row results"""
+    status = await job_manager.describe(job_id, offset, limit)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return status
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _job_progress(job: RunningJob) -> dict:
+    progress = job.progress()
+    if job.instance_url:
+        limiter = concurrency_limiters.get(job.instance_url).stats()
+        progress["concurrency"] = {
+            "limit": limiter["limit"],
+            "in_flight": limiter["in_flight"],
+            "waiting": limiter["waiting"],
+        }
+    return progress
+
+
+async def _job_events(job_id: str, job: Optional[RunningJob]):
+    if job is None:
+        # Finished (or run by an earlier process): report the stored outcome
+        status = await job_manager.describe(job_id, limit=1)
+        for key in ("offset", "limit", "results"):
+            status.pop(key)
+        yield _sse("done", status)
+        return
+
+    loop = asyncio.get_running_loop()
+    queue = job.subscribe()
+    try:
+        yield _sse("progress", _job_progress(job))
+        last_progress = last_sent = loop.time()
+        reported = (job.status, job.processed_rows)
+        while True:
+            try:
+                kind, row = await asyncio.wait_for(
+                    queue.get(), timeout=settings.JOB_EVENTS_PROGRESS_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                kind = row = None
+            now = loop.time()
+
+            if kind == "done":
+                progress = _job_progress(job)
+                progress["error"] = job.error
+                yield _sse("done", progress)
+                return
+            if kind == "row":
+                yield _sse("row", row)
+                last_sent = now
+
+            state = (job.status, job.processed_rows)
+            if (
+                state != reported
+                and now - last_progress >= settings.JOB_EVENTS_PROGRESS_INTERVAL
+            ):
+                yield _sse("progress", _job_progress(job))
+                reported = state
+                last_progress = last_sent = now
+            elif now - last_sent >= settings.JOB_EVENTS_HEARTBEAT:
+                yield ": heartbeat\n\n"
+                last_sent = now
+    finally:
+        job.unsubscribe(queue)
+
+
+@router.get("/jobs/{job_id}/events", dependencies=[Depends(_require_job_storage)])
+async def stream_job_events(job_id: str):
+    """Server-Sent Events with a job's row outcomes and progress
+
+    Events: "row" per finished row, "progress" with counters, rows/s, ETA
+    and the instance's current concurrency, and a final "done". Comment
+    lines are sent as heartbeats while nothing else happens.
+    """
+    job = job_manager.get(job_id)
+    if job is None and await job_manager.describe(job_id, limit=1) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return StreamingResponse(
+        _job_events(job_id, job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/jobs/{job_id}", dependencies=[Depends(_require_job_storage)])
+async def cancel_job(job_id: str):
+    """Cancel a job; rows already sent to Oracle still finish"""
+    if job_manager.cancel(job_id):
+        return {"job_id": job_id, "status": "cancelling"}
+    status = await job_manager.describe(job_id, limit=1)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    raise HTTPException(
+        status_code=409, detail=f"Job {job_id} is already {status['status']}"
+    )
 
 
 # Password Management Endpoints
 @router.post("/users/password/reset")
-def reset_user_password(request: schemas.PasswordResetRequest):
+async def reset_user_password(request: schemas.PasswordResetRequest):
     """Reset a user's password"""
-    oracle = create_oracle_client(request.oracle_config)
+    with create_oracle_client(request.oracle_config) as oracle:
+        # Resolve the GUID, served from the user cache when possible
+        user_result = await oracle.resolve_user(request.username)
+        if not user_result.get("success"):
+            raise HTTPException(status_code=404, detail="User not found")
 
-    # First get user details to get GUID
-    user_result = oracle.get_user_by_username(request.username)
-    if not user_result.get("success"):
-        raise HTTPException(status_code=404, detail="User not found")
+        user_data = user_result.get("data", {})
+        user_guid = user_data.get("GUID")
 
-    user_data = user_result.get("data", {})
-    user_guid = user_data.get("GUID")
+        if not user_guid:
+            raise HTTPException(status_code=400, detail="User GUID not found")
 
-    if not user_guid:
-        raise HTTPException(status_code=400, detail="User GUID not found")
-
-    password_data = {"newPassword": request.new_password}
-    result = oracle.reset_user_password(user_guid, password_data)
+        password_data = {"newPassword": request.new_password}
+        result = await oracle.reset_user_password(user_guid, password_data)
 
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error"))
@@ -441,26 +1156,25 @@ def reset_user_password(request: schemas.PasswordResetRequest):
 
 
 @router.post("/users/password/update")
-def update_user_password(request: schemas.PasswordUpdateRequest):
+async def update_user_password(request: schemas.PasswordUpdateRequest):
     """Update a user's password"""
-    oracle = create_oracle_client(request.oracle_config)
+    with create_oracle_client(request.oracle_config) as oracle:
+        # Resolve the GUID, served from the user cache when possible
+        user_result = await oracle.resolve_user(request.username)
+        if not user_result.get("success"):
+            raise HTTPException(status_code=404, detail="User not found")
 
-    # First get user details to get GUID
-    user_result = oracle.get_user_by_username(request.username)
-    if not user_result.get("success"):
-        raise HTTPException(status_code=404, detail="User not found")
+        user_data = user_result.get("data", {})
+        user_guid = user_data.get("GUID")
 
-    user_data = user_result.get("data", {})
-    user_guid = user_data.get("GUID")
+        if not user_guid:
+            raise HTTPException(status_code=400, detail="User GUID not found")
 
-    if not user_guid:
-        raise HTTPException(status_code=400, detail="User GUID not found")
-
-    password_data = {
-        "currentPassword": request.current_password,
-        "newPassword": request.new_password,
-    }
-    result = oracle.update_user_password(user_guid, password_data)
+        password_data = {
+            "currentPassword": request.current_password,
+            "newPassword": request.new_password,
+        }
+        result = await oracle.update_user_password(user_guid, password_data)
 
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error"))
@@ -473,20 +1187,21 @@ def update_user_password(request: schemas.PasswordUpdateRequest):
 
 # Search Endpoints
 @router.post("/users/search")
-def search_users(request: schemas.UserSearchRequest):
+async def search_users(request: schemas.UserSearchRequest):
     """Search users with advanced criteria"""
-    oracle = create_oracle_client(request.oracle_config)
-
-    # Convert search criteria to Oracle API parameters
-    params = {}
-    if "username" in request.search_criteria:
-        params["q"] = f'userName eq "{request.search_criteria["username"]}"'
-    if "email" in request.search_criteria:
-        params["q"] = f'emails.value eq "{request.search_criteria["email"]}"'
-    if "active" in request.search_criteria:
-        params["q"] = f'active eq {request.search_criteria["active"]}'
-
-    result = oracle.get_all_users()
+    # The criteria become a SCIM filter so Oracle only returns matching users
+    try:
+        scim_filter = build_scim_filter(request.search_criteria, request.operator)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with create_oracle_client(request.oracle_config) as oracle:
+        result = await oracle.search_users(
+            scim_filter,
+            attributes=request.attributes,
+            start=request.start_index,
+            count=request.count,
+        )
     if not result.get("success"):
         raise HTTPException(
             status_code=502, detail=f"Search failed: {result.get('error')}"
@@ -496,10 +1211,10 @@ def search_users(request: schemas.UserSearchRequest):
 
 
 @router.post("/areas-of-responsibility/search")
-def search_aors(request: schemas.AORSearchRequest):
+async def search_aors(request: schemas.AORSearchRequest):
     """Search areas of responsibility with advanced criteria"""
-    oracle = create_oracle_client(request.oracle_config)
-    result = oracle.find_areas_of_responsibility(request.search_criteria)
+    with create_oracle_client(request.oracle_config) as oracle:
+        result = await oracle.find_areas_of_responsibility(request.search_criteria)
 
     if not result.get("success"):
         raise HTTPException(
@@ -509,103 +1224,122 @@ def search_aors(request: schemas.AORSearchRequest):
     return result.get("data")
 
 
+# Admin Endpoints
+@router.get("/admin/metrics")
+async def get_admin_metrics(
+    instance_url: str = Query(..., description="Oracle Instance URL"),
+    oracle_username: str = Query(..., description="Oracle API username"),
+    oracle_password: str = Query(..., description="Oracle API password"),
+):
+    """Runtime metrics for one Oracle instance
+
+    Like every other endpoint it takes the caller's Oracle credentials, and
+    it only reports on the caller's own client and instance, so no other
+    tenant's usernames or URLs are disclosed.
+    """
+    name = instance_url.rstrip("/")
+    client = async_oracle_clients.find(instance_url, oracle_username, oracle_password)
+    breaker = next(
+        (breaker for breaker in circuit_breakers.breakers() if breaker.name == name),
+        None,
+    )
+    limiter = next(
+        (
+            limiter
+            for limiter in concurrency_limiters.limiters()
+            if limiter.name == name
+        ),
+        None,
+    )
+    return {
+        "instance_url": name,
+        "client": None
+        if client is None
+        else {
+            "user_cache": client.user_cache.stats(),
+            "coalesced_reads": client.single_flight.stats(),
+            "retries": client.retry_policy.stats(),
+        },
+        "circuit_breaker": None if breaker is None else breaker.stats(),
+        "concurrency_limit": None if limiter is None else limiter.stats(),
+    }
+
+
 # Legacy endpoints for backward compatibility
+def _export_user_page(writer, users: list) -> bytes:
+    return writer.write_rows(row for user in users for row in user_export_rows(user))
+
+
 @router.get("/users/download")
-def download_all_users_excel(
+async def download_all_users_excel(
     instance_url: str = Query(..., description="Oracle Instance URL"),
     oracle_username: str = Query(..., description="Oracle API username"),
     oracle_password: str = Query(..., description="Oracle API password"),
+    format: str = Query("xlsx", description="Export format: xlsx, csv or ndjson"),
 ):
-    oracle = OracleClient(instance_url, oracle_username, oracle_password)
-    result = oracle.get_all_users()
-    if not result.get("success"):
-        logger.error(f"Oracle get_all_users failed: {result.get('error')}")
+    writer_class = EXPORT_WRITERS.get(format)
+    if writer_class is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format '{format}'. Use one of: {', '.join(EXPORT_WRITERS)}",
+        )
+
+    # Exports stream for as long as the client keeps reading, so only the
+    # per-call timeouts apply, not the request's deadline budget
+    clear_budget()
+    # The lease is held until the response body is done
+    lease = lease_async_oracle_client(instance_url, oracle_username, oracle_password)
+    pages = lease.client.iter_user_pages()
+
+    # Fetch the first page before responding so Oracle errors still map to a 502
+    try:
+        first_page = await pages.__anext__()
+    except OracleAPIError as e:
+        lease.release()
+        logger.error(f"Oracle get_all_users failed: {e.error}")
         raise HTTPException(
             status_code=502,
-            detail=f"Oracle get_all_users failed: {result.get('error')}",
+            detail=f"Oracle get_all_users failed: {e.error}",
         )
-    users = result.get("data", {}).get("Resources", [])
-    rows = []
-    for user in users:
-        roles = user.get("roles", [])
-        if roles:
-            for role in roles:
-                row = {
-                    "userName": user.get("userName"),
-                    "email": user.get("emails", [{}])[0].get("value")
-                    if user.get("emails")
-                    else None,
-                    "firstName": user.get("name", {}).get("givenName"),
-                    "lastName": user.get("name", {}).get("familyName"),
-                    "displayName": user.get("displayName"),
-                    "active": user.get("active"),
-                    "userType": user.get("userType"),
-                    "title": user.get("title"),
-                    "organization": user.get("organization"),
-                    "department": user.get("department"),
-                    "manager": user.get("manager", {}).get("displayName")
-                    if user.get("manager")
-                    else None,
-                    "created": user.get("meta", {}).get("created"),
-                    "lastModified": user.get("meta", {}).get("lastModified"),
-                    "externalId": user.get("externalId"),
-                    "employeeNumber": user.get("employeeNumber"),
-                    "costCenter": user.get("costCenter"),
-                    "division": user.get("division"),
-                    "role_value": role.get("value"),
-                    "role_displayName": role.get("displayName"),
-                    "role_description": role.get("description"),
-                }
-                rows.append(row)
-        else:
-            row = {
-                "userName": user.get("userName"),
-                "email": user.get("emails", [{}])[0].get("value")
-                if user.get("emails")
-                else None,
-                "firstName": user.get("name", {}).get("givenName"),
-                "lastName": user.get("name", {}).get("familyName"),
-                "displayName": user.get("displayName"),
-                "active": user.get("active"),
-                "userType": user.get("userType"),
-                "title": user.get("title"),
-                "organization": user.get("organization"),
-                "department": user.get("department"),
-                "manager": user.get("manager", {}).get("displayName")
-                if user.get("manager")
-                else None,
-                "created": user.get("meta", {}).get("created"),
-                "lastModified": user.get("meta", {}).get("lastModified"),
-                "externalId": user.get("externalId"),
-                "employeeNumber": user.get("employeeNumber"),
-                "costCenter": user.get("costCenter"),
-                "division": user.get("division"),
-                "role_value": None,
-                "role_displayName": None,
-                "role_description": None,
-            }
-            rows.append(row)
-    df = pd.DataFrame(rows)
-    output = BytesIO()
-    df.to_excel(output, index=False)
-    output.seek(0)
-    headers = {"Content-Disposition": 'attachment; filename="oracle_users.xlsx"'}
-    return Response(
-        content=output.read(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
+    except BaseException:
+        lease.release()
+        raise
+
+    writer = writer_class()
+
+    async def export_body():
+        # Each page is flushed to the client as soon as it has been written
+        try:
+            yield writer.start(USER_EXPORT_COLUMNS)
+            yield await run_in_threadpool(_export_user_page, writer, first_page)
+            async for page in pages:
+                yield await run_in_threadpool(_export_user_page, writer, page)
+            yield writer.finish()
+        except OracleAPIError as e:
+            # Headers are already sent; abort so the client sees a truncated download
+            logger.error(f"Oracle get_all_users failed mid-export: {e.error}")
+            raise
+        finally:
+            await pages.aclose()
+
+    filename = f"oracle_users.{writer.extension}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return _LeasedStreamingResponse(
+        export_body(), lease, media_type=writer.media_type, headers=headers
     )
 
 
 @router.get("/users/{username}")
-def get_user_from_oracle(
+async def get_user_from_oracle(
     username: str,
     instance_url: str = Query(..., description="Oracle Instance URL"),
     oracle_username: str = Query(..., description="Oracle API username"),
     oracle_password: str = Query(..., description="Oracle API password"),
 ):
-    oracle = OracleClient(instance_url, oracle_username, oracle_password)
-    result = oracle.get_user(username)
+    with lease_async_oracle_client(
+        instance_url, oracle_username, oracle_password
+    ) as oracle:
+        result = await oracle.get_user(username)
     if not result.get("success"):
         logger.error(f"Oracle get_user failed: {result.get('error')}")
         raise HTTPException(
@@ -0,0 +1,1226 @@
+# Asynchronous Oracle Fusion HCM API Client
+# This module handles Oracle API calls for User Accounts and Areas of
+# Responsibility on top of httpx, so API handlers can multiplex many
+# in-flight Oracle calls on a single event loop. OracleClient wraps it for
+# blocking callers such as scripts.
+
+import asyncio
+import httpx
+import logging
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from app.bulk_requests import (
+    ADF_BATCH_CONTENT_TYPE,
+    DEFAULT_BATCH_MAX_PARTS,
+    DEFAULT_BULK_MAX_OPERATIONS,
+    DEFAULT_BULK_MAX_PAYLOAD_BYTES,
+    NOT_PROCESSED_ERROR,
+    batch_part,
+    batch_part_results,
+    bulk_envelopes,
+    bulk_operation,
+    bulk_operation_results,
+    bulk_request_body,
+)
+from app.scim_filters import DEFAULT_MAX_FILTER_LENGTH, or_filter_chunks, scim_value
+from app.circuit_breaker import FAILURE_STATUS_CODES, CircuitBreaker
+from app.concurrency_limiter import OVERLOAD_STATUS_CODES, AdaptiveLimiter
+from app.deadlines import (
+    DeadlineExceeded,
+    call_timeout,
+    deadline_passed,
+    remaining,
+    within_budget,
+)
+from app.retry_policy import RetryPolicy, parse_retry_after
+from app.singleflight import AsyncSingleFlight
+from app.user_cache import UserLookupCache, scim_identifiers
+
+logger = logging.getLogger("async_oracle_client")
+
+
+# Number of SCIM user pages fetched in parallel by get_all_users
+DEFAULT_PAGE_WORKERS = 4
+
+# Overall time allowed for the chained calls of get_user_details
+DEFAULT_DETAILS_TIMEOUT = 30
+
+# Members added to or removed from a SCIM role per PATCH
+DEFAULT_MEMBER_BATCH_SIZE = 100
+
+# 4xx answers about the member PATCH as a whole rather than one of its rows;
+# splitting the batch would only repeat them
+WHOLE_REQUEST_STATUS_CODES = frozenset({401, 403, 404, 405, 408, 429})
+
+
+def remaining_page_starts(
+    total_results: Optional[int], first_users: List[Dict], count: int
+) -> Optional[List[int]]:
+    """Start indexes of the SCIM pages that follow the first one
+
+    Returns None when totalResults is missing and the pages must be walked
+    serially. The page size the server actually honoured is taken from the
+    first page, since Oracle may cap count below the requested value.
+    """
+    if total_results is None:
+        return None if len(first_users) >= count else []
+    page_size = len(first_users)
+    if page_size == 0:
+        return []
+    return list(range(1 + page_size, int(total_results) + 1, page_size))
+
+
+class OracleAPIError(Exception):
+    """Raised by the streaming APIs when Oracle returns an error"""
+
+    def __init__(self, error: Any, status_code: Optional[int] = None):
+        super().__init__(error)
+        self.error = error
+        self.status_code = status_code
+
+    @classmethod
+    def from_result(cls, result: Dict) -> "OracleAPIError":
+        return cls(result.get("error"), result.get("status_code"))
+
+
+PATCH_OP_SCHEMA = "urn:ietf:params:scim:api:messages:2.0:PatchOp"
+
+
+def role_patch_operations(
+    add: Optional[List[str]] = None, remove: Optional[List[str]] = None
+) -> List[Dict]:
+    """Build RFC 7644 PATCH operations that add and remove user roles"""
+    operations = []
+    if add:
+        operations.append(
+            {
+                "op": "add",
+                "path": "roles",
+                "value": [
+                    {
+                        "value": role_name,
+                        "displayName": role_name,
+                        "description": f"Role assigned via API: {role_name}",
+                    }
+                    for role_name in add
+                ],
+            }
+        )
+    for role_name in remove or []:
+        operations.append(
+            {"op": "remove", "path": f"roles[value eq {scim_value(role_name)}]"}
+        )
+    return operations
+
+
+def member_patch_operations(operation: str, user_ids: List[str]) -> List[Dict]:
+    """Build RFC 7644 PATCH operations that add or remove role members"""
+    if operation == "add":
+        return [
+            {
+                "op": "add",
+                "path": "members",
+                "value": [{"value": user_id} for user_id in user_ids],
+            }
+        ]
+    if operation == "remove":
+        return [
+            {"op": "remove", "path": f"members[value eq {scim_value(user_id)}]"}
+            for user_id in user_ids
+        ]
+    raise ValueError(f"Unsupported member operation: {operation}")
+
+
+def patch_changes_username(update_data: Dict) -> bool:
+    """Whether a SCIM PATCH body (or plain attribute dict) sets userName"""
+    if any(str(key).lower() == "username" for key in update_data):
+        return True
+    for operation in update_data.get("Operations") or []:
+        path = str(operation.get("path") or "")
+        value = operation.get("value")
+        if path.lower() == "username":
+            return True
+        if not path and isinstance(value, dict):
+            if any(str(key).lower() == "username" for key in value):
+                return True
+    return False
+
+
+def details_timeout_result(timeout: float) -> Dict:
+    return {
+        "success": False,
+        "error": f"Timed out after {timeout:.1f}s fetching user details",
+        "status_code": 504,
+    }
+
+
+def is_no_target_error(result: Dict) -> bool:
+    """True when a PATCH failed because its path matched nothing (scimType noTarget)"""
+    return (
+        not result.get("success")
+        and result.get("status_code") == 400
+        and "noTarget" in str(result.get("error"))
+    )
+
+
+def failed_pages_result(failed: Dict[int, Dict]) -> Dict:
+    """Build the error result for SCIM pages that could not be fetched"""
+    first_error = failed[min(failed)]
+    return {
+        "success": False,
+        "error": first_error.get("error"),
+        "status_code": first_error.get("status_code"),
+        "failed_pages": sorted(failed),
+    }
+
+
+def params_key(params: Optional[Dict]) -> tuple:
+    """Hashable, order-independent form of query parameters"""
+    return tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+
+def create_async_http_client(
+    max_connections: int = 10, keepalive_expiry: float = 60
+) -> httpx.AsyncClient:
+    """Create an httpx client backed by a keep-alive connection pool"""
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(limits=limits)
+
+
+class AsyncOracleClient:
+    def __init__(
+        self,
+        base_url,
+        username,
+        password,
+        http_client: Optional[httpx.AsyncClient] = None,
+        user_cache: Optional[UserLookupCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        concurrency_limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.api_version = "11.13.18.05"  # Oracle Fusion HCM API version
+        self.user_cache = user_cache or UserLookupCache()
+        self.single_flight = AsyncSingleFlight()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(self.base_url)
+        self.concurrency_limiter = concurrency_limiter or AdaptiveLimiter(self.base_url)
+        self.http_client = http_client or create_async_http_client()
+        self._closing = set()
+
+    async def aclose(self):
+        """Release pooled connections held by this client"""
+        await self.http_client.aclose()
+
+    def close(self):
+        """Schedule release of pooled connections from synchronous code"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.aclose())
+            return
+        task = loop.create_task(self.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        timeout: float,
+        retry: Optional[bool] = None,
+        **kwargs,
+    ):
+        """Send an HTTP request to Oracle over the pooled connection
+
+        Identical concurrent GETs on this client (same URL and params, and so
+        the same credentials) share a single upstream request. The timeout is
+        shrunk to what is left of the current request's deadline budget.
+        retry=True opts a non-idempotent call into the retry policy.
+        """
+        timeout = call_timeout(timeout)
+        if method == "GET":
+            key = (url, params_key(kwargs.get("params")))
+            return await self.single_flight.do(
+                key, lambda: self._dispatch(method, url, timeout, retry, **kwargs)
+            )
+        return await self._dispatch(method, url, timeout, retry, **kwargs)
+
+    async def _dispatch(
+        self,
+        method: str,
+        url: str,
+        timeout: float,
+        retry: Optional[bool] = None,
+        **kwargs,
+    ):
+        # Transient failures are retried according to the retry policy, but
+        # never beyond the request's deadline budget
+        max_attempts = self.retry_policy.max_attempts(method, retry)
+        attempt = 1
+        while True:
+            try:
+                response = await self._transmit(method, url, timeout, **kwargs)
+            except DeadlineExceeded:
+                raise
+            except httpx.TransportError as e:
+                retry_after = None
+                delay = self.retry_policy.next_delay(attempt, max_attempts)
+                if delay is None or delay >= remaining(float("inf")):
+                    raise
+                reason = type(e).__name__
+            else:
+                if not self.retry_policy.retryable_status(response.status_code):
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self.retry_policy.next_delay(attempt, max_attempts, retry_after)
+                if delay is None or delay >= remaining(float("inf")):
+                    return response
+                reason = f"status {response.status_code}"
+
+            self.retry_policy.record_retry(retry_after)
+            logger.warning(
+                f"Retrying Oracle {method} {url} in {delay:.2f}s after {reason} "
+                f"(attempt {attempt} of {max_attempts})"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _transmit(self, method: str, url: str, timeout: float, **kwargs):
+        # One attempt, holding a slot of the instance's adaptive concurrency
+        # limit. Waiting for the slot counts against the deadline budget, as
+        # the limit may be down to one or two slots while Oracle throttles
+        await within_budget(
+            self.concurrency_limiter.acquire_async(), "a free Oracle connection slot"
+        )
+        started = time.monotonic()
+        latency = None
+        overloaded = False
+        try:
+            response = await self._attempt(method, url, call_timeout(timeout), **kwargs)
+            latency = time.monotonic() - started
+            overloaded = response.status_code in OVERLOAD_STATUS_CODES
+            return response
+        except httpx.TimeoutException:
+            # Other transport errors (e.g. a refused connection) say nothing
+            # about load; they are left to the circuit breaker
+            latency = time.monotonic() - started
+            overloaded = True
+            raise
+        finally:
+            self.concurrency_limiter.release(latency, overloaded)
+
+    async def _attempt(self, method: str, url: str, timeout: float, **kwargs):
+        # The outcome is reported to the instance's circuit breaker
+        self.circuit_breaker.before_call()
+        try:
+            response = await self.http_client.request(
+                method,
+                url,
+                auth=(self.username, self.password),
+                timeout=timeout,
+                **kwargs,
+            )
+        except httpx.TimeoutException as e:
+            if deadline_passed():
+                # Our own budget ran out, which says nothing about the pod
+                self.circuit_breaker.release()
+                raise DeadlineExceeded(
+                    "Request deadline exceeded waiting for Oracle"
+                ) from e
+            self.circuit_breaker.record_failure()
+            raise
+        except httpx.TransportError:
+            self.circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            self.circuit_breaker.release()
+            raise
+
+        if response.status_code in FAILURE_STATUS_CODES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        content_type: str = "application/json",
+        retry: Optional[bool] = None,
+    ) -> Dict:
+        """Generic method to make API requests to Oracle Fusion"""
+        url = f"{self.base_url}{endpoint}"
+        headers = {"Content-Type": content_type, "Accept": "application/json"}
+
+        try:
+            response = await self._send(
+                method,
+                url,
+                timeout=60,
+                retry=retry,
+                json=data,
+                params=params,
+                headers=headers,
+            )
+
+            logger.info(f"Oracle API {method} {url} - Status: {response.status_code}")
+
+            if response.status_code in (200, 201, 204):
+                return {
+                    "success": True,
+                    "data": response.json() if response.content else None,
+                    "status_code": response.status_code,
+                }
+            else:
+                logger.error(
+                    f"Oracle API error: {response.status_code} {response.text}"
+                )
+                return {
+                    "success": False,
+                    "error": response.text,
+                    "status_code": response.status_code,
+                }
+        except Exception as e:
+            logger.exception(f"Exception during Oracle API {method} call to {endpoint}")
+            return {"success": False, "error": str(e)}
+
+    # User Accounts API Methods
+    async def get_user_account(self, guid: str) -> Dict:
+        """Get a specific user account by GUID"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts/{guid}"
+        return await self._make_request("GET", endpoint)
+
+    async def get_all_user_accounts(self, params: Optional[Dict] = None) -> Dict:
+        """Get all user accounts with optional filtering"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts"
+        return await self._make_request("GET", endpoint, params=params)
+
+    async def create_user_account(self, user_data: Dict) -> Dict:
+        """Create a new user account"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts"
+        result = await self._make_request("POST", endpoint, data=user_data)
+        # Drop any cached "User not found" entry for the new account
+        username = user_data.get("Username") or user_data.get("userName")
+        if username:
+            self.user_cache.invalidate(username)
+        return result
+
+    async def update_user_account(self, guid: str, user_data: Dict) -> Dict:
+        """Update an existing user account"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts/{guid}"
+        result = await self._make_request("PATCH", endpoint, data=user_data)
+        self.user_cache.invalidate_where("GUID", guid)
+        return result
+
+    async def delete_user_account(self, guid: str) -> Dict:
+        """Delete a user account"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts/{guid}"
+        result = await self._make_request("DELETE", endpoint)
+        self.user_cache.invalidate_where("GUID", guid)
+        return result
+
+    async def reset_user_password(self, guid: str, password_data: Dict) -> Dict:
+        """Reset a user account password"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts/{guid}/action/resetPassword"
+        return await self._make_request("POST", endpoint, data=password_data)
+
+    async def update_user_password(self, guid: str, password_data: Dict) -> Dict:
+        """Update a user account password"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts/{guid}/action/updatePassword"
+        return await self._make_request("POST", endpoint, data=password_data)
+
+    async def autoprovision_roles(self, guid: str) -> Dict:
+        """Trigger roles autoprovisioning process"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/userAccounts/{guid}/action/autoprovisionRoles"
+        return await self._make_request("POST", endpoint)
+
+    # Areas of Responsibility API Methods
+    async def get_areas_of_responsibility(self, params: Optional[Dict] = None) -> Dict:
+        """Get all areas of responsibility"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/areasOfResponsibility"
+        return await self._make_request("GET", endpoint, params=params)
+
+    async def get_area_of_responsibility(self, aor_id: str) -> Dict:
+        """Get a specific area of responsibility"""
+        endpoint = (
+            f"/hcmRestApi/resources/{self.api_version}/areasOfResponsibility/{aor_id}"
+        )
+        return await self._make_request("GET", endpoint)
+
+    async def create_area_of_responsibility(self, aor_data: Dict) -> Dict:
+        """Create a new area of responsibility"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/areasOfResponsibility"
+        return await self._make_request("POST", endpoint, data=aor_data)
+
+    async def update_area_of_responsibility(self, aor_id: str, aor_data: Dict) -> Dict:
+        """Update an area of responsibility"""
+        endpoint = (
+            f"/hcmRestApi/resources/{self.api_version}/areasOfResponsibility/{aor_id}"
+        )
+        return await self._make_request("PATCH", endpoint, data=aor_data)
+
+    async def delete_area_of_responsibility(self, aor_id: str) -> Dict:
+        """Delete an area of responsibility"""
+        endpoint = (
+            f"/hcmRestApi/resources/{self.api_version}/areasOfResponsibility/{aor_id}"
+        )
+        return await self._make_request("DELETE", endpoint)
+
+    async def reassign_responsibility(self, aor_id: str, reassign_data: Dict) -> Dict:
+        """Reassign a responsibility"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/areasOfResponsibility/{aor_id}/action/reassign"
+        return await self._make_request("POST", endpoint, data=reassign_data)
+
+    async def find_areas_of_responsibility(self, search_criteria: Dict) -> Dict:
+        """Find areas of responsibility using advanced search"""
+        endpoint = f"/hcmRestApi/resources/{self.api_version}/areasOfResponsibility/action/findByAdvancedSearch"
+        # The search action only reads, so it is safe to send again
+        return await self._make_request(
+            "POST", endpoint, data=search_criteria, retry=True
+        )
+
+    # Enhanced User Management Methods
+    async def get_user_details(
+        self, username: str, timeout: float = DEFAULT_DETAILS_TIMEOUT
+    ) -> Dict:
+        """Get comprehensive user details including roles and data security
+
+        The account and AOR lookups only need the GUID, so they run
+        concurrently once it is known; the whole call gives up after timeout
+        seconds.
+        """
+        timeout = remaining(timeout)
+        try:
+            return await asyncio.wait_for(self._get_user_details(username), timeout)
+        except asyncio.TimeoutError:
+            return details_timeout_result(timeout)
+
+    async def _get_user_details(self, username: str) -> Dict:
+        # First get user account
+        user_result = await self.get_user_by_username(username)
+        if not user_result.get("success"):
+            return user_result
+
+        user_data = user_result.get("data", {})
+        user_guid = user_data.get("GUID")
+
+        if not user_guid:
+            return {"success": False, "error": "User GUID not found"}
+
+        # Get user account details and areas of responsibility together
+        aor_params = {"q": f"userAccountId eq {user_guid}"}
+        account_result, aor_result = await asyncio.gather(
+            self.get_user_account(user_guid),
+            self.get_areas_of_responsibility(aor_params),
+        )
+        if not account_result.get("success"):
+            return account_result
+
+        # Combine all data
+        combined_data = {
+            "userAccount": account_result.get("data"),
+            "areasOfResponsibility": aor_result.get("data")
+            if aor_result.get("success")
+            else [],
+            "scimUser": user_data,
+        }
+
+        return {"success": True, "data": combined_data}
+
+    async def get_user_by_username(self, username: str) -> Dict:
+        """Get user by username using SCIM API"""
+        filter_query = f"userName eq {scim_value(username)}"
+        url = f"{self.base_url}/hcmRestApi/scim/Users?filter={quote(filter_query)}"
+        headers = {"Accept": "application/json"}
+
+        try:
+            response = await self._send("GET", url, timeout=30, headers=headers)
+
+            if response.status_code == 200:
+                data = response.json()
+                users = data.get("Resources", [])
+                if users:
+                    self.user_cache.put(username, users[0])
+                    return {"success": True, "data": users[0]}
+                else:
+                    self.user_cache.put_missing(username)
+                    return {"success": False, "error": "User not found"}
+            else:
+                return {
+                    "success": False,
+                    "error": response.text,
+                    "status_code": response.status_code,
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def get_users_by_usernames(
+        self,
+        usernames: List[str],
+        max_filter_length: int = DEFAULT_MAX_FILTER_LENGTH,
+        max_workers: int = DEFAULT_PAGE_WORKERS,
+    ) -> Dict[str, Dict]:
+        """Look up many users with OR-chained userName filters
+
+        Usernames are packed into filters of bounded URL length and the chunks
+        are queried concurrently. Returns a result per requested username,
+        including "User not found" results for misses.
+        """
+        unique = list(dict.fromkeys(usernames))
+        distinct: Dict[str, str] = {}
+        for username in unique:
+            distinct.setdefault(username.lower(), username)
+        chunks = or_filter_chunks(
+            "userName", list(distinct.values()), max_filter_length
+        )
+        results: Dict[str, Dict] = {}
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def lookup(chunk):
+            async with semaphore:
+                return await self._lookup_username_chunk(*chunk)
+
+        for chunk_results in await asyncio.gather(*(lookup(chunk) for chunk in chunks)):
+            results.update(chunk_results)
+        return {username: results[username.lower()] for username in unique}
+
+    async def _lookup_username_chunk(
+        self, usernames: List[str], scim_filter: str
+    ) -> Dict[str, Dict]:
+        # Keyed by lowercased username, as SCIM userName matching ignores case.
+        # Oracle may return fewer users per page than asked for, so pages are
+        # followed by startIndex until totalResults is reached; only a
+        # complete result set proves that a username does not exist.
+        found: Dict[str, Dict] = {}
+        failure: Optional[Dict] = None
+        complete = False
+        start = 1
+        while True:
+            search_result = await self.search_users(
+                scim_filter, start=start, count=len(usernames)
+            )
+            if not search_result.get("success"):
+                failure = search_result
+                break
+            data = search_result["data"]
+            page = data.get("Resources", [])
+            before = len(found)
+            for user in page:
+                found[user.get("userName", "").lower()] = user
+            start += len(page)
+            total = data.get("totalResults")
+            if not page or (total is not None and start > total):
+                complete = True
+                break
+            if len(found) >= len(usernames):
+                complete = True
+                break
+            if len(found) == before:
+                # The server keeps repeating itself; stop without a verdict
+                break
+
+        results = {}
+        for username in usernames:
+            user = found.get(username.lower())
+            if user is not None:
+                self.user_cache.put(username, user)
+                results[username.lower()] = {"success": True, "data": user}
+            elif failure is not None:
+                results[username.lower()] = failure
+            else:
+                if complete:
+                    self.user_cache.put_missing(username)
+                results[username.lower()] = {
+                    "success": False,
+                    "error": "User not found",
+                }
+        return results
+
+    async def resolve_user(self, username: str) -> Dict:
+        """Resolve a username to its GUID, SCIM id and meta.version via the cache"""
+        found, identifiers = self.user_cache.get(username)
+        if found:
+            if identifiers is None:
+                return {"success": False, "error": "User not found"}
+            return {"success": True, "data": identifiers}
+
+        user_result = await self.get_user_by_username(username)
+        if not user_result.get("success"):
+            return user_result
+        return {"success": True, "data": scim_identifiers(user_result.get("data"))}
+
+    async def assign_role_to_user(self, username: str, role_name: str) -> Dict:
+        """Assign a role to a user"""
+        return (await self.assign_roles_to_user(username, [role_name]))[0]
+
+    async def assign_roles_to_user(
+        self, username: str, role_names: List[str]
+    ) -> List[Dict]:
+        """Assign several roles to a user with a single SCIM PATCH add operation
+
+        Returns one result per requested role, in order. Adding a role the user
+        already has is a no-op on the server, so the call is safe to repeat and
+        to run concurrently with other role changes for the same user.
+        """
+        unique_roles = list(dict.fromkeys(role_names))
+        operations = role_patch_operations(add=unique_roles)
+        result = await self._patch_user_by_username(username, operations)
+        return [result for _ in role_names]
+
+    async def remove_role_from_user(self, username: str, role_name: str) -> Dict:
+        """Remove a role from a user"""
+        operations = role_patch_operations(remove=[role_name])
+        result = await self._patch_user_by_username(username, operations)
+        if is_no_target_error(result):
+            return {"success": False, "error": "Role not found for user"}
+        return result
+
+    async def patch_user(self, user_id: str, operations: List[Dict]) -> Dict:
+        """Apply RFC 7644 PATCH operations to a SCIM user"""
+        return await self.update_user_scim(
+            user_id, {"schemas": [PATCH_OP_SCHEMA], "Operations": operations}
+        )
+
+    async def _patch_user_by_username(
+        self, username: str, operations: List[Dict]
+    ) -> Dict:
+        # The SCIM id usually comes from the cache; if the user was deleted and
+        # recreated since, the PATCH 404s and the id is looked up once more
+        for attempt in range(2):
+            user_result = await self.resolve_user(username)
+            if not user_result.get("success"):
+                return user_result
+            result = await self.patch_user(user_result["data"].get("id"), operations)
+            if result.get("status_code") != 404 or attempt:
+                return result
+            self.user_cache.invalidate(username)
+        return result
+
+    async def update_user_scim(self, user_id: str, update_data: Dict) -> Dict:
+        """Update user via SCIM API"""
+        url = f"{self.base_url}/hcmRestApi/scim/Users/{user_id}"
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+
+        try:
+            response = await self._send(
+                "PATCH", url, timeout=30, json=update_data, headers=headers
+            )
+        except Exception as e:
+            # The write may or may not have landed
+            self.user_cache.update_version("id", [user_id])
+            return {"success": False, "error": str(e)}
+
+        if response.status_code in (200, 204):
+            updated_user = response.json() if response.content else None
+            self._cache_patched_user(user_id, update_data, updated_user)
+            return {
+                "success": True,
+                "data": updated_user,
+            }
+        if response.status_code == 404:
+            # The cached id belongs to a deleted user
+            self.user_cache.invalidate_where("id", user_id)
+        else:
+            self.user_cache.update_version("id", [user_id])
+        return {
+            "success": False,
+            "error": response.text,
+            "status_code": response.status_code,
+        }
+
+    def _cache_patched_user(
+        self, user_id: str, update_data: Dict, updated_user: Optional[Dict]
+    ):
+        if updated_user and updated_user.get("userName"):
+            self.user_cache.put(updated_user["userName"], updated_user)
+        elif patch_changes_username(update_data):
+            # The username the entry is cached under may no longer exist
+            self.user_cache.invalidate_where("id", user_id)
+        else:
+            # Identifiers are unchanged; only meta.version moved on
+            version = ((updated_user or {}).get("meta") or {}).get("version")
+            self.user_cache.update_version("id", [user_id], version)
+
+    # SCIM Role Membership Methods
+    async def get_role_by_name(self, role_name: str) -> Dict:
+        """Get a SCIM role resource by name"""
+        url = f"{self.base_url}/hcmRestApi/scim/Roles"
+        headers = {"Accept": "application/json"}
+        params = {"filter": f"name eq {scim_value(role_name)}"}
+
+        try:
+            response = await self._send(
+                "GET", url, timeout=30, params=params, headers=headers
+            )
+
+            if response.status_code == 200:
+                roles = response.json().get("Resources", [])
+                if roles:
+                    return {"success": True, "data": roles[0]}
+                else:
+                    return {"success": False, "error": "Role not found"}
+            else:
+                return {
+                    "success": False,
+                    "error": response.text,
+                    "status_code": response.status_code,
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def update_role_members(
+        self,
+        role_id: str,
+        user_ids: List[str],
+        operation: str = "add",
+        batch_size: int = DEFAULT_MEMBER_BATCH_SIZE,
+    ) -> List[Dict]:
+        """Add or remove role members in batched PATCHes on the role resource
+
+        Returns one result per user id. Each batch is a single PATCH; when
+        Oracle rejects one with a 4xx the batch is split in halves until the
+        rejected members are isolated, so each user gets its own outcome.
+        Batches for one role are sent in sequence to avoid conflicting writes
+        to the same resource.
+        """
+        endpoint = f"/hcmRestApi/scim/Roles/{role_id}"
+        results = []
+        for start in range(0, len(user_ids), max(1, batch_size)):
+            batch = user_ids[start : start + max(1, batch_size)]
+            results.extend(await self._patch_role_members(endpoint, operation, batch))
+        return results
+
+    async def _patch_role_members(
+        self, endpoint: str, operation: str, user_ids: List[str]
+    ) -> List[Dict]:
+        data = {
+            "schemas": [PATCH_OP_SCHEMA],
+            "Operations": member_patch_operations(operation, user_ids),
+        }
+        result = await self._make_request("PATCH", endpoint, data=data)
+        # Membership changes bump each member's meta.version
+        self.user_cache.update_version("id", user_ids)
+        status_code = result.get("status_code") or 0
+        if (
+            len(user_ids) > 1
+            and 400 <= status_code < 500
+            and status_code not in WHOLE_REQUEST_STATUS_CODES
+        ):
+            # A rejected PATCH applies none of its operations (RFC 7644
+            # section 3.5.2), so both halves can safely be sent again
+            middle = len(user_ids) // 2
+            return await self._patch_role_members(
+                endpoint, operation, user_ids[:middle]
+            ) + await self._patch_role_members(endpoint, operation, user_ids[middle:])
+        return [result for _ in user_ids]
+
+    async def assign_role_to_users(
+        self,
+        role_name: str,
+        usernames: List[str],
+        batch_size: int = DEFAULT_MEMBER_BATCH_SIZE,
+    ) -> List[Dict]:
+        """Grant one role to many users through the role's members attribute"""
+        return await self._update_role_membership(
+            role_name, usernames, "add", batch_size
+        )
+
+    async def remove_role_from_users(
+        self,
+        role_name: str,
+        usernames: List[str],
+        batch_size: int = DEFAULT_MEMBER_BATCH_SIZE,
+    ) -> List[Dict]:
+        """Revoke one role from many users through the role's members attribute"""
+        return await self._update_role_membership(
+            role_name, usernames, "remove", batch_size
+        )
+
+    async def _update_role_membership(
+        self, role_name: str, usernames: List[str], operation: str, batch_size: int
+    ) -> List[Dict]:
+        # One role lookup for the whole set of users, one result per username
+        role_result = await self.get_role_by_name(role_name)
+        if not role_result.get("success"):
+            return [role_result for _ in usernames]
+        role_id = role_result["data"].get("id")
+
+        resolved = await self._resolve_users(usernames)
+        user_ids = list(
+            dict.fromkeys(
+                result["data"].get("id") for result in resolved if result.get("success")
+            )
+        )
+        member_results = dict(
+            zip(
+                user_ids,
+                await self.update_role_members(
+                    role_id, user_ids, operation, batch_size
+                ),
+            )
+        )
+        return [
+            member_results[result["data"].get("id")]
+            if result.get("success")
+            else result
+            for result in resolved
+        ]
+
+    async def _resolve_users(self, usernames: List[str]) -> List[Dict]:
+        # Cached identifiers first, then one batched lookup for the rest
+        resolved: Dict[str, Dict] = {}
+        for username in usernames:
+            found, identifiers = self.user_cache.get(username)
+            if found:
+                resolved[username] = (
+                    {"success": True, "data": identifiers}
+                    if identifiers is not None
+                    else {"success": False, "error": "User not found"}
+                )
+
+        misses = [username for username in usernames if username not in resolved]
+        if misses:
+            for username, result in (await self.get_users_by_usernames(misses)).items():
+                resolved[username] = (
+                    {"success": True, "data": scim_identifiers(result["data"])}
+                    if result.get("success")
+                    else result
+                )
+        return [resolved[username] for username in usernames]
+
+    # Multi-operation Requests
+    async def bulk(
+        self,
+        operations: List[Dict],
+        fail_on_errors: Optional[int] = None,
+        max_operations: int = DEFAULT_BULK_MAX_OPERATIONS,
+        max_payload_bytes: int = DEFAULT_BULK_MAX_PAYLOAD_BYTES,
+    ) -> List[Dict]:
+        """Send SCIM operations through /Bulk, returning one result per operation
+
+        Operations (see bulk_operation) are packed into envelopes within
+        max_operations and max_payload_bytes and sent in order. fail_on_errors
+        applies to the whole call: once that many operations have failed, the
+        rest are reported as not processed.
+        """
+        results: List[Optional[Dict]] = [None] * len(operations)
+        errors = 0
+        for indexes in bulk_envelopes(operations, max_operations, max_payload_bytes):
+            errors_left = None if fail_on_errors is None else fail_on_errors - errors
+            if errors_left is not None and errors_left <= 0:
+                for index in indexes:
+                    results[index] = {"success": False, "error": NOT_PROCESSED_ERROR}
+                continue
+            envelope_result = await self._make_request(
+                "POST",
+                "/hcmRestApi/scim/Bulk",
+                data=bulk_request_body(operations, indexes, errors_left),
+            )
+            for index, result in zip(
+                indexes, bulk_operation_results(indexes, envelope_result)
+            ):
+                results[index] = result
+                if not result.get("success"):
+                    errors += 1
+        return results
+
+    async def assign_roles_in_bulk(
+        self, assignments: List[Tuple[str, str]], **bulk_options
+    ) -> List[Dict]:
+        """Assign (username, role_name) pairs with one PATCH per user sent via /Bulk
+
+        Returns one result per pair; bulk_options are passed on to bulk().
+        """
+        roles_by_user: Dict[str, List[str]] = {}
+        usernames: Dict[str, str] = {}
+        for username, role_name in assignments:
+            roles_by_user.setdefault(username.lower(), []).append(role_name)
+            usernames.setdefault(username.lower(), username)
+
+        keys = list(roles_by_user)
+        user_results = dict(
+            zip(keys, await self._resolve_users([usernames[key] for key in keys]))
+        )
+        operations = []
+        patched = []
+        for key in keys:
+            if not user_results[key].get("success"):
+                continue
+            user_id = user_results[key]["data"].get("id")
+            patch = {
+                "schemas": [PATCH_OP_SCHEMA],
+                "Operations": role_patch_operations(
+                    add=list(dict.fromkeys(roles_by_user[key]))
+                ),
+            }
+            operations.append(bulk_operation("PATCH", f"/Users/{user_id}", patch))
+            patched.append((key, user_id))
+
+        for (key, user_id), result in zip(
+            patched, await self.bulk(operations, **bulk_options)
+        ):
+            user_results[key] = result
+        # Role changes bump meta.version, and a 404 means a stale cached id
+        self.user_cache.update_version("id", [user_id for _, user_id in patched])
+        self.user_cache.invalidate_many(
+            "id",
+            [
+                user_id
+                for key, user_id in patched
+                if user_results[key].get("status_code") == 404
+            ],
+        )
+        return [user_results[username.lower()] for username, _ in assignments]
+
+    async def create_areas_of_responsibility(
+        self, aor_rows: List[Dict], max_parts: int = DEFAULT_BATCH_MAX_PARTS
+    ) -> List[Dict]:
+        """Create many AORs through REST framework batch requests
+
+        AORs are HCM REST resources rather than SCIM, so they cannot use /Bulk.
+        A batch runs in one transaction: when Oracle rejects it nothing was
+        created and its rows are retried one by one so each row gets its own
+        outcome. Rows of a batch whose outcome is unknown (transport error or
+        5xx) are reported as failed and never replayed, see batch_part_results.
+        """
+        endpoint = f"/hcmRestApi/resources/{self.api_version}"
+        results = []
+        for start in range(0, len(aor_rows), max(1, max_parts)):
+            chunk = aor_rows[start : start + max(1, max_parts)]
+            parts = [
+                batch_part(
+                    f"part{start + offset}", "create", "/areasOfResponsibility", row
+                )
+                for offset, row in enumerate(chunk)
+            ]
+            batch_result = await self._make_request(
+                "POST",
+                endpoint,
+                data={"parts": parts},
+                content_type=ADF_BATCH_CONTENT_TYPE,
+            )
+            part_results = batch_part_results(parts, batch_result)
+            if part_results is None:
+                part_results = [
+                    await self.create_area_of_responsibility(row) for row in chunk
+                ]
+            results.extend(part_results)
+        return results
+
+    # Legacy methods for backward compatibility
+    async def create_user(self, user_data):
+        return await self.create_user_account(user_data)
+
+    async def get_user(self, username):
+        return await self.get_user_by_username(username)
+
+    async def search_users(
+        self,
+        filter: Optional[str] = None,
+        attributes: Optional[List[str]] = None,
+        start: int = 1,
+        count: int = 100,
+    ) -> Dict:
+        """Search SCIM users server-side and return one page plus totalResults"""
+        url = f"{self.base_url}/hcmRestApi/scim/Users"
+        headers = {"Accept": "application/json"}
+        params = {"startIndex": start, "count": count}
+        if filter:
+            params["filter"] = filter
+        if attributes:
+            params["attributes"] = ",".join(attributes)
+
+        try:
+            response = await self._send(
+                "GET", url, timeout=60, params=params, headers=headers
+            )
+
+            if response.status_code == 200:
+                return {"success": True, "data": response.json()}
+            else:
+                return {
+                    "success": False,
+                    "error": response.text,
+                    "status_code": response.status_code,
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    # SCIM User Enumeration
+    async def get_users_page(self, start_index: int = 1, count: int = 500) -> Dict:
+        """Get one page of SCIM users"""
+        url = f"{self.base_url}/hcmRestApi/scim/Users"
+        headers = {"Accept": "application/json"}
+        params = {"startIndex": start_index, "count": count}
+
+        try:
+            response = await self._send(
+                "GET", url, timeout=60, params=params, headers=headers
+            )
+
+            if response.status_code == 200:
+                return {"success": True, "data": response.json()}
+            else:
+                return {
+                    "success": False,
+                    "error": response.text,
+                    "status_code": response.status_code,
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def get_all_users(
+        self,
+        count: int = 500,
+        max_workers: int = DEFAULT_PAGE_WORKERS,
+        fail_fast: bool = True,
+        page_retries: int = 2,
+    ) -> Dict:
+        """Get all SCIM users, fetching pages after the first one concurrently
+
+        With fail_fast the first failed page aborts the walk; otherwise only the
+        failed pages are retried up to page_retries more times.
+        """
+        first_page = await self.get_users_page(1, count)
+        if not first_page.get("success"):
+            return first_page
+
+        data = first_page.get("data") or {}
+        first_users = data.get("Resources", [])
+        start_indexes = remaining_page_starts(
+            data.get("totalResults"), first_users, count
+        )
+        if start_indexes is None:
+            return await self._get_all_users_serially(first_users, count)
+
+        page_size = len(first_users)
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def fetch_page(start: int):
+            async with semaphore:
+                return start, await self.get_users_page(start, page_size)
+
+        pages = {1: first_users}
+        pending = start_indexes
+        attempts = 0
+        while pending:
+            tasks = [asyncio.create_task(fetch_page(start)) for start in pending]
+            failed = {}
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    start, result = await next_page
+                    if result.get("success"):
+                        pages[start] = (result.get("data") or {}).get("Resources", [])
+                        continue
+                    failed[start] = result
+                    if fail_fast:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            if not failed:
+                break
+            attempts += 1
+            if fail_fast or attempts > page_retries:
+                return failed_pages_result(failed)
+            logger.warning(f"Retrying {len(failed)} failed SCIM user pages")
+            pending = sorted(failed)
+
+        all_users = []
+        for start in sorted(pages):
+            all_users.extend(pages[start])
+        return {
+            "success": True,
+            "data": {"Resources": all_users, "totalResults": data.get("totalResults")},
+        }
+
+    async def iter_user_pages(
+        self, count: int = 500, max_workers: int = DEFAULT_PAGE_WORKERS
+    ) -> AsyncIterator[List[Dict]]:
+        """Yield SCIM user pages in order as they arrive
+
+        At most max_workers pages are fetched ahead of the consumer, so memory
+        stays bounded by a few pages instead of the whole tenant.
+        Raises OracleAPIError when a page cannot be fetched.
+        """
+        first_page = await self.get_users_page(1, count)
+        if not first_page.get("success"):
+            raise OracleAPIError.from_result(first_page)
+
+        data = first_page.get("data") or {}
+        users = data.get("Resources", [])
+        start_indexes = remaining_page_starts(data.get("totalResults"), users, count)
+        yield users
+
+        if start_indexes is None:
+            start_index = 1 + len(users)
+            while len(users) >= count:
+                result = await self.get_users_page(start_index, count)
+                if not result.get("success"):
+                    raise OracleAPIError.from_result(result)
+                users = (result.get("data") or {}).get("Resources", [])
+                start_index += len(users)
+                yield users
+            return
+
+        page_size = len(users)
+        starts = iter(start_indexes)
+        window = deque()
+        try:
+            for start in islice(starts, max(1, max_workers)):
+                window.append(
+                    asyncio.create_task(self.get_users_page(start, page_size))
+                )
+            while window:
+                result = await window.popleft()
+                if not result.get("success"):
+                    raise OracleAPIError.from_result(result)
+                next_start = next(starts, None)
+                if next_start is not None:
+                    window.append(
+                        asyncio.create_task(self.get_users_page(next_start, page_size))
+                    )
+                yield (result.get("data") or {}).get("Resources", [])
+        finally:
+            for task in window:
+                task.cancel()
+
+    async def iter_users(
+        self, count: int = 500, max_workers: int = DEFAULT_PAGE_WORKERS
+    ) -> AsyncIterator[Dict]:
+        """Yield SCIM users one at a time, see iter_user_pages"""
+        async for page in self.iter_user_pages(count, max_workers):
+            for user in page:
+                yield user
+
+    async def _get_all_users_serially(
+        self, first_users: List[Dict], count: int
+    ) -> Dict:
+        # Used when the server does not report totalResults
+        all_users = list(first_users)
+        start_index = 1 + len(first_users)
+        users = first_users
+        while len(users) >= count:
+            result = await self.get_users_page(start_index, count)
+            if not result.get("success"):
+                return result
+            users = (result.get("data") or {}).get("Resources", [])
+            all_users.extend(users)
+            start_index += len(users)
+        return {"success": True, "data": {"Resources": all_users}}
@@ -0,0 +1,84 @@
+# Bounded-concurrency execution of bulk rows
+# Rows for different users run in parallel, rows for the same user run one
+# after another in their original order so they never race each other.
+
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, List, Optional, Sequence, TypeVar
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+# Called with (index, result) as soon as each row finishes
+ResultCallback = Callable[[int, Result], None]
+
+
+async def run_bulk(
+    items: Sequence[Item],
+    key: Callable[[Item], Hashable],
+    worker: Callable[[Item], Awaitable[Result]],
+    concurrency: int,
+    on_result: Optional[ResultCallback] = None,
+    stop=None,
+) -> List[Result]:
+    """Run worker over items with at most `concurrency` rows in flight
+
+    Items that share a key are processed sequentially in input order. The
+    returned results are always in input order. Workers are expected to turn
+    their own failures into results rather than raise. Once the optional stop
+    event is set, rows that have not started are skipped and left as None.
+    """
+    groups: "OrderedDict[Hashable, List[int]]" = OrderedDict()
+    for index, item in enumerate(items):
+        groups.setdefault(key(item), []).append(index)
+
+    results: List[Result] = [None] * len(items)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_group(indexes: List[int]):
+        for index in indexes:
+            # The slot is released between rows so long groups do not hog it
+            async with semaphore:
+                if stop is not None and stop.is_set():
+                    return
+                results[index] = await worker(items[index])
+            if on_result is not None:
+                on_result(index, results[index])
+
+    await asyncio.gather(*(run_group(indexes) for indexes in groups.values()))
+    return results
+
+
+async def run_grouped(
+    items: Sequence[Item],
+    key: Callable[[Item], Hashable],
+    worker: Callable[[List[Item]], Awaitable[List[Result]]],
+    concurrency: int,
+    on_result: Optional[ResultCallback] = None,
+    stop=None,
+) -> List[Result]:
+    """Like run_bulk, but hand each group of same-key items to one worker call
+
+    The worker receives the group's items in input order and must return one
+    result per item, in the same order. Results are returned in input order.
+    on_result and stop behave as in run_bulk, per group.
+    """
+    groups: "OrderedDict[Hashable, List[int]]" = OrderedDict()
+    for index, item in enumerate(items):
+        groups.setdefault(key(item), []).append(index)
+
+    results: List[Result] = [None] * len(items)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_group(indexes: List[int]):
+        async with semaphore:
+            if stop is not None and stop.is_set():
+                return
+            group_results = await worker([items[index] for index in indexes])
+        for index, result in zip(indexes, group_results):
+            results[index] = result
+            if on_result is not None:
+                on_result(index, result)
+
+    await asyncio.gather(*(run_group(indexes) for indexes in groups.values()))
+    return results
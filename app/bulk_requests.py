@@ -0,0 +1,202 @@
+# Multi-operation request envelopes for Oracle Fusion
+# SCIM resources accept RFC 7644 /Bulk requests and the HCM REST resources
+# accept Oracle REST framework batch requests; both let many row operations
+# share one HTTP round trip. These helpers build the envelopes and map the
+# per-operation outcomes back to the caller's operations.
+
+import json
+from typing import Dict, List, Optional
+
+BULK_REQUEST_SCHEMA = "urn:ietf:params:scim:api:messages:2.0:BulkRequest"
+
+# Conservative defaults; a tenant advertises its own limits in
+# /hcmRestApi/scim/ServiceProviderConfig
+DEFAULT_BULK_MAX_OPERATIONS = 100
+DEFAULT_BULK_MAX_PAYLOAD_BYTES = 1048576
+
+NOT_PROCESSED_ERROR = "Not processed: bulk request stopped after failOnErrors"
+
+ADF_BATCH_CONTENT_TYPE = "application/vnd.oracle.adf.batch+json"
+DEFAULT_BATCH_MAX_PARTS = 50
+
+UNKNOWN_OUTCOME_ERROR = (
+    "Outcome unknown: the batch request failed ({error}); "
+    "check whether the row was applied before resubmitting it"
+)
+THROTTLED_ERROR = (
+    "Not applied: Oracle throttled the batch request (429); resubmit the row later"
+)
+# 4xx answers that reject the request without judging its parts: replaying
+# the parts one by one would only add load (429) or time out again (408)
+_NOT_A_VERDICT_STATUS_CODES = frozenset({408, 429})
+
+
+def bulk_operation(method: str, path: str, data: Optional[Dict] = None) -> Dict:
+    """Describe one SCIM bulk operation, e.g. ("PATCH", "/Users/<id>", patch)"""
+    operation = {"method": method.upper(), "path": path}
+    if data is not None:
+        operation["data"] = data
+    return operation
+
+
+def _operation_size(operation: Dict) -> int:
+    return len(json.dumps(operation, separators=(",", ":")).encode("utf-8"))
+
+
+def bulk_envelopes(
+    operations: List[Dict],
+    max_operations: int = DEFAULT_BULK_MAX_OPERATIONS,
+    max_payload_bytes: int = DEFAULT_BULK_MAX_PAYLOAD_BYTES,
+) -> List[List[int]]:
+    """Split operations into envelopes within the count and size limits
+
+    Returns the operation indexes of each envelope, in order. An operation
+    that is larger than max_payload_bytes on its own still gets an envelope
+    so the server can report the error for it.
+    """
+    # Room for the schema list, failOnErrors and the Operations wrapper
+    overhead = 200
+    envelopes: List[List[int]] = []
+    current: List[int] = []
+    size = overhead
+    for index, operation in enumerate(operations):
+        operation_size = _operation_size(operation) + 32
+        if current and (
+            len(current) >= max_operations or size + operation_size > max_payload_bytes
+        ):
+            envelopes.append(current)
+            current, size = [], overhead
+        current.append(index)
+        size += operation_size
+    if current:
+        envelopes.append(current)
+    return envelopes
+
+
+def bulk_request_body(
+    operations: List[Dict], indexes: List[int], fail_on_errors: Optional[int] = None
+) -> Dict:
+    """Build a BulkRequest; each bulkId is the operation's index in operations"""
+    body = {
+        "schemas": [BULK_REQUEST_SCHEMA],
+        "Operations": [dict(operations[index], bulkId=str(index)) for index in indexes],
+    }
+    if fail_on_errors is not None:
+        body["failOnErrors"] = fail_on_errors
+    return body
+
+
+def _operation_result(response_operation: Dict) -> Dict:
+    try:
+        status_code = int(str(response_operation.get("status", "")).split()[0])
+    except (ValueError, IndexError):
+        status_code = None
+    response = response_operation.get("response")
+    if status_code is not None and 200 <= status_code < 300:
+        return {
+            "success": True,
+            "data": response
+            if response is not None
+            else {"location": response_operation.get("location")},
+            "status_code": status_code,
+        }
+    if isinstance(response, dict) and response.get("detail"):
+        error = response["detail"]
+    else:
+        error = json.dumps(response) if response else "Bulk operation failed"
+    return {"success": False, "error": error, "status_code": status_code}
+
+
+def bulk_operation_results(indexes: List[int], envelope_result: Dict) -> List[Dict]:
+    """Map a BulkResponse back to one result per operation in the envelope
+
+    Operations missing from the response were not processed because the
+    server stopped after reaching failOnErrors.
+    """
+    if not envelope_result.get("success"):
+        return [envelope_result for _ in indexes]
+
+    response_operations = (envelope_result.get("data") or {}).get("Operations", [])
+    by_bulk_id = {
+        str(operation.get("bulkId")): operation
+        for operation in response_operations
+        if operation.get("bulkId") is not None
+    }
+    results = []
+    for position, index in enumerate(indexes):
+        operation = by_bulk_id.get(str(index))
+        if operation is None and not by_bulk_id and position < len(response_operations):
+            # Servers that drop bulkId still answer in request order
+            operation = response_operations[position]
+        if operation is None:
+            results.append({"success": False, "error": NOT_PROCESSED_ERROR})
+        else:
+            results.append(_operation_result(operation))
+    return results
+
+
+def batch_part(part_id: str, operation: str, path: str, payload: Optional[Dict] = None):
+    """Describe one part of an Oracle REST framework batch request"""
+    part = {"id": part_id, "path": path, "operation": operation}
+    if payload is not None:
+        part["payload"] = payload
+    return part
+
+
+def _unknown_part_result(error, status_code: Optional[int]) -> Dict:
+    return {
+        "success": False,
+        "error": UNKNOWN_OUTCOME_ERROR.format(error=error),
+        "status_code": status_code,
+    }
+
+
+def batch_part_results(parts: List[Dict], batch_result: Dict) -> Optional[List[Dict]]:
+    """Map a batch response to one result per part
+
+    Returns None only when Oracle definitely rejected the batch: a 4xx other
+    than 408 and 429, or a part carrying an exception. A batch runs in a
+    single transaction, so nothing was applied and the caller may send the
+    parts one by one to learn which row was at fault. A throttled batch
+    (429) was not applied either, but its parts are reported as failed
+    rather than multiplied into single requests. After a transport error,
+    a 408 or a 5xx the batch may or may not have been applied; those parts,
+    like parts missing from a successful response, are reported as failed
+    with an unknown outcome and must not be sent again.
+    """
+    status_code = batch_result.get("status_code")
+    if not batch_result.get("success"):
+        if status_code == 429:
+            return [
+                {"success": False, "error": THROTTLED_ERROR, "status_code": 429}
+                for _ in parts
+            ]
+        if (
+            status_code is not None
+            and 400 <= status_code < 500
+            and status_code not in _NOT_A_VERDICT_STATUS_CODES
+        ):
+            return None
+        return [
+            _unknown_part_result(batch_result.get("error"), status_code) for _ in parts
+        ]
+    response_parts = {
+        part.get("id"): part
+        for part in (batch_result.get("data") or {}).get("parts", [])
+    }
+    if any((response_parts.get(part["id"]) or {}).get("exception") for part in parts):
+        return None
+    results = []
+    for part in parts:
+        response_part = response_parts.get(part["id"])
+        if response_part is None:
+            results.append(_unknown_part_result("no result for this part", status_code))
+            continue
+        results.append(
+            {
+                "success": True,
+                "data": response_part.get("payload"),
+                "status_code": status_code,
+            }
+        )
+    return results
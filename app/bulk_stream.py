@@ -0,0 +1,228 @@
+# Streaming execution of NDJSON bulk operations
+# Operations are read line by line from the request body and started while
+# the rest of the body is still arriving. Results are emitted as soon as each
+# operation finishes, tagged with its input line number. At most
+# `concurrency` operations are in flight and only a few results are
+# buffered, so neither the input nor the output is ever held in full; a slow
+# reader or writer slows the other side down instead.
+
+import asyncio
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.async_oracle_client import AsyncOracleClient
+
+# Fields each operation needs besides "op"
+OPERATION_FIELDS = {
+    "assign_role": ("username", "role_name"),
+    "remove_role": ("username", "role_name"),
+    "create_aor": ("username", "aor_name"),
+    "delete_aor": ("aor_id",),
+    "reset_password": ("username", "new_password"),
+}
+
+_END = object()
+
+# A handler's Oracle result and the message to report if it succeeded
+Outcome = Tuple[dict, Optional[str]]
+
+
+async def _assign_role(oracle: AsyncOracleClient, operation: dict) -> Outcome:
+    result = await oracle.assign_role_to_user(
+        operation["username"], operation["role_name"]
+    )
+    return result, (
+        f"Role '{operation['role_name']}' assigned to user '{operation['username']}'"
+    )
+
+
+async def _remove_role(oracle: AsyncOracleClient, operation: dict) -> Outcome:
+    result = await oracle.remove_role_from_user(
+        operation["username"], operation["role_name"]
+    )
+    return result, (
+        f"Role '{operation['role_name']}' removed from user '{operation['username']}'"
+    )
+
+
+async def _create_aor(oracle: AsyncOracleClient, operation: dict) -> Outcome:
+    result = await oracle.create_area_of_responsibility(
+        {
+            "userAccountId": operation["username"],
+            "name": operation["aor_name"],
+            "type": operation.get("aor_type") or "GENERAL",
+        }
+    )
+    return result, (
+        f"AOR '{operation['aor_name']}' assigned to user '{operation['username']}'"
+    )
+
+
+async def _delete_aor(oracle: AsyncOracleClient, operation: dict) -> Outcome:
+    result = await oracle.delete_area_of_responsibility(operation["aor_id"])
+    return result, f"AOR '{operation['aor_id']}' deleted"
+
+
+async def _reset_password(oracle: AsyncOracleClient, operation: dict) -> Outcome:
+    user_result = await oracle.resolve_user(operation["username"])
+    if not user_result.get("success"):
+        return {"success": False, "error": "User not found"}, None
+    user_guid = (user_result.get("data") or {}).get("GUID")
+    if not user_guid:
+        return {"success": False, "error": "User GUID not found"}, None
+    result = await oracle.reset_user_password(
+        user_guid, {"newPassword": operation["new_password"]}
+    )
+    return result, f"Password reset for user '{operation['username']}'"
+
+
+OPERATION_HANDLERS: Dict[str, Callable[..., Awaitable[Outcome]]] = {
+    "assign_role": _assign_role,
+    "remove_role": _remove_role,
+    "create_aor": _create_aor,
+    "delete_aor": _delete_aor,
+    "reset_password": _reset_password,
+}
+
+
+def parse_operation(line: bytes) -> dict:
+    """Decode and check one input line; raises ValueError if it is unusable"""
+    try:
+        operation = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(operation, dict):
+        raise ValueError("Each line must be a JSON object")
+    op = operation.get("op")
+    fields = OPERATION_FIELDS.get(op)
+    if fields is None:
+        raise ValueError(
+            f"Unknown op {op!r}; expected one of: {', '.join(OPERATION_FIELDS)}"
+        )
+    missing = [
+        field
+        for field in fields
+        if not isinstance(operation.get(field), str) or not operation[field].strip()
+    ]
+    if missing:
+        raise ValueError(f"Missing value for {', '.join(missing)}")
+    return operation
+
+
+def operation_key(operation: dict) -> Hashable:
+    """Operations with the same key run one after another, in input order"""
+    if "username" in OPERATION_FIELDS[operation["op"]]:
+        return ("user", operation["username"].strip().lower())
+    return ("aor", operation["aor_id"])
+
+
+async def read_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Optional[bytes]]:
+    """Lines of an NDJSON body as they arrive; None for an over-long line"""
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            end = buffer.find(b"\n")
+            if end < 0:
+                break
+            line, buffer = buffer[:end], buffer[end + 1 :]
+            if skipping:
+                # Tail of a line that was already reported as too long
+                skipping = False
+                continue
+            yield None if len(line) > max_line_bytes else line
+        if len(buffer) > max_line_bytes and not skipping:
+            # Report it now and drop the rest of it as it arrives
+            yield None
+            skipping = True
+        if skipping:
+            buffer = b""
+    if buffer and not skipping:
+        yield None if len(buffer) > max_line_bytes else buffer
+
+
+async def run_operations(
+    oracle: AsyncOracleClient,
+    chunks: AsyncIterator[bytes],
+    concurrency: int,
+    max_line_bytes: int,
+) -> AsyncIterator[dict]:
+    """Run the operations of an NDJSON body; results in completion order"""
+    slots = asyncio.Semaphore(max(1, concurrency))
+    results: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency) * 2)
+    # Completion future of the newest operation per key
+    tails: Dict[Hashable, asyncio.Future] = {}
+    running = set()
+    loop = asyncio.get_running_loop()
+
+    async def execute(number: int, operation: dict):
+        key = operation_key(operation)
+        previous = tails.get(key)
+        done = tails[key] = loop.create_future()
+        try:
+            if previous is not None:
+                await previous
+            outcome = {"line": number, "op": operation["op"]}
+            try:
+                result, message = await OPERATION_HANDLERS[operation["op"]](
+                    oracle, operation
+                )
+            except Exception as e:
+                result, message = {"success": False, "error": str(e)}, None
+            if result.get("success"):
+                outcome.update(success=True, message=message)
+            else:
+                outcome.update(success=False, error=result.get("error"))
+                if result.get("status_code"):
+                    outcome["status_code"] = result["status_code"]
+        finally:
+            done.set_result(None)
+            if tails.get(key) is done:
+                del tails[key]
+        try:
+            await results.put(outcome)
+        finally:
+            slots.release()
+
+    async def read():
+        number = 0
+        try:
+            async for line in read_lines(chunks, max_line_bytes):
+                number += 1
+                if line is not None and not line.strip():
+                    continue
+                try:
+                    if line is None:
+                        raise ValueError(f"Line longer than {max_line_bytes} bytes")
+                    operation = parse_operation(line)
+                except ValueError as e:
+                    await results.put(
+                        {"line": number, "success": False, "error": str(e)}
+                    )
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(execute(number, operation))
+                running.add(task)
+                task.add_done_callback(running.discard)
+        except Exception as e:
+            # The body broke off (e.g. client disconnect): say so, but still
+            # report the operations already started
+            await results.put({"success": False, "error": f"Input aborted: {e}"})
+        if running:
+            await asyncio.gather(*running)
+        await results.put(_END)
+
+    reader = asyncio.create_task(read())
+    try:
+        while True:
+            result = await results.get()
+            if result is _END:
+                break
+            yield result
+    finally:
+        reader.cancel()
+        for task in list(running):
+            task.cancel()
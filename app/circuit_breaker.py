@@ -0,0 +1,127 @@
+# Circuit breaker per Oracle instance
+# When a Fusion pod is down or in maintenance, every call would otherwise wait
+# out its full timeout. After enough consecutive failures the breaker opens
+# and calls fail immediately; once the reset timeout has passed, a few trial
+# calls are let through (half-open) to find out whether the pod is back.
+
+import threading
+import time
+from typing import Dict, List
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Responses that say the pod itself is unhealthy; 500 is left out because
+# Oracle also uses it for some per-record validation errors
+FAILURE_STATUS_CODES = frozenset({502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an Oracle instance whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Thread-safe breaker shared by every client of one Oracle instance"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trials = 0
+        self.opened_count = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """Admit a call, or raise CircuitOpenError while the circuit is open"""
+        with self._lock:
+            if self.state == OPEN:
+                wait = self.opened_at + self.reset_timeout - time.monotonic()
+                if wait > 0:
+                    self.short_circuited += 1
+                    raise CircuitOpenError(
+                        f"Oracle instance {self.name} is unavailable (circuit open, "
+                        f"next trial in {wait:.1f}s)"
+                    )
+                self.state = HALF_OPEN
+                self._trials = 0
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_max_calls:
+                    self.short_circuited += 1
+                    raise CircuitOpenError(
+                        f"Oracle instance {self.name} is unavailable (circuit half-open, "
+                        f"trial call in progress)"
+                    )
+                self._trials += 1
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            self._trials = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.opened_count += 1
+
+    def release(self):
+        """Give back an admitted call that ended without a verdict on the pod"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "instance_url": self.name,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened_count": self.opened_count,
+                "short_circuited": self.short_circuited,
+                "retry_in": max(
+                    0.0, self.opened_at + self.reset_timeout - time.monotonic()
+                )
+                if self.state == OPEN
+                else 0.0,
+            }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per Oracle base URL, created on first use"""
+
+    def __init__(self, **breaker_options):
+        self._breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, base_url: str) -> CircuitBreaker:
+        key = base_url.rstrip("/")
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(
+                    key, **self._breaker_options
+                )
+            return breaker
+
+    def breakers(self) -> List[CircuitBreaker]:
+        with self._lock:
+            return list(self._breakers.values())
@@ -0,0 +1,255 @@
+# Registry of long-lived Oracle clients
+# Clients are keyed by (instance_url, username) so every API request for the
+# same Oracle tenant and credentials reuses one pooled HTTP session.
+
+import hmac
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+from app.async_oracle_client import AsyncOracleClient, create_async_http_client
+from app.circuit_breaker import CircuitBreakerRegistry
+from app.concurrency_limiter import AdaptiveLimiterRegistry
+from app.config import settings
+from app.retry_policy import RetryPolicy
+from app.user_cache import UserLookupCache
+
+logger = logging.getLogger("client_registry")
+
+
+class _RegistryEntry:
+    __slots__ = ("client", "last_used", "leases", "evicted")
+
+    def __init__(self, client, last_used: float):
+        self.client = client
+        self.last_used = last_used
+        self.leases = 0
+        # Set once the registry dropped the entry; the client is closed when
+        # its last lease is released
+        self.evicted = False
+
+
+class ClientLease:
+    """A registry client held by one caller until released
+
+    Use it as a context manager, or call release() when the work that
+    needs the client is over. Releasing more than once is harmless.
+    """
+
+    def __init__(self, registry: "OracleClientRegistry", entry: _RegistryEntry):
+        self._registry = registry
+        self._entry = entry
+        self.client = entry.client
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self._registry._release(self._entry)
+
+    def __enter__(self):
+        return self.client
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class OracleClientRegistry:
+    """Thread-safe LRU cache of Oracle clients with idle eviction
+
+    Clients are handed out as leases. A client evicted while leased (idle
+    timeout, LRU cap or a changed password) is dropped from the registry at
+    once but only closed when its last lease is released.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable,
+        max_entries: int,
+        idle_timeout: float,
+        close_client: Callable = lambda client: client.close(),
+    ):
+        self._client_factory = client_factory
+        self._close_client = close_client
+        self.max_entries = max_entries
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[Tuple[str, str], _RegistryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lease(self, instance_url: str, username: str, password: str) -> ClientLease:
+        """Lease the shared client for these credentials, creating it if needed"""
+        key = (instance_url.rstrip("/"), username)
+        now = time.monotonic()
+        evicted = []
+
+        with self._lock:
+            evicted.extend(self._pop_idle(now))
+
+            entry = self._entries.get(key)
+            if entry is not None and not hmac.compare_digest(
+                entry.client.password.encode(), password.encode()
+            ):
+                # Credentials changed: never hand out a client built for another password
+                evicted.extend(self._evict(self._entries.pop(key)))
+                entry = None
+
+            if entry is None:
+                entry = _RegistryEntry(
+                    self._client_factory(key[0], username, password), now
+                )
+                self._entries[key] = entry
+            else:
+                self._entries.move_to_end(key)
+                entry.last_used = now
+            entry.leases += 1
+
+            while len(self._entries) > self.max_entries:
+                _, lru_entry = self._entries.popitem(last=False)
+                evicted.extend(self._evict(lru_entry))
+
+        self._close_all(evicted)
+        return ClientLease(self, entry)
+
+    def evict_idle(self) -> int:
+        """Close clients that have not been used within the idle timeout"""
+        with self._lock:
+            evicted = self._pop_idle(time.monotonic())
+        self._close_all(evicted)
+        return len(evicted)
+
+    def find(self, instance_url: str, username: str, password: str):
+        """The registered client for these credentials, or None; never creates one"""
+        with self._lock:
+            entry = self._entries.get((instance_url.rstrip("/"), username))
+        if entry is None or not hmac.compare_digest(
+            entry.client.password.encode(), password.encode()
+        ):
+            return None
+        return entry.client
+
+    def clients(self) -> List:
+        """Snapshot of the clients currently held by the registry"""
+        with self._lock:
+            return [entry.client for entry in self._entries.values()]
+
+    def pop_all(self) -> List:
+        """Forget every registered client and return them unclosed, leased or not"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            for entry in entries:
+                entry.evicted = True
+                # Releasing an outstanding lease must not close it a second time
+                entry.leases = 0
+        return [entry.client for entry in entries]
+
+    def close_all(self):
+        """Close and forget every registered client"""
+        self._close_all(self.pop_all())
+
+    def _release(self, entry: _RegistryEntry):
+        with self._lock:
+            if entry.leases <= 0:
+                return
+            entry.leases -= 1
+            close = entry.evicted and entry.leases == 0
+            if not entry.evicted:
+                entry.last_used = time.monotonic()
+        if close:
+            self._close_all([entry.client])
+
+    def _evict(self, entry: _RegistryEntry) -> List:
+        # Called with the lock held, after the entry left the registry;
+        # returns the client if nothing uses it any more
+        entry.evicted = True
+        return [entry.client] if entry.leases == 0 else []
+
+    def _pop_idle(self, now: float) -> List:
+        # Entries are kept in LRU order, so idle ones are at the front;
+        # leased ones are in use however long ago they were handed out
+        evicted = []
+        for key, entry in list(self._entries.items()):
+            if now - entry.last_used < self.idle_timeout:
+                break
+            if entry.leases:
+                continue
+            del self._entries[key]
+            evicted.extend(self._evict(entry))
+        return evicted
+
+    def _close_all(self, clients: List):
+        for client in clients:
+            try:
+                self._close_client(client)
+            except Exception:
+                logger.exception("Failed to close evicted Oracle client")
+
+
+def _build_user_cache() -> UserLookupCache:
+    return UserLookupCache(
+        max_entries=settings.USER_CACHE_MAX_ENTRIES,
+        ttl=settings.USER_CACHE_TTL,
+        negative_ttl=settings.USER_CACHE_NEGATIVE_TTL,
+    )
+
+
+# Shared by the clients of every user of an instance
+circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+    half_open_max_calls=settings.CIRCUIT_HALF_OPEN_MAX_CALLS,
+)
+
+concurrency_limiters = AdaptiveLimiterRegistry(
+    initial_limit=settings.ORACLE_CONCURRENCY_INITIAL,
+    min_limit=settings.ORACLE_CONCURRENCY_MIN,
+    max_limit=settings.ORACLE_CONCURRENCY_MAX,
+    backoff_factor=settings.ORACLE_CONCURRENCY_BACKOFF,
+    latency_tolerance=settings.ORACLE_LATENCY_TOLERANCE,
+)
+
+
+def _build_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        attempts=settings.ORACLE_RETRY_ATTEMPTS,
+        base_delay=settings.ORACLE_RETRY_BASE_DELAY,
+        max_delay=settings.ORACLE_RETRY_MAX_DELAY,
+    )
+
+
+def build_async_oracle_client(
+    instance_url: str, username: str, password: str, **overrides
+) -> AsyncOracleClient:
+    """A new AsyncOracleClient wired to the instance's shared breaker and limiter
+
+    Keyword arguments replace the configured pieces, e.g. http_client.
+    """
+    options = {
+        "user_cache": _build_user_cache(),
+        "retry_policy": _build_retry_policy(),
+        "circuit_breaker": circuit_breakers.get(instance_url),
+        "concurrency_limiter": concurrency_limiters.get(instance_url),
+    }
+    options.update(overrides)
+    if "http_client" not in options:
+        options["http_client"] = create_async_http_client(
+            max_connections=settings.ORACLE_POOL_MAXSIZE,
+            keepalive_expiry=settings.ORACLE_KEEPALIVE_EXPIRY,
+        )
+    return AsyncOracleClient(instance_url, username, password, **options)
+
+
+async_oracle_clients = OracleClientRegistry(
+    client_factory=build_async_oracle_client,
+    max_entries=settings.ORACLE_CLIENT_MAX_ENTRIES,
+    idle_timeout=settings.ORACLE_CLIENT_IDLE_TIMEOUT,
+)
+
+
+def lease_async_oracle_client(
+    instance_url: str, username: str, password: str
+) -> ClientLease:
+    """Lease a pooled AsyncOracleClient shared across requests on the event loop"""
+    return async_oracle_clients.lease(instance_url, username, password)
@@ -0,0 +1,162 @@
+# Adaptive (AIMD) limit on in-flight calls per Oracle instance
+# The limit grows by about one slot per round trip while calls succeed at a
+# healthy latency, and is cut in half on 429/502/503/504 responses, timeouts
+# or latency spikes. One limiter is shared by all clients of an instance, so
+# bulk rows, Excel uploads and user enumeration all draw from the same
+# budget of concurrent requests.
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.circuit_breaker import FAILURE_STATUS_CODES
+
+# Throttling plus the responses the circuit breaker counts against the pod; a
+# plain 500 is often a per-record error and says nothing about load
+OVERLOAD_STATUS_CODES = FAILURE_STATUS_CODES | {429}
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop, future):
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveLimiter:
+    """Thread-safe AIMD limiter, shared by clients on different event loops"""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 3.0,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque()
+        # Slow moving average of healthy latencies, the spike reference
+        self.baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+    def _has_slot(self) -> bool:
+        return self._in_flight < int(self.limit)
+
+    async def acquire_async(self):
+        """Wait on the running event loop until a slot is free"""
+        with self._lock:
+            if self._has_slot() and not self._waiters:
+                self._in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            raise
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False):
+        """Free a slot and adjust the limit from the call's outcome
+
+        latency is None for calls that ended without telling anything about
+        Oracle's health (for example when the caller's deadline ran out).
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if latency is not None:
+                self._adjust(latency, overloaded)
+            self._wake()
+
+    def _adjust(self, latency: float, overloaded: bool):
+        baseline = self.baseline_latency
+        spike = (
+            baseline is not None
+            and latency > self.latency_tolerance * baseline
+            and latency > 1.0
+        )
+        if overloaded or spike:
+            now = time.monotonic()
+            # At most one cut per round trip, however many calls fail at once
+            if now - self._last_decrease >= (baseline or latency):
+                self.limit = max(self.min_limit, self.limit * self.backoff_factor)
+                self._last_decrease = now
+                self.decreases += 1
+            return
+
+        self.baseline_latency = (
+            latency if baseline is None else 0.9 * baseline + 0.1 * latency
+        )
+        if self.limit < self.max_limit and self._in_flight + 1 >= int(self.limit):
+            # Only grow while the current limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.increases += 1
+
+    def _wake(self):
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            waiter.granted = True
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "instance_url": self.name,
+                "limit": int(self.limit),
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "baseline_latency": self.baseline_latency,
+                "increases": self.increases,
+                "decreases": self.decreases,
+            }
+
+
+class AdaptiveLimiterRegistry:
+    """One limiter per Oracle base URL, created on first use"""
+
+    def __init__(self, **limiter_options):
+        self._limiter_options = limiter_options
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, base_url: str) -> AdaptiveLimiter:
+        key = base_url.rstrip("/")
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = AdaptiveLimiter(
+                    key, **self._limiter_options
+                )
+            return limiter
+
+    def limiters(self) -> List[AdaptiveLimiter]:
+        with self._lock:
+            return list(self._limiters.values())
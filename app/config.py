@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import os
+from typing import Dict, Optional
 
 load_dotenv()
 
@@ -10,6 +11,81 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ORACLE_API_BASE_URL: str
 
+    # Outbound Oracle connection pooling
+    ORACLE_POOL_MAXSIZE: int = 20
+    ORACLE_KEEPALIVE_EXPIRY: int = 60
+    ORACLE_CLIENT_IDLE_TIMEOUT: int = 600
+    ORACLE_CLIENT_MAX_ENTRIES: int = 32
+
+    # Username -> GUID/SCIM id cache
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_NEGATIVE_TTL: int = 30
+
+    # Retries of transient Oracle failures (429/502/503/504, connection
+    # errors); attempts per HTTP method, methods not listed are sent once
+    ORACLE_RETRY_ATTEMPTS: Dict[str, int] = {"GET": 3, "PATCH": 3}
+    ORACLE_RETRY_BASE_DELAY: float = 0.5
+    ORACLE_RETRY_MAX_DELAY: float = 20
+
+    # Circuit breaker per Oracle instance: opens after this many consecutive
+    # failures and lets a trial call through after the reset timeout
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30
+    CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+
+    # Adaptive (AIMD) limit on in-flight Oracle calls per instance
+    ORACLE_CONCURRENCY_INITIAL: int = 8
+    ORACLE_CONCURRENCY_MIN: int = 1
+    ORACLE_CONCURRENCY_MAX: int = 64
+    ORACLE_CONCURRENCY_BACKOFF: float = 0.5
+    ORACLE_LATENCY_TOLERANCE: float = 3.0
+
+    # Time budget per API request for all of its Oracle calls; callers may
+    # ask for a different one with X-Request-Timeout or ?request_timeout=
+    REQUEST_TIMEOUT: float = 120
+    REQUEST_TIMEOUT_MAX: float = 900
+
+    # Overall deadline for /users/details and its chained Oracle calls
+    USER_DETAILS_TIMEOUT: float = 30
+
+    # Bulk endpoints: rows processed in parallel per request
+    BULK_DEFAULT_CONCURRENCY: int = 8
+    BULK_MAX_CONCURRENCY: int = 32
+
+    # Bulk role grants switch to the role's members endpoint at this many rows
+    ROLE_MEMBERS_THRESHOLD: int = 20
+    ROLE_MEMBERS_BATCH_SIZE: int = 100
+
+    # Multi-operation requests: SCIM /Bulk for users, REST batch for AORs
+    ORACLE_BULK_ENABLED: bool = False
+    SCIM_BULK_MAX_OPERATIONS: int = 100
+    SCIM_BULK_MAX_PAYLOAD_BYTES: int = 1048576
+    SCIM_BULK_FAIL_ON_ERRORS: Optional[int] = None
+    REST_BATCH_MAX_PARTS: int = 50
+
+    # Processes that parse uploaded Excel files; 0 parses in a thread instead
+    EXCEL_PARSE_WORKERS: int = 2
+    # Upload caps, and rows per parsed chunk handed on to Oracle calls
+    EXCEL_MAX_UPLOAD_BYTES: int = 268435456
+    EXCEL_MAX_ROWS: int = 500000
+    EXCEL_CHUNK_ROWS: int = 5000
+    # Parsed chunks that may wait for the caller before the parser pauses
+    EXCEL_PENDING_CHUNKS: int = 2
+
+    # /bulk/stream: longest accepted NDJSON line, in bytes
+    BULK_STREAM_MAX_LINE_BYTES: int = 65536
+
+    # Background bulk jobs: jobs running at once per process, and how often
+    # their progress and row results are written to the database (seconds)
+    JOB_MAX_RUNNING: int = 2
+    JOB_FLUSH_INTERVAL: float = 1.0
+
+    # Job event streams: seconds between progress events, and between
+    # heartbeats that keep idle connections open through proxies
+    JOB_EVENTS_PROGRESS_INTERVAL: float = 1.0
+    JOB_EVENTS_HEARTBEAT: float = 15.0
+
     class Config:
         env_file = ".env"
 
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
 from app import models, schemas
 from passlib.context import CryptContext
 
@@ -40,3 +41,72 @@ def create_log(
     db.commit()
     db.refresh(db_log)
     return db_log
+
+
+def create_bulk_job(
+    db: Session,
+    job_id: str,
+    job_type: str,
+    total_rows: int,
+    instance_url: str = None,
+    oracle_username: str = None,
+):
+    db_job = models.BulkJob(
+        id=job_id,
+        job_type=job_type,
+        status="queued",
+        instance_url=instance_url,
+        oracle_username=oracle_username,
+        total_rows=total_rows,
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def get_bulk_job(db: Session, job_id: str):
+    return db.query(models.BulkJob).filter(models.BulkJob.id == job_id).first()
+
+
+def get_bulk_jobs(db: Session, limit: int = 50):
+    return (
+        db.query(models.BulkJob)
+        .order_by(models.BulkJob.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def update_bulk_job(db: Session, job_id: str, **fields):
+    db.query(models.BulkJob).filter(models.BulkJob.id == job_id).update(fields)
+    db.commit()
+
+
+def add_bulk_job_rows(db: Session, job_id: str, rows: list):
+    db.add_all(models.BulkJobRow(job_id=job_id, **row) for row in rows)
+    db.commit()
+
+
+def get_bulk_job_rows(db: Session, job_id: str, offset: int = 0, limit: int = 100):
+    return (
+        db.query(models.BulkJobRow)
+        .filter(models.BulkJobRow.job_id == job_id)
+        .order_by(models.BulkJobRow.row_number)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+def interrupt_unfinished_bulk_jobs(db: Session) -> int:
+    count = (
+        db.query(models.BulkJob)
+        .filter(models.BulkJob.status.in_(["queued", "running"]))
+        .update(
+            {"status": "interrupted", "finished_at": func.now()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return count
@@ -0,0 +1,101 @@
+# End-to-end deadline budgets for Oracle calls
+# Each API request gets one time budget. Every Oracle call made on its behalf
+# shrinks its own timeout to whatever is left, so a chain of calls can never
+# hold a worker for longer than the request was allowed to take.
+
+import asyncio
+import contextvars
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an Oracle call would start after the request budget ran out"""
+
+
+class Budget:
+    __slots__ = ("seconds", "deadline", "exceeded")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        # Set once a call was refused or timed out because of this budget
+        self.exceeded = False
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+_budget: contextvars.ContextVar[Optional[Budget]] = contextvars.ContextVar(
+    "oracle_request_budget", default=None
+)
+
+
+def start_budget(seconds: float) -> contextvars.Token:
+    """Give the current context a budget of seconds; returns a reset token"""
+    return _budget.set(Budget(seconds))
+
+
+def reset_budget(token: contextvars.Token):
+    _budget.reset(token)
+
+
+def clear_budget():
+    """Drop the budget for the rest of the current context"""
+    _budget.set(None)
+
+
+def current_budget() -> Optional[Budget]:
+    return _budget.get()
+
+
+def remaining(default: float) -> float:
+    """The smaller of default and the time left in the budget"""
+    budget = _budget.get()
+    if budget is None:
+        return default
+    return max(0.0, min(default, budget.remaining()))
+
+
+def call_timeout(default: float) -> float:
+    """Timeout for the next Oracle call, raising once the budget is spent"""
+    budget = _budget.get()
+    if budget is None:
+        return default
+    left = budget.remaining()
+    if left <= 0:
+        budget.exceeded = True
+        raise DeadlineExceeded(
+            f"Request deadline of {budget.seconds}s exceeded before calling Oracle"
+        )
+    return min(default, left)
+
+
+async def within_budget(awaitable, waiting_for: str):
+    """Await awaitable, raising DeadlineExceeded once the budget runs out"""
+    budget = _budget.get()
+    if budget is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(0.0, budget.remaining()))
+    except asyncio.TimeoutError:
+        budget.exceeded = True
+        raise DeadlineExceeded(
+            f"Request deadline of {budget.seconds}s exceeded waiting for {waiting_for}"
+        )
+
+
+def deadline_passed() -> bool:
+    """True (and the budget marked exceeded) if the budget has run out"""
+    budget = _budget.get()
+    if budget is None or budget.remaining() > 0:
+        return False
+    budget.exceeded = True
+    return True
+
+
+class DeadlineStop:
+    """Stop flag for bulk runners: set once the current budget has run out"""
+
+    def is_set(self) -> bool:
+        return deadline_passed()
@@ -0,0 +1,435 @@
+# Excel parsing for bulk uploads, off the event loop
+# Parsing a workbook is CPU-bound and holds the GIL, so a thread would still
+# stall every other request on the worker. Uploads are spooled to a private
+# temp directory and parsed in a small pool of separate processes, which
+# stream the sheet with openpyxl's read-only reader and write validated
+# chunks of rows next to it. The caller loads each chunk as soon as it is
+# announced, so Oracle calls start while the rest of the file is parsed. The
+# parser pauses while a few chunks wait for the caller and stops when the
+# caller does, so memory and disk stay bounded by the chunk size.
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("excel_import")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_manager = None
+_pool_lock = threading.Lock()
+
+SPOOL_BLOCK_SIZE = 1024 * 1024
+# How often a waiting parser or reader checks whether the other side stopped
+STOP_POLL_SECONDS = 0.5
+
+
+# Columns each operation needs, and optional ones with their defaults
+REQUIRED_COLUMNS = {
+    "role_assignment": ("username", "role_name"),
+    "aor_assignment": ("username", "aor_name"),
+}
+OPTIONAL_COLUMNS = {"aor_assignment": {"aor_type": "GENERAL"}}
+
+
+def _header_key(name) -> str:
+    # Case, spaces, hyphens and underscores do not tell column names apart
+    return re.sub(r"[\s_\-]+", "", str(name)).lower()
+
+
+# Header key -> canonical column name, for every known column
+_CANONICAL_HEADERS = {
+    _header_key(column): column
+    for columns in list(REQUIRED_COLUMNS.values()) + list(OPTIONAL_COLUMNS.values())
+    for column in columns
+}
+
+
+def normalize_header(name) -> str:
+    """Canonical column name: "User Name", "user-name", "USERNAME" become username
+
+    Only the spelling of a known column name is forgiven; other headers are
+    returned trimmed and otherwise unchanged.
+    """
+    return _CANONICAL_HEADERS.get(_header_key(name), str(name).strip())
+
+
+class ExcelValidationError(ValueError):
+    """The sheet as a whole cannot be used (unknown operation, missing columns)"""
+
+
+class UploadTooLargeError(ExcelValidationError):
+    """The upload exceeds the configured size or row cap"""
+
+
+class ExcelChunk(NamedTuple):
+    rows: List[Tuple[int, dict]]
+    rejected: List[dict]
+    # Data rows the sheet declares, when its dimensions are recorded
+    total_rows: Optional[int]
+
+
+def prepare_rows(
+    df: pd.DataFrame,
+    operation_type: str,
+    first_row: int = 1,
+    seen: Optional[Dict[tuple, int]] = None,
+) -> Tuple[List[Tuple[int, dict]], List[dict]]:
+    """Normalize a sheet and split it into runnable rows and rejected rows
+
+    Everything is done column-wise: headers are mapped to their canonical
+    names (see normalize_header) and values are trimmed, rows with a blank
+    required value and exact repeats of an earlier row (usernames compared
+    case-insensitively) are rejected. Rejected rows use the upload error
+    format, {row, username, error}. Row numbers count data rows from
+    first_row.
+
+    When a sheet is prepared in chunks, pass the same seen dict to every
+    call so repeats of rows from earlier chunks are caught too.
+    """
+    required = REQUIRED_COLUMNS.get(operation_type)
+    if required is None:
+        raise ExcelValidationError(f"Unsupported operation type: {operation_type}")
+
+    optional = OPTIONAL_COLUMNS.get(operation_type, {})
+    columns = list(required) + list(optional)
+    headers = [normalize_header(name) for name in df.columns]
+    repeated = sorted({name for name in columns if headers.count(name) > 1})
+    if repeated:
+        raise ExcelValidationError(f"More than one column for: {', '.join(repeated)}")
+    missing = [column for column in required if column not in headers]
+    if missing:
+        raise ExcelValidationError(
+            f"Missing required column(s) for {operation_type}: {', '.join(missing)}"
+        )
+
+    # Unused columns are dropped, so their headers may repeat freely
+    used = [index for index, name in enumerate(headers) if name in columns]
+    df = df.iloc[:, used].set_axis([headers[index] for index in used], axis=1)
+    frame = df.reindex(columns=columns)
+    for column in columns:
+        # Blank cells become None, everything else trimmed text
+        values = frame[column].astype(str).str.strip()
+        frame[column] = values.where(frame[column].notna() & values.ne(""), None)
+    for column, default in optional.items():
+        frame[column] = frame[column].fillna(default)
+    frame.index = pd.RangeIndex(first_row, first_row + len(frame))
+
+    blank = frame[list(required)].isna()
+    invalid = blank.any(axis=1)
+
+    key = frame.assign(username=frame["username"].str.lower())
+    original = (
+        pd.Series(frame.index, index=frame.index)
+        .groupby([key[column] for column in columns], dropna=False)
+        .transform("first")
+    )
+    duplicate = ~invalid & (original != frame.index)
+    if seen is not None:
+        fresh = frame.index[~invalid & ~duplicate]
+        keys = zip(*(key.loc[fresh, column].tolist() for column in columns))
+        original.loc[fresh] = [
+            seen.setdefault(row_key, row) for row_key, row in zip(keys, fresh.tolist())
+        ]
+        duplicate = ~invalid & (original != frame.index)
+
+    usernames = frame["username"].fillna("")
+    rejected = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "row": frame.index[invalid],
+                    "username": usernames[invalid],
+                    "error": "Missing value for " + blank[invalid].idxmax(axis=1),
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "row": frame.index[duplicate],
+                    "username": usernames[duplicate],
+                    "error": "Duplicate of row " + original[duplicate].astype(str),
+                }
+            ),
+        ]
+    ).sort_values("row")
+
+    valid = frame[~invalid & ~duplicate]
+    # Plain zips: DataFrame.to_dict boxes every cell and is far slower
+    records = [
+        dict(zip(columns, values))
+        for values in zip(*(valid[column].tolist() for column in columns))
+    ]
+    rows = list(zip(valid.index.tolist(), records))
+    return rows, rejected.to_dict("records")
+
+
+def _sheet_chunks(path: str, chunk_rows: int):
+    """Yield (declared data rows, DataFrame) per chunk of the first sheet"""
+    if path.lower().endswith(".xls"):
+        # openpyxl cannot read the legacy format; such files are capped at
+        # 65536 rows, so pandas reading it whole stays affordable
+        df = pd.read_excel(path, dtype=str)
+        for start in range(0, max(len(df), 1), chunk_rows):
+            yield len(df), df.iloc[start : start + chunk_rows]
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # From the sheet's recorded dimensions; some writers leave them out
+        declared = sheet.max_row - 1 if sheet.max_row and sheet.max_row > 1 else None
+        values = sheet.iter_rows(values_only=True)
+        header = next(values, None)
+        if header is None:
+            yield 0, pd.DataFrame()
+            return
+        header = [
+            f"column_{i}" if name is None else name for i, name in enumerate(header)
+        ]
+
+        chunk = []
+        emitted = False
+        for row in values:
+            # Like pandas, skip rows without a single value
+            if any(value is not None for value in row):
+                chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield declared, pd.DataFrame(chunk, columns=header, dtype=object)
+                chunk = []
+                emitted = True
+        if chunk or not emitted:
+            yield declared, pd.DataFrame(chunk, columns=header, dtype=object)
+    finally:
+        workbook.close()
+
+
+def parse_excel_chunks(
+    path: str,
+    operation_type: str,
+    chunk_rows: int,
+    max_rows: int,
+    events,
+    slots,
+    stop,
+):
+    """Parse path chunk by chunk, announcing each one on the events queue
+
+    Each validated chunk is pickled next to the workbook and announced as
+    ("chunk", file); the stream ends with ("end", None) or ("error",
+    exception). A slot is taken from the slots semaphore per chunk and given
+    back by the reader, so only a few chunks wait on disk at a time. Once
+    the stop event is set, parsing ends without a last word. Runs in a
+    parser process (or a thread, see iter_excel_chunks).
+    """
+    try:
+        directory = os.path.dirname(path)
+        seen: Dict[tuple, int] = {}
+        next_row = 1
+        for number, (declared, df) in enumerate(_sheet_chunks(path, chunk_rows)):
+            if declared is not None and declared > max_rows:
+                raise UploadTooLargeError(
+                    f"Sheet has {declared} rows, more than the limit of {max_rows}"
+                )
+            if next_row - 1 + len(df) > max_rows:
+                raise UploadTooLargeError(
+                    f"Sheet has more than the limit of {max_rows} rows"
+                )
+            rows, rejected = prepare_rows(df, operation_type, next_row, seen)
+            next_row += len(df)
+
+            while not slots.acquire(True, STOP_POLL_SECONDS):
+                if stop.is_set():
+                    return
+            if stop.is_set():
+                return
+            chunk_path = os.path.join(directory, f"chunk-{number:06d}.pickle")
+            with open(chunk_path, "wb") as chunk_file:
+                pickle.dump(ExcelChunk(rows, rejected, declared), chunk_file)
+            events.put(("chunk", chunk_path))
+        events.put(("end", None))
+    except Exception as e:
+        events.put(("error", e))
+
+
+def _get_pool(max_workers: int):
+    global _pool, _manager
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process runs threads that a forked
+            # child could inherit in a locked state
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+            # Queues and locks handed to pool tasks have to be manager proxies
+            _manager = context.Manager()
+        return _pool, _manager
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def spool_upload(upload, max_bytes: int) -> str:
+    """Copy an upload into a new private temp directory; returns the file path
+
+    Raises UploadTooLargeError, leaving nothing behind, once more than
+    max_bytes have been received.
+    """
+    directory = tempfile.mkdtemp(prefix="excel-upload-")
+    path = os.path.join(directory, "upload" + os.path.splitext(upload.filename)[1])
+    try:
+        size = 0
+        with open(path, "wb") as spool:
+            while True:
+                block = await upload.read(SPOOL_BLOCK_SIZE)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"Upload is larger than the limit of {max_bytes} bytes"
+                    )
+                await run_in_threadpool(spool.write, block)
+    except BaseException:
+        discard_upload(path)
+        raise
+    return path
+
+
+def discard_upload(path: str):
+    """Remove a spooled upload and any chunks parsed from it"""
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def _load_chunk(chunk_path: str) -> ExcelChunk:
+    with open(chunk_path, "rb") as chunk_file:
+        chunk = pickle.load(chunk_file)
+    os.remove(chunk_path)
+    return chunk
+
+
+def _discard_chunks(events):
+    """Remove chunk files that were announced but never loaded"""
+    while True:
+        try:
+            kind, value = events.get_nowait()
+        except queue.Empty:
+            return
+        if kind == "chunk":
+            try:
+                os.remove(value)
+            except OSError:
+                pass
+
+
+async def iter_excel_chunks(
+    path: str,
+    operation_type: str,
+    workers: int,
+    chunk_rows: int,
+    max_rows: int,
+    pending_chunks: int = 2,
+) -> AsyncIterator[ExcelChunk]:
+    """Validated chunks of a spooled upload, as soon as each one is parsed
+
+    workers is the size of the parsing process pool; 0 parses in the
+    thread pool instead, for platforms where child processes are unwelcome.
+    The parser runs at most pending_chunks chunks ahead of the caller, and
+    stops when the caller stops iterating. The caller owns path and removes
+    it with discard_upload when done.
+    """
+    slot_count = max(1, pending_chunks)
+    if workers <= 0:
+        events = queue.Queue()
+        slots = threading.Semaphore(slot_count)
+        stop = threading.Event()
+        parsing = asyncio.ensure_future(
+            run_in_threadpool(
+                parse_excel_chunks,
+                path,
+                operation_type,
+                chunk_rows,
+                max_rows,
+                events,
+                slots,
+                stop,
+            )
+        )
+        pool = None
+    else:
+        pool, manager = _get_pool(workers)
+        events = manager.Queue()
+        slots = manager.Semaphore(slot_count)
+        stop = manager.Event()
+        parsing = asyncio.get_running_loop().run_in_executor(
+            pool,
+            parse_excel_chunks,
+            path,
+            operation_type,
+            chunk_rows,
+            max_rows,
+            events,
+            slots,
+            stop,
+        )
+
+    try:
+        while True:
+            try:
+                kind, value = await run_in_threadpool(
+                    events.get, True, STOP_POLL_SECONDS
+                )
+            except queue.Empty:
+                if parsing.done():
+                    try:
+                        parsing.result()
+                    except BrokenProcessPool:
+                        # A parser process died (e.g. out of memory); start afresh
+                        logger.exception("Excel parsing process pool broke")
+                        _discard_pool(pool)
+                        raise
+                    # Finished without a last word: only possible if it was killed
+                    raise RuntimeError("Excel parser stopped unexpectedly")
+                continue
+            if kind == "end":
+                return
+            if kind == "error":
+                raise value
+            yield await run_in_threadpool(_load_chunk, value)
+            # The caller is done with the chunk and wants the next one
+            slots.release()
+    finally:
+        # Stop the parser even if the caller gave up early, wait for it so
+        # it cannot write another chunk, then remove the unread ones
+        await run_in_threadpool(stop.set)
+        await asyncio.wait([parsing])
+        await run_in_threadpool(_discard_chunks, events)
+
+
+def shutdown_parse_pool():
+    """Stop the parsing processes, if any were started"""
+    global _pool, _manager
+    with _pool_lock:
+        pool, _pool = _pool, None
+        manager, _manager = _manager, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+    if manager is not None:
+        manager.shutdown()
@@ -0,0 +1,373 @@
+# Background execution of bulk jobs
+# Submitting a job returns its id at once; the rows then run on the event loop
+# while the client polls for progress. Row outcomes are buffered and written
+# to the database in batches, so results outlive the submitting request and
+# a restart. Oracle passwords stay in memory only and are never persisted.
+# Subscribers (the SSE progress stream) get every row outcome as it lands.
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app import crud, models
+from app.config import settings
+from app.database import Base, SessionLocal
+from app.deadlines import clear_budget
+
+logger = logging.getLogger("jobs")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class RunningJob:
+    """In-memory state of a job queued or running in this process"""
+
+    def __init__(
+        self,
+        job_id: str,
+        job_type: str,
+        total_rows: int,
+        instance_url: Optional[str] = None,
+    ):
+        self.id = job_id
+        self.job_type = job_type
+        self.total_rows = total_rows
+        self.instance_url = instance_url
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.finished = False
+        self.processed_rows = 0
+        self.succeeded_rows = 0
+        self.failed_rows = 0
+        self.started_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_event = threading.Event()
+        self._pending_rows: List[Dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Stop starting new rows; rows already sent to Oracle still finish"""
+        self.cancel_event.set()
+
+    def record(
+        self,
+        row_number: int,
+        username: Optional[str],
+        success: bool,
+        message: Optional[str] = None,
+        error: Optional[str] = None,
+    ):
+        """Count a finished row and queue its outcome for the next flush"""
+        self.processed_rows += 1
+        if success:
+            self.succeeded_rows += 1
+        else:
+            self.failed_rows += 1
+        row = {
+            "row_number": row_number,
+            "username": username,
+            "success": success,
+            "message": message,
+            "error": error,
+        }
+        self._pending_rows.append(row)
+        self._publish(("row", row))
+
+    def counters(self) -> Dict:
+        return {
+            "total_rows": self.total_rows,
+            "processed_rows": self.processed_rows,
+            "succeeded_rows": self.succeeded_rows,
+            "failed_rows": self.failed_rows,
+        }
+
+    def progress(self) -> Dict:
+        """Counters with throughput and a naive ETA from the average rate"""
+        elapsed = (
+            time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        )
+        rate = self.processed_rows / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.total_rows - self.processed_rows)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            **self.counters(),
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(rate, 2),
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+        }
+
+    def take_pending_rows(self) -> List[Dict]:
+        rows, self._pending_rows = self._pending_rows, []
+        return rows
+
+    def subscribe(self, max_queued: int = 1000) -> asyncio.Queue:
+        """Queue of ("row", row) events, ended by ("done", None)"""
+        queue = asyncio.Queue(maxsize=max_queued)
+        if self.finished:
+            queue.put_nowait(("done", None))
+        else:
+            self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def _publish(self, event):
+        for queue in self._subscribers:
+            if event[0] == "done":
+                # Make room so the end of the stream is never lost
+                while queue.full():
+                    queue.get_nowait()
+            elif queue.full():
+                # A stalled reader misses rows, never the counters
+                continue
+            queue.put_nowait(event)
+
+    def finish(self):
+        self.finished = True
+        self._publish(("done", None))
+        self._subscribers.clear()
+
+
+class JobManager:
+    """Runs bulk jobs in the background and persists their progress"""
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        max_running: int = 2,
+        flush_interval: float = 1.0,
+    ):
+        self._session_factory = session_factory
+        self.max_running = max_running
+        self.flush_interval = flush_interval
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, RunningJob] = {}
+        # Set by disable() when the job database cannot be used
+        self.unavailable_reason: Optional[str] = None
+
+    def _with_db(self, fn: Callable, *args, **kwargs):
+        db = self._session_factory()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Optional[RunningJob]:
+        """The live state of a job running in this process, if any"""
+        return self._jobs.get(job_id)
+
+    async def submit(
+        self,
+        job_type: str,
+        total_rows: int,
+        run: Callable[[RunningJob], Awaitable[None]],
+        instance_url: Optional[str] = None,
+        oracle_username: Optional[str] = None,
+        cleanup: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> RunningJob:
+        """Record a new job and start it in the background
+
+        run executes the rows and reports each outcome with job.record().
+        cleanup is awaited once the job is over, whether run was ever called
+        or not.
+        """
+        job = RunningJob(uuid.uuid4().hex, job_type, total_rows, instance_url)
+        await run_in_threadpool(
+            self._with_db,
+            crud.create_bulk_job,
+            job.id,
+            job_type,
+            total_rows,
+            instance_url,
+            oracle_username,
+        )
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._execute(job, run, cleanup))
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a running job to stop; False if it is not running here"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    async def _execute(self, job: RunningJob, run, cleanup):
+        # The job outlives the request that submitted it, so the request's
+        # deadline budget must not apply to its Oracle calls
+        clear_budget()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.max_running))
+
+        status = "failed"
+        error = None
+        flusher = None
+        try:
+            async with self._slots:
+                if not job.cancelled:
+                    job.status = "running"
+                    job.started_at = time.monotonic()
+                    await self._flush(job, status="running", started_at=_now())
+                    flusher = asyncio.create_task(self._flush_periodically(job))
+                    await run(job)
+            status = "cancelled" if job.cancelled else "completed"
+        except asyncio.CancelledError:
+            status = "interrupted"
+            raise
+        except Exception as e:
+            logger.exception(f"Bulk job {job.id} failed")
+            error = str(e)
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+                await asyncio.gather(flusher, return_exceptions=True)
+            job.status = status
+            job.error = error
+            await self._flush(job, status=status, error=error, finished_at=_now())
+            job.finish()
+            self._jobs.pop(job.id, None)
+            if cleanup is not None:
+                await cleanup()
+
+    async def _flush_periodically(self, job: RunningJob):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush(job)
+
+    async def _flush(self, job: RunningJob, **fields):
+        async with job._flush_lock:
+            rows = job.take_pending_rows()
+            fields.update(job.counters())
+            try:
+                await run_in_threadpool(
+                    self._with_db, self._write, job.id, rows, fields
+                )
+            except Exception:
+                logger.exception(f"Failed to persist progress of bulk job {job.id}")
+
+    @staticmethod
+    def _write(db, job_id: str, rows: List[Dict], fields: Dict):
+        if rows:
+            crud.add_bulk_job_rows(db, job_id, rows)
+        crud.update_bulk_job(db, job_id, **fields)
+
+    async def describe(
+        self, job_id: str, offset: int = 0, limit: int = 100
+    ) -> Optional[Dict]:
+        """Job status with one page of row outcomes, or None if unknown"""
+
+        def load(db):
+            db_job = crud.get_bulk_job(db, job_id)
+            if db_job is None:
+                return None
+            rows = crud.get_bulk_job_rows(db, job_id, offset, limit)
+            return db_job, rows
+
+        loaded = await run_in_threadpool(self._with_db, load)
+        if loaded is None:
+            return None
+        db_job, rows = loaded
+
+        status = {
+            "job_id": db_job.id,
+            "job_type": db_job.job_type,
+            "status": db_job.status,
+            "total_rows": db_job.total_rows,
+            "processed_rows": db_job.processed_rows,
+            "succeeded_rows": db_job.succeeded_rows,
+            "failed_rows": db_job.failed_rows,
+            "error": db_job.error,
+            "created_at": db_job.created_at,
+            "started_at": db_job.started_at,
+            "finished_at": db_job.finished_at,
+            "offset": offset,
+            "limit": limit,
+            "results": [
+                {
+                    "row_number": row.row_number,
+                    "username": row.username,
+                    "success": row.success,
+                    "message": row.message,
+                    "error": row.error,
+                }
+                for row in rows
+            ],
+        }
+        job = self._jobs.get(job_id)
+        if job is not None:
+            # Counters in memory are ahead of the last flush
+            status["status"] = job.status
+            status.update(job.counters())
+        return status
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict]:
+        db_jobs = await run_in_threadpool(self._with_db, crud.get_bulk_jobs, limit)
+        jobs = []
+        for db_job in db_jobs:
+            summary = {
+                "job_id": db_job.id,
+                "job_type": db_job.job_type,
+                "status": db_job.status,
+                "total_rows": db_job.total_rows,
+                "processed_rows": db_job.processed_rows,
+                "created_at": db_job.created_at,
+            }
+            job = self._jobs.get(db_job.id)
+            if job is not None:
+                summary["status"] = job.status
+                summary["processed_rows"] = job.processed_rows
+            jobs.append(summary)
+        return jobs
+
+    @property
+    def available(self) -> bool:
+        return self.unavailable_reason is None
+
+    def disable(self, reason: str):
+        """Refuse new jobs and lookups, e.g. when the database is unreachable"""
+        self.unavailable_reason = reason
+
+    def prepare_storage(self) -> int:
+        """Create the job tables if missing and mark leftover jobs interrupted
+
+        Returns the number of jobs a previous process left unfinished. Raises
+        if the database cannot be used.
+        """
+        return self._with_db(self._prepare_storage)
+
+    @staticmethod
+    def _prepare_storage(db) -> int:
+        Base.metadata.create_all(
+            bind=db.get_bind(),
+            tables=[models.BulkJob.__table__, models.BulkJobRow.__table__],
+        )
+        return crud.interrupt_unfinished_bulk_jobs(db)
+
+    async def shutdown(self):
+        """Stop running jobs; they are recorded as interrupted"""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_manager = JobManager(
+    max_running=settings.JOB_MAX_RUNNING, flush_interval=settings.JOB_FLUSH_INTERVAL
+)
@@ -1,13 +1,81 @@
 import logging
+from contextlib import asynccontextmanager
 
 logging.basicConfig(level=logging.INFO)
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from app import api
+from app.client_registry import async_oracle_clients
+from app.config import settings
+from app.deadlines import current_budget, reset_budget, start_budget
+from app.excel_import import shutdown_parse_pool
+from app.jobs import job_manager
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the job tables; jobs cut short by a previous process can never finish
+    jobs_logger = logging.getLogger("jobs")
+    try:
+        interrupted = await run_in_threadpool(job_manager.prepare_storage)
+    except Exception:
+        # The rest of the API does not need the database
+        jobs_logger.exception(
+            "Job database unavailable at startup; the /jobs endpoints are disabled"
+        )
+        job_manager.disable("Job database unavailable; see the server log")
+    else:
+        if interrupted:
+            jobs_logger.warning(
+                f"Marked {interrupted} unfinished bulk job(s) as interrupted"
+            )
+    yield
+    await job_manager.shutdown()
+    await run_in_threadpool(shutdown_parse_pool)
+    for client in async_oracle_clients.pop_all():
+        await client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(api.router)
 
 
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """Give each request one time budget shared by all of its Oracle calls"""
+    requested = request.headers.get("X-Request-Timeout") or request.query_params.get(
+        "request_timeout"
+    )
+    try:
+        seconds = float(requested) if requested else settings.REQUEST_TIMEOUT
+    except ValueError:
+        return JSONResponse(
+            status_code=400, content={"detail": f"Invalid request timeout: {requested}"}
+        )
+    if seconds <= 0:
+        return JSONResponse(
+            status_code=400, content={"detail": "Request timeout must be positive"}
+        )
+
+    token = start_budget(min(seconds, settings.REQUEST_TIMEOUT_MAX))
+    budget = current_budget()
+    try:
+        response = await call_next(request)
+    finally:
+        reset_budget(token)
+
+    # Failures caused by the exhausted budget are reported as gateway timeouts
+    if response.status_code >= 400 and response.status_code != 504 and budget.exceeded:
+        return JSONResponse(
+            status_code=504,
+            content={
+                "detail": f"Request deadline of {budget.seconds}s exceeded while waiting for Oracle"
+            },
+        )
+    return response
+
+
 @app.get("/")
 def read_root():
     return {"message": "User Access Management Backend is running."}
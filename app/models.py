@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -33,3 +33,32 @@ class Role(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     description = Column(String)
+
+
+class BulkJob(Base):
+    __tablename__ = "bulk_jobs"
+    id = Column(String(32), primary_key=True, index=True)
+    job_type = Column(String, nullable=False)
+    status = Column(String, index=True, nullable=False)
+    instance_url = Column(String)
+    # Oracle credentials are never stored; only who submitted the job
+    oracle_username = Column(String)
+    total_rows = Column(Integer, default=0)
+    processed_rows = Column(Integer, default=0)
+    succeeded_rows = Column(Integer, default=0)
+    failed_rows = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+
+class BulkJobRow(Base):
+    __tablename__ = "bulk_job_rows"
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(32), ForeignKey("bulk_jobs.id"), index=True, nullable=False)
+    row_number = Column(Integer, nullable=False)
+    username = Column(String)
+    success = Column(Boolean, nullable=False)
+    message = Column(Text)
+    error = Column(Text)
@@ -0,0 +1,97 @@
+# Retries for transient Oracle failures
+# Under load Oracle answers 429/502/503/504 or drops connections, and the same
+# call usually succeeds a moment later. Idempotent methods are sent again with
+# jittered exponential backoff, honouring Retry-After, so parallel bulk
+# workers spread their retries out instead of stampeding the pod.
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Attempts per HTTP method, the first one included. Methods that are not
+# listed are sent once unless a call opts in.
+DEFAULT_RETRY_ATTEMPTS = {"GET": 3, "PATCH": 3}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Decides whether a failed Oracle call is sent again, and after how long"""
+
+    def __init__(
+        self,
+        attempts: Optional[Dict[str, int]] = None,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        opt_in_attempts: int = 3,
+        status_codes=RETRYABLE_STATUS_CODES,
+    ):
+        attempts = DEFAULT_RETRY_ATTEMPTS if attempts is None else attempts
+        self.attempts = {method.upper(): count for method, count in attempts.items()}
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.opt_in_attempts = opt_in_attempts
+        self.status_codes = frozenset(status_codes)
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.retry_after_waits = 0
+
+    def max_attempts(self, method: str, retry: Optional[bool] = None) -> int:
+        """Attempts allowed for a call; retry=True opts a non-idempotent call in"""
+        if retry is False:
+            return 1
+        attempts = self.attempts.get(method.upper(), 1)
+        if retry:
+            attempts = max(attempts, self.opt_in_attempts)
+        return max(1, attempts)
+
+    def retryable_status(self, status_code: int) -> bool:
+        return status_code in self.status_codes
+
+    def next_delay(
+        self, attempt: int, max_attempts: int, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """Seconds to wait before sending attempt + 1, or None to give up"""
+        if attempt >= max_attempts:
+            return None
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                # Waiting that long would hold the worker; report the failure
+                return None
+            # Never earlier than asked; the jitter keeps workers apart
+            return retry_after + random.uniform(0, self.base_delay)
+        # "Full jitter" exponential backoff
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    def record_retry(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.retries += 1
+            if retry_after is not None:
+                self.retry_after_waits += 1
+
+    def stats(self) -> Dict:
+        return {
+            "retries": self.retries,
+            "retry_after_waits": self.retry_after_waits,
+            "attempts": dict(self.attempts),
+        }
@@ -65,6 +65,18 @@ class UserDetailRequest(BaseModel):
     oracle_config: OracleConnectionConfig
 
 
+class UserBatchLookupRequest(BaseModel):
+    usernames: List[str] = Field(..., description="Usernames to look up")
+    oracle_config: OracleConnectionConfig
+
+
+class UserBatchLookupResponse(BaseModel):
+    found: int
+    missing: List[str]
+    users: Dict[str, Optional[Dict[str, Any]]]
+    errors: Dict[str, str]
+
+
 class UserDetailResponse(BaseModel):
     username: str
     person_number: Optional[str]
@@ -94,6 +106,16 @@ class RoleRemovalRequest(BaseModel):
 class BulkRoleAssignmentRequest(BaseModel):
     assignments: List[RoleAssignmentRequest]
     oracle_config: OracleConnectionConfig
+    concurrency: Optional[int] = Field(
+        None, ge=1, description="Rows processed in parallel (server default if omitted)"
+    )
+    use_bulk: Optional[bool] = Field(
+        None,
+        description="Send rows as SCIM /Bulk or REST batch requests (server default if omitted)",
+    )
+    fail_on_errors: Optional[int] = Field(
+        None, ge=1, description="Stop a SCIM /Bulk run after this many failed rows"
+    )
 
 
 class DataSecurityContextRequest(BaseModel):
@@ -109,6 +131,9 @@ class DataSecurityContextRequest(BaseModel):
 class BulkDataSecurityRequest(BaseModel):
     assignments: List[DataSecurityContextRequest]
     oracle_config: OracleConnectionConfig
+    concurrency: Optional[int] = Field(
+        None, ge=1, description="Rows processed in parallel (server default if omitted)"
+    )
 
 
 class AORAssignmentRequest(BaseModel):
@@ -127,13 +152,20 @@ class AORRemovalRequest(BaseModel):
 class BulkAORRequest(BaseModel):
     assignments: List[AORAssignmentRequest]
     oracle_config: OracleConnectionConfig
+    concurrency: Optional[int] = Field(
+        None, ge=1, description="Rows processed in parallel (server default if omitted)"
+    )
+    use_bulk: Optional[bool] = Field(
+        None,
+        description="Send rows as SCIM /Bulk or REST batch requests (server default if omitted)",
+    )
 
 
 class ExcelUploadRequest(BaseModel):
     file_content: str = Field(..., description="Base64 encoded Excel file content")
     operation_type: str = Field(
         ...,
-        description="Type of operation: role_assignment, data_security, aor_assignment",
+        description="Type of operation: role_assignment, aor_assignment",
     )
     oracle_config: OracleConnectionConfig
 
@@ -160,6 +192,14 @@ class PasswordUpdateRequest(BaseModel):
 
 class UserSearchRequest(BaseModel):
     search_criteria: Dict[str, Any] = Field(..., description="Search criteria")
+    operator: str = Field(
+        "and", description="How top-level criteria are combined: and, or"
+    )
+    attributes: Optional[List[str]] = Field(
+        None, description="SCIM attributes to return (defaults to all)"
+    )
+    start_index: int = Field(1, ge=1, description="1-based index of the first result")
+    count: int = Field(100, ge=1, le=500, description="Maximum results per page")
     oracle_config: OracleConnectionConfig
 
 
@@ -182,6 +222,41 @@ class BulkOperationResponse(BaseModel):
     results: List[OperationStatus]
 
 
+# Background job schemas
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    total_rows: int
+
+
+class JobRowResult(BaseModel):
+    row_number: int
+    username: Optional[str] = None
+    success: bool
+    message: Optional[str] = None
+    error: Optional[str] = None
+
+
+class JobSummary(BaseModel):
+    job_id: str
+    job_type: str
+    status: str
+    total_rows: int
+    processed_rows: int
+    created_at: Optional[datetime] = None
+
+
+class JobStatusResponse(JobSummary):
+    succeeded_rows: int
+    failed_rows: int
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    offset: int
+    limit: int
+    results: List[JobRowResult]
+
+
 # Configuration schemas
 class AppConfig(BaseModel):
     app_name: str = "Oracle Fusion HCM User Management"
@@ -0,0 +1,126 @@
+# SCIM filter construction (RFC 7644 section 3.4.2.2)
+# Search criteria from the API are turned into a properly escaped filter
+# string so the search runs on the Oracle side instead of in this app.
+
+import re
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote
+
+# Friendly criteria names accepted by the API and their SCIM attribute paths
+ATTRIBUTE_ALIASES = {
+    "username": "userName",
+    "email": "emails.value",
+    "active": "active",
+    "display_name": "displayName",
+    "first_name": "name.givenName",
+    "last_name": "name.familyName",
+    "external_id": "externalId",
+}
+
+# Longest URL-encoded filter sent as a query parameter; keeps the request
+# line well inside the usual 8 KB limit of proxies and servers
+DEFAULT_MAX_FILTER_LENGTH = 4000
+
+COMPARISON_OPERATORS = {"eq", "ne", "co", "sw", "ew", "gt", "ge", "lt", "le"}
+
+_ATTRIBUTE_PATH = re.compile(r"^[A-Za-z][A-Za-z0-9_\-]*(\.[A-Za-z][A-Za-z0-9_\-]*)*$")
+
+
+def scim_value(value: Any) -> str:
+    """Render a Python value as a SCIM filter literal"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _attribute_path(name: str) -> str:
+    path = ATTRIBUTE_ALIASES.get(name, name)
+    if not _ATTRIBUTE_PATH.match(path):
+        raise ValueError(f"Invalid SCIM attribute name: {name}")
+    return path
+
+
+def _comparison(path: str, condition: Any) -> str:
+    if isinstance(condition, dict):
+        op = str(condition.get("op", "eq")).lower()
+        if op == "pr":
+            return f"{path} pr"
+        if op not in COMPARISON_OPERATORS:
+            raise ValueError(f"Unsupported SCIM filter operator: {op}")
+        return f"{path} {op} {scim_value(condition.get('value'))}"
+    if isinstance(condition, (list, tuple)):
+        if not condition:
+            raise ValueError(f"Empty value list for {path}")
+        terms = [_comparison(path, item) for item in condition]
+        return terms[0] if len(terms) == 1 else "(" + " or ".join(terms) + ")"
+    if path == "active" and isinstance(condition, str):
+        condition = condition.lower() == "true"
+    return f"{path} eq {scim_value(condition)}"
+
+
+def build_scim_filter(criteria: Dict[str, Any], operator: str = "and") -> str:
+    """Build a SCIM filter from search criteria
+
+    Each key is an attribute (or one of ATTRIBUTE_ALIASES) mapped to a value
+    for an equality match, a list of values matched with "or", or a
+    {"op": ..., "value": ...} condition. The keys "and" / "or" take a list of
+    nested criteria dicts, so groups can be combined freely. Returns an empty
+    string when there is nothing to filter on.
+    """
+    operator = operator.lower()
+    if operator not in ("and", "or"):
+        raise ValueError(f"Unsupported logical operator: {operator}")
+
+    terms: List[str] = []
+    for name, condition in criteria.items():
+        if name in ("and", "or"):
+            # Keys inside each nested group are combined with "and"
+            if not isinstance(condition, (list, tuple)) or not all(
+                isinstance(group, dict) for group in condition
+            ):
+                raise ValueError(f'"{name}" takes a list of criteria objects')
+            groups = []
+            for group in condition:
+                group_filter = build_scim_filter(group)
+                if group_filter:
+                    groups.append(
+                        f"({group_filter})" if len(group) > 1 else group_filter
+                    )
+            if groups:
+                terms.append("(" + f" {name} ".join(groups) + ")")
+            continue
+        terms.append(_comparison(_attribute_path(name), condition))
+
+    return f" {operator} ".join(terms)
+
+
+def or_filter_chunks(
+    path: str, values: List[Any], max_length: int = DEFAULT_MAX_FILTER_LENGTH
+) -> List[Tuple[List[Any], str]]:
+    """Pack values into `path eq a or path eq b ...` filters of bounded length
+
+    Returns (values, filter) pairs; the length limit applies to the filter
+    once URL-encoded. A single value is always emitted, however long.
+    """
+    chunks: List[Tuple[List[Any], str]] = []
+    current: List[Any] = []
+    terms: List[str] = []
+    length = 0
+    separator = len(quote(" or "))
+    for value in values:
+        term = f"{path} eq {scim_value(value)}"
+        term_length = len(quote(term))
+        if current and length + separator + term_length > max_length:
+            chunks.append((current, " or ".join(terms)))
+            current, terms, length = [], [], 0
+        length += term_length + (separator if current else 0)
+        current.append(value)
+        terms.append(term)
+    if current:
+        chunks.append((current, " or ".join(terms)))
+    return chunks
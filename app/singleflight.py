@@ -0,0 +1,50 @@
+# Request coalescing for identical concurrent Oracle reads
+# While a call for a key is in flight, later callers with the same key wait
+# for it and share its result instead of sending their own upstream request.
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class AsyncSingleFlight:
+    """Coalesces identical concurrent calls made from one event loop"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leading caller was cancelled, not us: run the call ourselves
+                return await self.do(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self) -> Dict:
+        return {"calls": self.calls, "shared": self.shared}
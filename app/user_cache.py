@@ -0,0 +1,152 @@
+# In-process cache of username -> SCIM identifiers
+# Most write endpoints only need a user's GUID or SCIM id, so resolving them
+# from this cache saves a SCIM filter query per operation.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Stored for usernames Oracle reported as unknown
+_MISSING = object()
+
+# Identifier fields with an index back to the cache key
+INDEXED_FIELDS = ("GUID", "id")
+
+
+def scim_identifiers(scim_user: Dict) -> Dict:
+    """Extract the identifiers kept in the cache from a SCIM user resource"""
+    return {
+        "GUID": scim_user.get("GUID"),
+        "id": scim_user.get("id"),
+        "version": (scim_user.get("meta") or {}).get("version"),
+    }
+
+
+class UserLookupCache:
+    """Thread-safe TTL + LRU cache with negative caching for unknown users"""
+
+    def __init__(
+        self, max_entries: int = 10000, ttl: float = 300, negative_ttl: float = 30
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        # field -> identifier value -> key, so writes by GUID or id are O(1)
+        self._index: Dict[str, Dict[str, str]] = {field: {} for field in INDEXED_FIELDS}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(username: str) -> str:
+        # SCIM userName matching is case-insensitive
+        return username.lower()
+
+    def get(self, username: str) -> Tuple[bool, Optional[Dict]]:
+        """Return (found, identifiers); identifiers is None for known-missing users"""
+        key = self._key(username)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            if entry[1] is _MISSING:
+                self.negative_hits += 1
+                return True, None
+            self.hits += 1
+            return True, dict(entry[1])
+
+    def put(self, username: str, scim_user: Dict):
+        """Remember the identifiers of a SCIM user resource"""
+        self._store(username, scim_identifiers(scim_user), self.ttl)
+
+    def put_missing(self, username: str):
+        """Remember that Oracle does not know this username"""
+        self._store(username, _MISSING, self.negative_ttl)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            if self._drop(self._key(username)):
+                self.invalidations += 1
+
+    def invalidate_where(self, field: str, value: str):
+        """Drop entries whose identifier field (GUID or id) matches value"""
+        self.invalidate_many(field, [value])
+
+    def invalidate_many(self, field: str, values):
+        """Drop entries whose identifier field matches any of values"""
+        with self._lock:
+            for key in self._keys_for(field, values):
+                self._drop(key)
+                self.invalidations += 1
+
+    def update_version(self, field: str, values, version: Optional[str] = None):
+        """Set the cached meta.version of matching entries, keeping the entries
+
+        Writes that leave a user's identifiers alone only change its version;
+        None records that the current version is unknown.
+        """
+        with self._lock:
+            for key in self._keys_for(field, values):
+                self._entries[key][1]["version"] = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for index in self._index.values():
+                index.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits + self.negative_hits) / lookups
+                if lookups
+                else 0.0,
+            }
+
+    def _store(self, username: str, value, ttl: float):
+        key = self._key(username)
+        with self._lock:
+            self._drop(key)
+            if value is not _MISSING:
+                for field in INDEXED_FIELDS:
+                    if value.get(field):
+                        # Another username holding this id or GUID is stale
+                        self._drop(self._index[field].get(value[field]))
+                        self._index[field][value[field]] = key
+            self._entries[key] = (time.monotonic() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _keys_for(self, field: str, values) -> List[str]:
+        index = self._index.get(field)
+        if index is None:
+            raise ValueError(f"Identifier field {field} is not indexed")
+        return list({index[value] for value in values if value in index})
+
+    def _drop(self, key: Optional[str]) -> bool:
+        entry = self._entries.pop(key, None) if key is not None else None
+        if entry is None:
+            return False
+        if entry[1] is not _MISSING:
+            for field in INDEXED_FIELDS:
+                value = entry[1].get(field)
+                if value and self._index[field].get(value) == key:
+                    del self._index[field][value]
+        return True
@@ -6,6 +6,7 @@ class OracleFusionApp {
         this.oracleConfig = null;
         this.currentSection = 'dashboard';
         this.autoRefreshInterval = null;
+        this.maxJobRowsShown = 1000; // Keeps the page responsive on large jobs
         
         this.init();
     }
@@ -616,7 +617,7 @@ class OracleFusionApp {
         this.showLoading();
 
         try {
-            const response = await fetch(`${this.apiBaseUrl}/users/roles/bulk-assign`, {
+            const request = {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -625,12 +626,27 @@ class OracleFusionApp {
                     assignments: assignments,
                     oracle_config: this.oracleConfig
                 })
-            });
+            };
+            // Runs as a background job; progress is streamed back row by row
+            let response = await fetch(`${this.apiBaseUrl}/jobs/roles/bulk-assign`, request);
+
+            if (response.status === 503) {
+                // Job storage is unavailable; run the rows in this request instead
+                response = await fetch(`${this.apiBaseUrl}/users/roles/bulk-assign`, request);
+                if (response.ok) {
+                    const result = await response.json();
+                    this.showNotification(`Bulk operation completed: ${result.successful_operations} successful, ${result.failed_operations} failed`, 'success');
+                    document.getElementById('bulkRoleData').value = '';
+                    return;
+                }
+            }
 
             if (response.ok) {
-                const result = await response.json();
-                this.showNotification(`Bulk operation completed: ${result.successful_operations} successful, ${result.failed_operations} failed`, 'success');
+                const job = await response.json();
                 document.getElementById('bulkRoleData').value = '';
+                this.hideLoading();
+                const result = await this.followJob(job, document.getElementById('bulkRoleResult'), 'Bulk Role Assignment');
+                this.showJobOutcome('Bulk operation', result);
             } else {
                 const error = await response.text();
                 this.showNotification('Error: ' + error, 'error');
@@ -930,20 +946,38 @@ class OracleFusionApp {
         try {
             const formData = new FormData();
             formData.append('file', fileInput.files[0]);
-            formData.append('operation_type', operationType);
-            formData.append('instance_url', this.oracleConfig.instance_url);
-            formData.append('oracle_username', this.oracleConfig.username);
-            formData.append('oracle_password', this.oracleConfig.password);
+            const params = new URLSearchParams({
+                operation_type: operationType,
+                instance_url: this.oracleConfig.instance_url,
+                oracle_username: this.oracleConfig.username,
+                oracle_password: this.oracleConfig.password
+            });
 
-            const response = await fetch(`${this.apiBaseUrl}/upload/excel`, {
+            // Runs as a background job; progress is streamed back row by row
+            let response = await fetch(`${this.apiBaseUrl}/jobs/upload/excel?${params}`, {
                 method: 'POST',
                 body: formData
             });
 
+            if (response.status === 503) {
+                // Job storage is unavailable; process the file in this request instead
+                response = await fetch(`${this.apiBaseUrl}/upload/excel?${params}`, {
+                    method: 'POST',
+                    body: formData
+                });
+                if (response.ok) {
+                    const result = await response.json();
+                    this.displayUploadResult(result);
+                    this.showNotification(`Upload completed: ${result.success_count} successful, ${result.failure_count} failed`, 'success');
+                    return;
+                }
+            }
+
             if (response.ok) {
-                const result = await response.json();
-                this.displayUploadResult(result);
-                this.showNotification(`Upload completed: ${result.success_count} successful, ${result.failure_count} failed`, 'success');
+                const job = await response.json();
+                this.hideLoading();
+                const result = await this.followJob(job, document.getElementById('uploadResult'), 'Upload Results');
+                this.showJobOutcome('Upload', result);
             } else {
                 const error = await response.text();
                 this.showNotification('Error: ' + error, 'error');
@@ -1003,6 +1037,132 @@ class OracleFusionApp {
         resultPanel.style.display = 'block';
     }
 
+    // Background Jobs
+    followJob(job, panel, title) {
+        // Renders a job's event stream into panel; resolves with the final status
+        panel.innerHTML = `
+            <h3>${title}</h3>
+            <div class="job-progress">
+                <div class="progress-bar"><div class="progress-fill"></div></div>
+                <div class="upload-summary">
+                    <div class="summary-item">
+                        <span class="label">Processed:</span>
+                        <span class="value" data-field="processed">0 / ${job.total_rows}</span>
+                    </div>
+                    <div class="summary-item">
+                        <span class="label">Successful:</span>
+                        <span class="value success" data-field="succeeded">0</span>
+                    </div>
+                    <div class="summary-item">
+                        <span class="label">Failed:</span>
+                        <span class="value error" data-field="failed">0</span>
+                    </div>
+                    <div class="summary-item">
+                        <span class="label">Rate:</span>
+                        <span class="value" data-field="rate">-</span>
+                    </div>
+                    <div class="summary-item">
+                        <span class="label">ETA:</span>
+                        <span class="value" data-field="eta">-</span>
+                    </div>
+                    <div class="summary-item">
+                        <span class="label">Concurrency:</span>
+                        <span class="value" data-field="concurrency">-</span>
+                    </div>
+                    <div class="summary-item">
+                        <span class="label">Status:</span>
+                        <span class="value" data-field="status">${job.status}</span>
+                    </div>
+                </div>
+                <button type="button" class="btn btn-danger job-cancel">
+                    <i class="fas fa-stop"></i> Cancel
+                </button>
+            </div>
+            <h4>Rows</h4>
+            <div class="processed-list job-rows"></div>
+        `;
+        panel.style.display = 'block';
+
+        const cancelButton = panel.querySelector('.job-cancel');
+        cancelButton.addEventListener('click', async () => {
+            cancelButton.disabled = true;
+            await fetch(`${this.apiBaseUrl}/jobs/${job.job_id}`, { method: 'DELETE' });
+        });
+
+        const rowList = panel.querySelector('.job-rows');
+        let shownRows = 0;
+
+        return new Promise((resolve, reject) => {
+            // EventSource reconnects on its own; the server then resends the state
+            const source = new EventSource(`${this.apiBaseUrl}/jobs/${job.job_id}/events`);
+
+            source.onerror = () => {
+                // Dropped connections are retried (readyState CONNECTING); an
+                // error answer such as 404 or 503 closes the stream for good
+                if (source.readyState !== EventSource.CLOSED) {
+                    return;
+                }
+                panel.querySelector('[data-field="status"]').textContent = 'unknown';
+                cancelButton.style.display = 'none';
+                reject(new Error(`Lost track of job ${job.job_id}; its progress stream is unavailable`));
+            };
+
+            source.addEventListener('progress', (e) => {
+                this.renderJobProgress(panel, JSON.parse(e.data));
+            });
+
+            source.addEventListener('row', (e) => {
+                const row = JSON.parse(e.data);
+                if (shownRows >= this.maxJobRowsShown) {
+                    return;
+                }
+                shownRows += 1;
+                const item = document.createElement('div');
+                item.className = row.success ? 'processed-item' : 'error-item';
+                const label = document.createElement('span');
+                label.className = row.success ? 'processed-row' : 'error-row';
+                label.textContent = `Row ${row.row_number} (${row.username || ''}):`;
+                const text = document.createElement('span');
+                text.className = row.success ? 'processed-status' : 'error-message';
+                text.textContent = row.success ? row.message : row.error;
+                item.append(label, ' ', text);
+                rowList.appendChild(item);
+            });
+
+            source.addEventListener('done', (e) => {
+                source.close();
+                const result = JSON.parse(e.data);
+                this.renderJobProgress(panel, result);
+                cancelButton.style.display = 'none';
+                resolve(result);
+            });
+        });
+    }
+
+    renderJobProgress(panel, progress) {
+        const field = (name) => panel.querySelector(`[data-field="${name}"]`);
+        const percent = progress.total_rows ? Math.round(100 * progress.processed_rows / progress.total_rows) : 100;
+        panel.querySelector('.progress-fill').style.width = `${percent}%`;
+        field('processed').textContent = `${progress.processed_rows} / ${progress.total_rows}`;
+        field('succeeded').textContent = progress.succeeded_rows;
+        field('failed').textContent = progress.failed_rows;
+        field('status').textContent = progress.status;
+        if (progress.rows_per_second !== undefined) {
+            field('rate').textContent = `${progress.rows_per_second} rows/s`;
+        }
+        if (progress.eta_seconds !== undefined) {
+            field('eta').textContent = progress.eta_seconds === null ? '-' : `${Math.ceil(progress.eta_seconds)}s`;
+        }
+        if (progress.concurrency) {
+            field('concurrency').textContent = `${progress.concurrency.in_flight} / ${progress.concurrency.limit}`;
+        }
+    }
+
+    showJobOutcome(label, result) {
+        const type = result.status === 'completed' ? 'success' : 'warning';
+        this.showNotification(`${label} ${result.status}: ${result.succeeded_rows} successful, ${result.failed_rows} failed`, type);
+    }
+
     // Template Downloads
     downloadTemplate(type) {
         let content = '';
@@ -1013,10 +1173,6 @@ class OracleFusionApp {
                 content = 'username,role_name\njohn.doe,HR_MANAGER\njane.smith,EMPLOYEE';
                 filename = 'role_assignment_template.csv';
                 break;
-            case 'data_security':
-                content = 'username,role_name,security_context,security_value\njohn.doe,HR_MANAGER,DEPARTMENT,IT\njane.smith,EMPLOYEE,LOCATION,NYC';
-                filename = 'data_security_template.csv';
-                break;
             case 'aor_assignment':
                 content = 'username,aor_name,aor_type\njohn.doe,HR_DEPARTMENT,HR\njane.smith,IT_SUPPORT,IT';
                 filename = 'aor_assignment_template.csv';
@@ -0,0 +1,10 @@
+# Settings are read at import time, so the test environment is set up
+# before anything from app is imported
+import os
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ORACLE_API_BASE_URL", "https://oracle.test")
@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from app.client_registry import async_oracle_clients
+from app.main import app
+
+
+def test_metrics_only_report_the_callers_own_client():
+    other = async_oracle_clients.lease("https://other.test", "other-user", "pw")
+    own = async_oracle_clients.lease("https://metrics.test", "api", "secret")
+    try:
+        with TestClient(app) as client:
+            response = client.get(
+                "/admin/metrics",
+                params={
+                    "instance_url": "https://metrics.test",
+                    "oracle_username": "api",
+                    "oracle_password": "secret",
+                },
+            )
+            wrong_password = client.get(
+                "/admin/metrics",
+                params={
+                    "instance_url": "https://metrics.test",
+                    "oracle_username": "api",
+                    "oracle_password": "guess",
+                },
+            )
+            anonymous = client.get("/admin/metrics")
+    finally:
+        own.release()
+        other.release()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["instance_url"] == "https://metrics.test"
+    assert body["client"]["retries"] is not None
+    assert "other" not in response.text
+    assert wrong_password.json()["client"] is None
+    assert anonymous.status_code == 422
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import re
+
+import httpx
+
+from app.async_oracle_client import AsyncOracleClient
+
+PAGE_CAP = 50
+
+
+def _capped_scim_server(existing, requests):
+    """SCIM /Users that returns at most PAGE_CAP users per page, like Oracle"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        requests.append(dict(params))
+        wanted = re.findall(r'userName eq "([^"]*)"', params["filter"])
+        matches = [
+            {"id": f"id-{name}", "userName": name}
+            for name in wanted
+            if name in existing
+        ]
+        start = int(params.get("startIndex", 1))
+        count = min(int(params.get("count", 100)), PAGE_CAP)
+        return httpx.Response(
+            200,
+            json={
+                "totalResults": len(matches),
+                "startIndex": start,
+                "itemsPerPage": count,
+                "Resources": matches[start - 1 : start - 1 + count],
+            },
+        )
+
+    return handler
+
+
+def _client(handler) -> AsyncOracleClient:
+    return AsyncOracleClient(
+        "https://oracle.test",
+        "api",
+        "secret",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+def test_username_lookup_pages_past_the_server_page_cap():
+    existing = {f"user{number}" for number in range(120)}
+    usernames = sorted(existing) + ["ghost1", "ghost2"]
+    requests = []
+    client = _client(_capped_scim_server(existing, requests))
+
+    async def scenario():
+        try:
+            return await client.get_users_by_usernames(
+                usernames, max_filter_length=100000
+            )
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+
+    assert [request["startIndex"] for request in requests] == ["1", "51", "101"]
+    assert all(results[name]["success"] for name in existing)
+    assert results["ghost1"] == {"success": False, "error": "User not found"}
+    # Known users are cached as found and the ghosts as missing
+    assert client.user_cache.get("user119") == (
+        True,
+        {"GUID": None, "id": "id-user119", "version": None},
+    )
+    assert client.user_cache.get("ghost2") == (True, None)
+
+
+def test_username_lookup_does_not_cache_misses_after_a_failed_page():
+    existing = {f"user{number}" for number in range(80)}
+    requests = []
+    capped = _capped_scim_server(existing, requests)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("startIndex") != "1":
+            requests.append(dict(request.url.params))
+            return httpx.Response(400, text="bad page")
+        return capped(request)
+
+    client = _client(handler)
+
+    async def scenario():
+        try:
+            return await client.get_users_by_usernames(
+                sorted(existing), max_filter_length=100000
+            )
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+
+    found = [name for name, result in results.items() if result["success"]]
+    failed = [name for name, result in results.items() if not result["success"]]
+    assert len(found) == PAGE_CAP
+    assert len(failed) == 30
+    assert results[failed[0]]["status_code"] == 400
+    assert client.user_cache.get(failed[0]) == (False, None)
+
+
+def test_rejected_member_batch_is_split_down_to_the_bad_rows():
+    usernames = [f"user{number}" for number in range(8)]
+    patches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"Resources": [{"id": "role-1"}]})
+        members = [
+            member["value"]
+            for operation in json.loads(request.content)["Operations"]
+            for member in operation["value"]
+        ]
+        patches.append(members)
+        if "id-user5" in members:
+            return httpx.Response(400, json={"detail": "invalid member id-user5"})
+        return httpx.Response(200, json={"id": "role-1"})
+
+    client = _client(handler)
+    for username in usernames:
+        client.user_cache.put(username, {"id": f"id-{username}"})
+
+    async def scenario():
+        try:
+            return await client.assign_role_to_users("Auditor", usernames)
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+
+    assert [result["success"] for result in results] == [
+        username != "user5" for username in usernames
+    ]
+    assert results[5]["status_code"] == 400
+    # 8 -> 4 + 4 -> 2 + 2 -> 1 + 1
+    assert len(patches) == 7
+
+
+def test_member_batch_refused_as_a_whole_is_not_split():
+    patches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"Resources": [{"id": "role-1"}]})
+        patches.append(request)
+        return httpx.Response(403, json={"detail": "forbidden"})
+
+    client = _client(handler)
+    for username in ("a", "b", "c"):
+        client.user_cache.put(username, {"id": f"id-{username}"})
+
+    async def scenario():
+        try:
+            return await client.assign_role_to_users("Auditor", ["a", "b", "c"])
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+
+    assert len(patches) == 1
+    assert [result["status_code"] for result in results] == [403, 403, 403]
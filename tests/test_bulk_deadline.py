@@ -0,0 +1,110 @@
+import itertools
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import deadlines
+from app.async_oracle_client import AsyncOracleClient
+from app.client_registry import async_oracle_clients
+from app.main import app
+
+_instances = itertools.count()
+
+
+class FakeClock:
+    """Stands in for the time module of app.deadlines; only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def oracle(monkeypatch):
+    """Serve every Oracle call from a MockTransport that takes `delay` seconds
+
+    The delay is charged to a fake deadline clock instead of being slept, so
+    the budget runs out at the same point however slow the machine is.
+    """
+    clock = FakeClock()
+    server = {"delay": 0.0, "calls": [], "clock": clock}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        server["calls"].append((request.method, clock.now))
+        clock.now += server["delay"]
+        if request.method == "GET":
+            username = request.url.params["filter"].split('"')[1]
+            user = {"id": f"id-{username}", "userName": username}
+            return httpx.Response(200, json={"totalResults": 1, "Resources": [user]})
+        return httpx.Response(200, json={})
+
+    def build(instance_url, username, password):
+        return AsyncOracleClient(
+            instance_url,
+            username,
+            password,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    monkeypatch.setattr(deadlines, "time", clock)
+    monkeypatch.setattr(async_oracle_clients, "_client_factory", build)
+    # A fresh instance per test keeps the user cache out of the way
+    server["instance_url"] = f"https://oracle{next(_instances)}.test"
+    return server
+
+
+def _role_request(instance_url: str, rows: int) -> dict:
+    return {
+        "oracle_config": {
+            "instance_url": instance_url,
+            "username": "api",
+            "password": "secret",
+        },
+        "assignments": [
+            {
+                "username": f"user{row}",
+                "role_name": f"ROLE_{row}",
+                "oracle_config": {
+                    "instance_url": instance_url,
+                    "username": "api",
+                    "password": "secret",
+                },
+            }
+            for row in range(rows)
+        ],
+        "concurrency": 1,
+        "use_bulk": False,
+    }
+
+
+def test_bulk_endpoint_within_budget_reports_every_row(oracle):
+    with TestClient(app) as client:
+        response = client.post(
+            "/users/roles/bulk-assign",
+            json=_role_request(oracle["instance_url"], rows=3),
+        )
+
+    assert response.status_code == 200
+    assert response.json()["successful_operations"] == 3
+
+
+def test_bulk_endpoint_stops_and_returns_504_when_budget_runs_out(oracle):
+    # Each row is a lookup and a PATCH: 0.4s per row against a 0.5s budget
+    oracle["delay"] = 0.2
+    deadline = oracle["clock"].now + 0.5
+    rows = 5
+    with TestClient(app) as client:
+        response = client.post(
+            "/users/roles/bulk-assign",
+            params={"request_timeout": 0.5},
+            json=_role_request(oracle["instance_url"], rows=rows),
+        )
+
+    assert response.status_code == 504
+    assert "row(s) were applied" in response.json()["detail"]
+    # Nothing reached Oracle once the budget was spent, so rows were left out
+    assert all(started < deadline for _, started in oracle["calls"])
+    assert [method for method, _ in oracle["calls"]].count("PATCH") < rows
@@ -0,0 +1,97 @@
+import asyncio
+import random
+
+from app.bulk_executor import run_bulk, run_grouped
+
+
+def _rows():
+    # Three users with interleaved rows
+    return [(f"user{number % 3}", number) for number in range(12)]
+
+
+def test_rows_of_one_key_run_in_input_order_and_never_overlap():
+    delays = random.Random(7)
+    events = []
+    in_flight = set()
+    peak = []
+
+    async def worker(row):
+        username, number = row
+        assert username not in in_flight
+        in_flight.add(username)
+        peak.append(len(in_flight))
+        events.append(row)
+        # Random delays shuffle the order across keys, not within one
+        await asyncio.sleep(delays.uniform(0, 0.005))
+        in_flight.discard(username)
+        return number * 10
+
+    rows = _rows()
+    results = asyncio.run(
+        run_bulk(rows, key=lambda row: row[0], worker=worker, concurrency=2)
+    )
+
+    assert results == [number * 10 for _, number in rows]
+    assert max(peak) <= 2
+    for username in ("user0", "user1", "user2"):
+        started = [number for name, number in events if name == username]
+        assert started == sorted(started)
+
+
+def test_on_result_reports_each_index_once():
+    reported = []
+
+    async def worker(row):
+        await asyncio.sleep(0)
+        return row[1]
+
+    rows = _rows()
+    asyncio.run(
+        run_bulk(
+            rows,
+            key=lambda row: row[0],
+            worker=worker,
+            concurrency=4,
+            on_result=lambda index, result: reported.append((index, result)),
+        )
+    )
+
+    assert sorted(reported) == [
+        (index, number) for index, (_, number) in enumerate(rows)
+    ]
+
+
+def test_rows_not_started_before_stop_are_left_as_none():
+    stop = asyncio.Event()
+
+    async def worker(row):
+        if row[1] == 2:
+            stop.set()
+        return row[1]
+
+    async def scenario():
+        return await run_bulk(
+            list(enumerate(range(6))),
+            key=lambda row: "same",
+            worker=worker,
+            concurrency=3,
+            stop=stop,
+        )
+
+    assert asyncio.run(scenario()) == [0, 1, 2, None, None, None]
+
+
+def test_grouped_worker_gets_each_key_in_input_order():
+    groups = []
+
+    async def worker(group):
+        groups.append([number for _, number in group])
+        return [number for _, number in group]
+
+    rows = _rows()
+    results = asyncio.run(
+        run_grouped(rows, key=lambda row: row[0], worker=worker, concurrency=2)
+    )
+
+    assert results == [number for _, number in rows]
+    assert sorted(groups) == [[0, 3, 6, 9], [1, 4, 7, 10], [2, 5, 8, 11]]
@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.async_oracle_client import AsyncOracleClient
+from app.retry_policy import RetryPolicy
+
+AORS = [
+    {"userAccountId": f"user{number}", "name": "AOR", "type": "GENERAL"}
+    for number in range(3)
+]
+
+
+def _create_aors(batch_response):
+    """Send AORS as one batch; returns (results, single-row POSTs made)"""
+    single_posts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/areasOfResponsibility"):
+            single_posts.append(request)
+            return httpx.Response(201, json={"AreaOfResponsibilityId": 1})
+        return batch_response(request)
+
+    client = AsyncOracleClient(
+        "https://oracle.test",
+        "api",
+        "secret",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        retry_policy=RetryPolicy(attempts={"POST": 1}),
+    )
+
+    async def scenario():
+        try:
+            return await client.create_areas_of_responsibility(AORS)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(scenario()), single_posts
+
+
+def test_rejected_batch_falls_back_to_one_request_per_row():
+    results, single_posts = _create_aors(
+        lambda request: httpx.Response(400, text="invalid part")
+    )
+
+    assert len(single_posts) == len(AORS)
+    assert all(result["success"] for result in results)
+
+
+def test_batch_with_a_failed_part_falls_back_to_one_request_per_row():
+    def batch_response(request):
+        parts = [
+            {"id": "part0", "payload": {}},
+            {"id": "part1", "exception": {"detail": "bad row"}},
+            {"id": "part2", "payload": {}},
+        ]
+        return httpx.Response(200, json={"parts": parts})
+
+    results, single_posts = _create_aors(batch_response)
+
+    assert len(single_posts) == len(AORS)
+
+
+def test_throttled_batch_is_not_replayed():
+    results, single_posts = _create_aors(
+        lambda request: httpx.Response(429, headers={"Retry-After": "1"})
+    )
+
+    assert single_posts == []
+    assert [result["status_code"] for result in results] == [429] * len(AORS)
+    assert all("throttled" in result["error"] for result in results)
+
+
+def _connection_reset(request):
+    raise httpx.ReadError("connection reset")
+
+
+@pytest.mark.parametrize(
+    "batch_response",
+    [
+        lambda request: httpx.Response(408, text="request timeout"),
+        lambda request: httpx.Response(500, text="internal error"),
+        lambda request: httpx.Response(503, text="unavailable"),
+        _connection_reset,
+    ],
+    ids=["408", "500", "503", "transport error"],
+)
+def test_batch_with_unknown_outcome_is_not_replayed(batch_response):
+    results, single_posts = _create_aors(batch_response)
+
+    assert single_posts == []
+    assert len(results) == len(AORS)
+    assert not any(result["success"] for result in results)
+    assert all("Outcome unknown" in result["error"] for result in results)
@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app import circuit_breaker
+from app.async_oracle_client import AsyncOracleClient
+from app.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from app.retry_policy import RetryPolicy
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock for the breaker that only moves when told to"""
+    fake = SimpleNamespace(now=1000.0)
+    fake.monotonic = lambda: fake.now
+    monkeypatch.setattr(circuit_breaker, "time", fake)
+    return fake
+
+
+def _fail(breaker: CircuitBreaker, times: int):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures_only(clock):
+    breaker = CircuitBreaker("https://oracle.test", failure_threshold=3)
+
+    _fail(breaker, 2)
+    breaker.before_call()
+    breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    _fail(breaker, 1)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_half_open_admits_one_trial_after_the_reset_timeout(clock):
+    breaker = CircuitBreaker(
+        "https://oracle.test", failure_threshold=1, reset_timeout=30
+    )
+    _fail(breaker, 1)
+
+    clock.now += 29.9
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 0.1
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError, match="half-open"):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_for_a_full_reset_timeout(clock):
+    breaker = CircuitBreaker(
+        "https://oracle.test", failure_threshold=2, reset_timeout=30
+    )
+    _fail(breaker, 2)
+    clock.now += 30
+
+    _fail(breaker, 1)
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened_count"] == 2
+    assert breaker.stats()["retry_in"] == 30
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_trial_frees_the_half_open_slot(clock):
+    breaker = CircuitBreaker(
+        "https://oracle.test", failure_threshold=1, reset_timeout=1
+    )
+    _fail(breaker, 1)
+    clock.now += 1
+
+    breaker.before_call()
+    # e.g. a 404: says nothing about the pod's health
+    breaker.release()
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_client_stops_calling_an_instance_whose_circuit_is_open():
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(503, text="maintenance")
+
+    breaker = CircuitBreaker("https://oracle.test", failure_threshold=2)
+    client = AsyncOracleClient(
+        "https://oracle.test",
+        "api",
+        "secret",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        retry_policy=RetryPolicy(attempts={"GET": 1}),
+        circuit_breaker=breaker,
+    )
+
+    async def scenario():
+        try:
+            return [await client.get_user_account("guid-1") for _ in range(3)]
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(scenario())
+
+    assert len(sent) == 2
+    assert [result.get("status_code") for result in results[:2]] == [503, 503]
+    assert not results[2]["success"]
+    assert "circuit open" in results[2]["error"]
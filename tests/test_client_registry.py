@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+
+from app.async_oracle_client import AsyncOracleClient
+from app.client_registry import OracleClientRegistry
+
+
+class FakeClient:
+    def __init__(self, base_url, username, password):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_registry(max_entries=32, idle_timeout=600):
+    return OracleClientRegistry(
+        client_factory=FakeClient, max_entries=max_entries, idle_timeout=idle_timeout
+    )
+
+
+def test_lease_reuses_client_per_credentials():
+    registry = make_registry()
+    with registry.lease("https://a/", "user", "pw") as first:
+        with registry.lease("https://a", "user", "pw") as second:
+            assert first is second
+    assert not first.closed
+
+
+def test_idle_eviction_waits_for_last_lease():
+    registry = make_registry(idle_timeout=0)
+    lease = registry.lease("https://a", "user", "pw")
+    # Another caller's lease runs the idle sweep
+    registry.lease("https://b", "user", "pw").release()
+    assert not lease.client.closed
+    assert lease.client in registry.clients()
+
+    lease.release()
+    registry.lease("https://b", "user", "pw").release()
+    assert lease.client.closed
+    assert lease.client not in registry.clients()
+
+
+def test_lru_eviction_closes_on_release():
+    registry = make_registry(max_entries=1)
+    lease = registry.lease("https://a", "user", "pw")
+    other = registry.lease("https://b", "user", "pw")
+    assert registry.clients() == [other.client]
+    assert not lease.client.closed
+
+    lease.release()
+    assert lease.client.closed
+    # A second release must not close or count anything twice
+    lease.release()
+    other.release()
+    assert not other.client.closed
+
+
+def test_unleased_evicted_client_is_closed_at_once():
+    registry = make_registry(max_entries=1)
+    registry.lease("https://a", "user", "pw").release()
+    first = registry.clients()[0]
+    registry.lease("https://b", "user", "pw").release()
+    assert first.closed
+
+
+def test_password_change_gets_new_client_without_closing_leased_one():
+    registry = make_registry()
+    old = registry.lease("https://a", "user", "old")
+    with registry.lease("https://a", "user", "new") as client:
+        assert client is not old.client
+        assert client.password == "new"
+    assert not old.client.closed
+    old.release()
+    assert old.client.closed
+
+
+def test_close_all_does_not_close_twice_on_release():
+    closed = []
+    registry = OracleClientRegistry(
+        client_factory=FakeClient,
+        max_entries=32,
+        idle_timeout=600,
+        close_client=closed.append,
+    )
+    lease = registry.lease("https://a", "user", "pw")
+    registry.close_all()
+    lease.release()
+    assert closed == [lease.client]
+
+
+def test_evicted_async_client_keeps_working_until_released():
+    def handler(request):
+        return httpx.Response(200, json={"Resources": [{"userName": "alice"}]})
+
+    def factory(base_url, username, password):
+        return AsyncOracleClient(
+            base_url,
+            username,
+            password,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    async def scenario():
+        registry = OracleClientRegistry(
+            client_factory=factory, max_entries=1, idle_timeout=600
+        )
+        lease = registry.lease("https://a", "user", "pw")
+        # An unrelated request pushes the leased client out of the registry
+        registry.lease("https://b", "user", "pw").release()
+        result = await lease.client.get_user_by_username("alice")
+        assert result["success"], result
+
+        lease.release()
+        await asyncio.sleep(0.01)
+        return lease.client
+
+    client = asyncio.run(scenario())
+    assert client.http_client.is_closed
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.async_oracle_client import AsyncOracleClient
+from app.concurrency_limiter import AdaptiveLimiter
+from app.deadlines import reset_budget, start_budget
+from app.retry_policy import RetryPolicy
+
+
+def _limit_after(status_code: int) -> int:
+    limiter = AdaptiveLimiter("https://oracle.test", initial_limit=8)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, json={"detail": "error"})
+
+    async def scenario():
+        client = AsyncOracleClient(
+            "https://oracle.test",
+            "api",
+            "secret",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            retry_policy=RetryPolicy(attempts={"GET": 1}),
+            concurrency_limiter=limiter,
+        )
+        try:
+            await client.get_user_by_username("jdoe")
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+    return limiter.stats()["limit"]
+
+
+def test_plain_server_error_does_not_shrink_the_limit():
+    assert _limit_after(500) == 8
+
+
+@pytest.mark.parametrize("status_code", [429, 502, 503, 504])
+def test_overload_responses_halve_the_limit(status_code):
+    assert _limit_after(status_code) == 4
+
+
+def test_queued_call_fails_within_its_deadline_budget():
+    limiter = AdaptiveLimiter("https://oracle.test", initial_limit=1, max_limit=1)
+
+    async def scenario():
+        release_slow_call = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await release_slow_call.wait()
+            return httpx.Response(200, json={"Resources": []})
+
+        client = AsyncOracleClient(
+            "https://oracle.test",
+            "api",
+            "secret",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            concurrency_limiter=limiter,
+        )
+        try:
+            # Holds the only slot until released
+            slow = asyncio.create_task(client.get_user_by_username("slow"))
+            while limiter.stats()["in_flight"] == 0:
+                await asyncio.sleep(0.01)
+
+            token = start_budget(0.3)
+            try:
+                started = time.monotonic()
+                result = await client.get_user_by_username("queued")
+                waited = time.monotonic() - started
+            finally:
+                reset_budget(token)
+            waiting_after = limiter.stats()["waiting"]
+
+            release_slow_call.set()
+            await slow
+            return result, waited, waiting_after, limiter.stats()["in_flight"]
+        finally:
+            await client.aclose()
+
+    result, waited, waiting_after, in_flight = asyncio.run(scenario())
+
+    assert not result["success"]
+    assert "deadline" in result["error"]
+    assert waited < 1.0
+    # The abandoned wait neither stays queued nor takes a slot later
+    assert waiting_after == 0
+    assert in_flight == 0
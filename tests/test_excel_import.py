@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.excel_import import ExcelValidationError, iter_excel_chunks, prepare_rows
+from app.main import app
+
+
+def test_header_spelling_of_canonical_columns_is_forgiven():
+    df = pd.DataFrame(
+        {" User Name ": [" jdoe "], "ROLE-NAME": ["HR_MANAGER"], "Notes": ["ignored"]}
+    )
+
+    rows, rejected = prepare_rows(df, "role_assignment")
+
+    assert rows == [(1, {"username": "jdoe", "role_name": "HR_MANAGER"})]
+    assert rejected == []
+
+
+def test_synonyms_are_not_guessed():
+    df = pd.DataFrame({"Login": ["jdoe"], "Role": ["HR_MANAGER"]})
+
+    with pytest.raises(ExcelValidationError, match="username, role_name"):
+        prepare_rows(df, "role_assignment")
+
+
+def test_two_columns_for_the_same_field_are_rejected():
+    df = pd.DataFrame({"username": ["a"], "User_Name": ["b"], "role_name": ["R"]})
+
+    with pytest.raises(ExcelValidationError, match="username"):
+        prepare_rows(df, "role_assignment")
+
+
+def test_data_security_is_not_an_upload_operation():
+    df = pd.DataFrame({"username": ["a"], "role_name": ["R"]})
+
+    with pytest.raises(ExcelValidationError, match="Unsupported operation type"):
+        prepare_rows(df, "data_security")
+
+
+def _write_sheet(directory, rows: int) -> str:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["username", "role_name"])
+    for number in range(rows):
+        sheet.append([f"user{number}", "R"])
+    path = os.path.join(directory, "upload.xlsx")
+    workbook.save(path)
+    return path
+
+
+def _chunk_files(path: str):
+    return [name for name in os.listdir(os.path.dirname(path)) if "chunk" in name]
+
+
+def test_parser_stays_a_few_chunks_ahead_and_stops_with_the_reader(tmp_path):
+    path = _write_sheet(str(tmp_path), rows=100)
+
+    async def scenario():
+        chunks = iter_excel_chunks(
+            path,
+            "role_assignment",
+            workers=0,
+            chunk_rows=10,
+            max_rows=1000,
+            pending_chunks=2,
+        )
+        first = await chunks.__anext__()
+        # Holding the first chunk: one more may be parsed, then the parser waits
+        await asyncio.sleep(0.5)
+        waiting = _chunk_files(path)
+        await chunks.aclose()
+        return first, waiting
+
+    first, waiting = asyncio.run(scenario())
+
+    assert [row_number for row_number, _ in first.rows] == list(range(1, 11))
+    assert len(waiting) == 1
+    assert _chunk_files(path) == []
+
+
+def test_data_security_upload_is_refused_with_a_pointer_to_the_bulk_endpoint():
+    with TestClient(app) as client:
+        response = client.post(
+            "/upload/excel",
+            params={
+                "operation_type": "data_security",
+                "instance_url": "https://oracle.test",
+                "oracle_username": "api",
+                "oracle_password": "secret",
+            },
+            files={"file": ("upload.xlsx", b"not read", "application/octet-stream")},
+        )
+
+    assert response.status_code == 400
+    assert "/users/data-security/bulk-assign" in response.json()["detail"]
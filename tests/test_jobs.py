@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from app.jobs import JobManager
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """A job database of its own, shared by every manager in one test"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    JobManager(factory).prepare_storage()
+    yield factory
+    engine.dispose()
+
+
+def _manager(session_factory) -> JobManager:
+    return JobManager(session_factory, flush_interval=0.01)
+
+
+def test_rows_and_status_outlive_the_manager(session_factory):
+    async def run(job):
+        job.record(1, "jdoe", True, message="Role assigned")
+        job.record(2, "asmith", False, error="User not found")
+
+    async def scenario():
+        job = await _manager(session_factory).submit(
+            "role_assignment", 2, run, oracle_username="api"
+        )
+        await job.task
+        # A fresh manager only has the database to go on
+        return await _manager(session_factory).describe(job.id)
+
+    status = asyncio.run(scenario())
+
+    assert status["status"] == "completed"
+    assert (status["processed_rows"], status["succeeded_rows"]) == (2, 1)
+    assert [(row["row_number"], row["success"]) for row in status["results"]] == [
+        (1, True),
+        (2, False),
+    ]
+    assert status["results"][1]["error"] == "User not found"
+    assert status["finished_at"] is not None
+
+
+def test_cancelled_job_stops_starting_rows_and_still_cleans_up(session_factory):
+    cleaned = []
+
+    async def run(job):
+        for row_number in range(1, 101):
+            if job.cancelled:
+                return
+            job.record(row_number, f"user{row_number}", True)
+            await asyncio.sleep(0.001)
+
+    async def cleanup():
+        cleaned.append(True)
+
+    async def scenario():
+        manager = _manager(session_factory)
+        job = await manager.submit("role_assignment", 100, run, cleanup=cleanup)
+        while job.processed_rows < 3:
+            await asyncio.sleep(0.001)
+        assert manager.cancel(job.id)
+        await job.task
+        assert not manager.cancel(job.id)
+        return job, await manager.describe(job.id, limit=1000)
+
+    job, status = asyncio.run(scenario())
+
+    assert status["status"] == "cancelled"
+    assert 3 <= status["processed_rows"] < 100
+    assert len(status["results"]) == status["processed_rows"] == job.processed_rows
+    assert cleaned == [True]
+
+
+def test_failing_job_records_its_error(session_factory):
+    async def run(job):
+        job.record(1, "jdoe", True)
+        raise RuntimeError("sheet vanished")
+
+    async def scenario():
+        manager = _manager(session_factory)
+        job = await manager.submit("excel_upload", 5, run)
+        await job.task
+        return await manager.describe(job.id)
+
+    status = asyncio.run(scenario())
+
+    assert status["status"] == "failed"
+    assert status["error"] == "sheet vanished"
+    assert status["processed_rows"] == 1
+
+
+def test_shutdown_marks_running_jobs_interrupted(session_factory):
+    async def run(job):
+        job.record(1, "jdoe", True)
+        await asyncio.Event().wait()
+
+    async def scenario():
+        manager = _manager(session_factory)
+        job = await manager.submit("role_assignment", 10, run)
+        while job.processed_rows < 1:
+            await asyncio.sleep(0.001)
+        await manager.shutdown()
+        return await _manager(session_factory).describe(job.id)
+
+    status = asyncio.run(scenario())
+
+    assert status["status"] == "interrupted"
+    assert status["processed_rows"] == 1
+
+
+def test_restart_marks_jobs_left_unfinished_by_a_crash_interrupted(session_factory):
+    db = session_factory()
+    try:
+        crud.create_bulk_job(db, "a" * 32, "role_assignment", 10)
+        crud.create_bulk_job(db, "b" * 32, "role_assignment", 10)
+        crud.update_bulk_job(db, "b" * 32, status="running")
+        crud.create_bulk_job(db, "c" * 32, "role_assignment", 10)
+        crud.update_bulk_job(db, "c" * 32, status="completed")
+    finally:
+        db.close()
+
+    manager = _manager(session_factory)
+
+    assert manager.prepare_storage() == 2
+    statuses = asyncio.run(manager.list_jobs())
+    assert sorted((job["job_id"][0], job["status"]) for job in statuses) == [
+        ("a", "interrupted"),
+        ("b", "interrupted"),
+        ("c", "completed"),
+    ]
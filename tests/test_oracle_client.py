@@ -0,0 +1,90 @@
+import threading
+import time
+
+import httpx
+
+from app.client_registry import circuit_breakers, concurrency_limiters
+from app.deadlines import reset_budget, start_budget
+from app.oracle_client import OracleAPIError, OracleClient
+
+USERS = [{"id": f"id{i}", "userName": f"user{i}"} for i in range(1, 8)]
+
+
+def scim_users(request):
+    start = int(request.url.params.get("startIndex", 1))
+    count = int(request.url.params.get("count", 100))
+    page = USERS[start - 1 : start - 1 + min(count, 3)]
+    return httpx.Response(200, json={"totalResults": len(USERS), "Resources": page})
+
+
+def make_client(handler):
+    return OracleClient(
+        "https://oracle.test",
+        "api",
+        "secret",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+def test_blocking_calls_and_iterators():
+    with make_client(scim_users) as client:
+        assert client.base_url == "https://oracle.test"
+        page = client.get_users_page(1, 3)
+        assert page["success"]
+        assert [user["userName"] for user in client.iter_users(count=3)] == [
+            user["userName"] for user in USERS
+        ]
+
+
+def test_calls_from_several_threads():
+    results = []
+    with make_client(scim_users) as client:
+        threads = [
+            threading.Thread(target=lambda: results.append(client.get_users_page()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(results) == 8 and all(result["success"] for result in results)
+
+
+def test_iterator_errors_surface_as_oracle_api_error():
+    def failing(request):
+        return httpx.Response(400, text="bad request")
+
+    with make_client(failing) as client:
+        try:
+            list(client.iter_user_pages())
+        except OracleAPIError as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError("expected OracleAPIError")
+
+
+def test_caller_deadline_budget_applies():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"Resources": []})
+
+    with make_client(handler) as client:
+        token = start_budget(0.01)
+        try:
+            time.sleep(0.02)
+            result = client.get_users_page()
+        finally:
+            reset_budget(token)
+    assert not result["success"]
+    assert "deadline" in result["error"]
+    assert not calls
+
+
+def test_shares_the_instance_breaker_and_limiter_with_the_api_clients():
+    with make_client(scim_users) as client:
+        assert client.circuit_breaker is circuit_breakers.get("https://oracle.test")
+        assert client.concurrency_limiter is concurrency_limiters.get(
+            "https://oracle.test/"
+        )
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from app import retry_policy
+from app.async_oracle_client import AsyncOracleClient
+from app.retry_policy import RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    """Make every jittered delay its upper bound"""
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda low, high: high)
+
+
+def test_backoff_doubles_up_to_the_cap_and_then_gives_up(no_jitter):
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0)
+
+    delays = [policy.next_delay(attempt, 5) for attempt in range(1, 6)]
+
+    assert delays == [0.5, 1.0, 2.0, 3.0, None]
+
+
+def test_retry_after_is_never_shortened(no_jitter):
+    policy = RetryPolicy(base_delay=0.5, max_delay=20.0)
+
+    assert policy.next_delay(1, 3, retry_after=4.0) == 4.5
+    assert policy.next_delay(1, 3, retry_after=0.0) == 0.5
+
+
+def test_retry_after_beyond_the_cap_is_not_waited_for():
+    policy = RetryPolicy(max_delay=20.0)
+
+    assert policy.next_delay(1, 3, retry_after=20.1) is None
+    assert policy.next_delay(3, 3, retry_after=1.0) is None
+
+
+def test_attempts_per_method_and_opt_in():
+    policy = RetryPolicy(attempts={"get": 4}, opt_in_attempts=2)
+
+    assert policy.max_attempts("GET") == 4
+    assert policy.max_attempts("POST") == 1
+    assert policy.max_attempts("POST", retry=True) == 2
+    assert policy.max_attempts("GET", retry=False) == 1
+
+
+def test_parse_retry_after():
+    in_a_minute = datetime.now(timezone.utc) + timedelta(seconds=60)
+
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert 55 < parse_retry_after(format_datetime(in_a_minute, usegmt=True)) <= 60
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def _run_get(responses, policy):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return responses[min(len(sent), len(responses)) - 1]
+
+    client = AsyncOracleClient(
+        "https://oracle.test",
+        "api",
+        "secret",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        retry_policy=policy,
+    )
+
+    async def scenario():
+        try:
+            return await client.get_user_account("guid-1")
+        finally:
+            await client.aclose()
+
+    return asyncio.run(scenario()), sent
+
+
+def test_client_retries_a_throttled_get_until_it_succeeds():
+    policy = RetryPolicy(base_delay=0.0)
+    result, sent = _run_get(
+        [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(503),
+            httpx.Response(200, json={"GUID": "guid-1"}),
+        ],
+        policy,
+    )
+
+    assert result["success"]
+    assert len(sent) == 3
+    assert policy.stats()["retries"] == 2
+    assert policy.stats()["retry_after_waits"] == 1
+
+
+def test_client_does_not_retry_a_long_retry_after():
+    policy = RetryPolicy(base_delay=0.0, max_delay=5.0)
+    result, sent = _run_get(
+        [httpx.Response(429, headers={"Retry-After": "120"})], policy
+    )
+
+    assert result["status_code"] == 429
+    assert len(sent) == 1
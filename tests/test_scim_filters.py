@@ -0,0 +1,63 @@
+import pytest
+
+from app.scim_filters import build_scim_filter, scim_value
+
+
+def test_quotes_and_backslashes_are_escaped():
+    assert scim_value('say "hi"') == '"say \\"hi\\""'
+    assert scim_value("dom\\user") == '"dom\\\\user"'
+    assert scim_value('a\\"b') == '"a\\\\\\"b"'
+
+
+def test_literals_are_not_quoted():
+    assert scim_value(None) == "null"
+    assert scim_value(True) == "true"
+    assert scim_value(3) == "3"
+
+
+def test_escaped_value_in_filter():
+    assert build_scim_filter({"username": 'x" or userName pr or "'}) == (
+        'userName eq "x\\" or userName pr or \\""'
+    )
+
+
+def test_nested_groups():
+    criteria = {
+        "active": "true",
+        "or": [
+            {"first_name": "Ann", "last_name": "Lee"},
+            {"email": {"op": "ew", "value": "@example.com"}},
+        ],
+    }
+    assert build_scim_filter(criteria) == (
+        'active eq true and ((name.givenName eq "Ann" and name.familyName eq "Lee")'
+        ' or emails.value ew "@example.com")'
+    )
+
+
+def test_group_inside_group():
+    criteria = {"and": [{"or": [{"username": "a"}, {"username": "b"}]}]}
+    assert build_scim_filter(criteria) == '((userName eq "a" or userName eq "b"))'
+
+
+@pytest.mark.parametrize(
+    "criteria",
+    [
+        {"or": "jdoe"},
+        {"and": {"username": "jdoe"}},
+        {"or": ["jdoe", "asmith"]},
+        {"and": [{"username": "jdoe"}, None]},
+        {"and": 5},
+        {"username": {"op": "regex", "value": "x"}},
+        {"user name": "x"},
+        {"username": []},
+    ],
+)
+def test_malformed_criteria_raise_value_error(criteria):
+    with pytest.raises(ValueError):
+        build_scim_filter(criteria)
+
+
+def test_unknown_logical_operator():
+    with pytest.raises(ValueError):
+        build_scim_filter({"username": "jdoe"}, operator="xor")
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import AsyncSingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": "id-1"}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("user", fetch) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert results == [{"id": "id-1"}] * 5
+    assert flight.stats() == {"calls": 1, "shared": 4}
+
+
+def test_different_keys_and_later_calls_are_not_shared():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def scenario():
+        first = await asyncio.gather(
+            flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b"))
+        )
+        # The first call for "a" has finished, so this one goes upstream again
+        second = await flight.do("a", lambda: fetch("a"))
+        return first, second
+
+    assert asyncio.run(scenario()) == (["a", "b"], "a")
+    assert calls == ["a", "b", "a"]
+
+
+def test_error_reaches_every_waiting_caller():
+    flight = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("oracle down")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("user", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert [str(error) for error in results] == ["oracle down"] * 3
+    assert flight.stats()["calls"] == 1
+
+
+def test_waiter_runs_the_call_itself_when_the_leader_is_cancelled():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("user", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("user", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "done"
+    assert len(calls) == 2
@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+
+from app.async_oracle_client import AsyncOracleClient
+from app.user_cache import UserLookupCache
+
+
+def _user(username, user_id, guid=None, version="v1"):
+    return {
+        "userName": username,
+        "id": user_id,
+        "GUID": guid,
+        "meta": {"version": version},
+    }
+
+
+def test_invalidate_by_identifier_drops_only_the_matching_entry():
+    cache = UserLookupCache()
+    cache.put("jdoe", _user("jdoe", "id-1", "guid-1"))
+    cache.put("asmith", _user("asmith", "id-2", "guid-2"))
+
+    cache.invalidate_many("id", ["id-1", "id-unknown", None])
+    cache.invalidate_where("GUID", "guid-2")
+
+    assert cache.get("jdoe") == (False, None)
+    assert cache.get("asmith") == (False, None)
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_update_version_keeps_the_identifiers():
+    cache = UserLookupCache()
+    cache.put("jdoe", _user("jdoe", "id-1", "guid-1"))
+
+    cache.update_version("id", ["id-1"])
+    assert cache.get("jdoe") == (
+        True,
+        {"GUID": "guid-1", "id": "id-1", "version": None},
+    )
+
+    cache.update_version("GUID", ["guid-1"], "v2")
+    assert cache.get("JDOE")[1]["version"] == "v2"
+
+
+def test_index_follows_replacement_and_eviction():
+    cache = UserLookupCache(max_entries=2)
+    cache.put("jdoe", _user("jdoe", "id-1"))
+    # Recreated user: the old id must no longer reach the entry
+    cache.put("jdoe", _user("jdoe", "id-9"))
+    cache.invalidate_where("id", "id-1")
+    assert cache.get("jdoe")[1]["id"] == "id-9"
+
+    # Renamed user: the old username holding the same id is stale
+    cache.put("jdoe.new", _user("jdoe.new", "id-9"))
+    assert cache.get("jdoe") == (False, None)
+
+    cache.put("a", _user("a", "id-a"))
+    cache.put("b", _user("b", "id-b"))
+    assert cache.get("jdoe.new") == (False, None)
+    # The evicted entry left no index behind to be counted as invalidated
+    before = cache.stats()["invalidations"]
+    cache.invalidate_many("id", ["id-9", "id-1"])
+    assert cache.stats()["invalidations"] == before
+
+
+def _patch(response, update_data):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return response
+
+    client = AsyncOracleClient(
+        "https://oracle.test",
+        "api",
+        "secret",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    client.user_cache.put("jdoe", _user("jdoe", "id-1", "guid-1"))
+
+    async def scenario():
+        try:
+            return await client.update_user_scim("id-1", update_data)
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario())["success"]
+    return client.user_cache
+
+
+def test_patch_without_username_in_the_response_keeps_the_user_cached():
+    operations = {"Operations": [{"op": "replace", "path": "active", "value": False}]}
+    cache = _patch(
+        httpx.Response(200, json={"id": "id-1", "meta": {"version": "v2"}}), operations
+    )
+    assert cache.get("jdoe") == (
+        True,
+        {"GUID": "guid-1", "id": "id-1", "version": "v2"},
+    )
+
+    cache = _patch(httpx.Response(204), operations)
+    assert cache.get("jdoe") == (
+        True,
+        {"GUID": "guid-1", "id": "id-1", "version": None},
+    )
+
+
+def test_patch_renaming_the_user_drops_the_old_username():
+    rename = {"Operations": [{"op": "replace", "value": {"userName": "jdoe2"}}]}
+    assert _patch(httpx.Response(204), rename).get("jdoe") == (False, None)
+
+    cache = _patch(
+        httpx.Response(200, json=_user("jdoe2", "id-1", "guid-1", "v3")), rename
+    )
+    assert cache.get("jdoe") == (False, None)
+    assert cache.get("jdoe2")[1]["version"] == "v3"